@@ -0,0 +1,95 @@
+# api/admin.py
+"""
+YSense Platform v4.0 Admin API
+Operator endpoints guarded by X-Admin-Key (Config.ADMIN_API_KEY)
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import Optional
+import io
+import tempfile
+
+from api.auth import require_admin
+from src.bulk_registration import FORMATS, import_registrations
+from src.config import Config
+from src.profiling import profile_store
+from src.responses import dumps_json
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+# Uploads larger than this spill from memory to a temporary file
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+# ==================== Bulk Registration ====================
+
+@router.post("/users/import")
+async def import_users(
+    request: Request,
+    format: Optional[str] = None,
+    chunk_size: Optional[int] = None
+):
+    """
+    Import registrations from a CSV or NDJSON request body.
+    Streams back NDJSON: one outcome per input row, then a summary line.
+    """
+    content_type = request.headers.get("content-type", "")
+    fmt = format or ("csv" if "csv" in content_type else "ndjson")
+    if fmt not in FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported import format '{fmt}' (expected one of: {', '.join(FORMATS)})"
+        )
+
+    # Spool the upload, then parse it line by line while importing
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    async for chunk in request.stream():
+        spool.write(chunk)
+    spool.seek(0)
+    lines = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+
+    outcomes = import_registrations(
+        lines, fmt,
+        chunk_size=chunk_size,
+        source="admin_import",
+        ip_address=request.client.host if request.client else None,
+        user_agent=request.headers.get("User-Agent")
+    )
+
+    def stream():
+        try:
+            for outcome in outcomes:
+                yield dumps_json(outcome) + b"\n"
+        finally:
+            lines.close()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+# ==================== Request Profiles ====================
+
+@router.get("/profiles")
+async def list_profiles(limit: int = 50):
+    """Saved slow-request captures, newest first (see PROFILING_ENABLED)"""
+    captures = profile_store.list(limit)
+    return {
+        "profiling_enabled": Config.PROFILING_ENABLED,
+        "slow_threshold_ms": Config.PROFILE_SLOW_MS,
+        "count": len(captures),
+        "profiles": captures
+    }
+
+@router.get("/profiles/{capture_id}")
+async def download_profile(capture_id: str, format: str = "summary"):
+    """
+    Download one capture: the summary (SQL query log, LLM call timings) or the
+    speedscope profile, which opens as a flamegraph in https://www.speedscope.app
+    """
+    if format not in ("summary", "speedscope"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="format must be 'summary' or 'speedscope'"
+        )
+    path = profile_store.path_for(capture_id, format)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=path.name)
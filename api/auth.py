@@ -4,20 +4,26 @@ YSense Platform v3.0 Authentication API
 Handles user registration, login, and consent management
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr, validator
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import hashlib
+import hmac
 import secrets
+import time
 import jwt
 from passlib.context import CryptContext
 import bcrypt
 
 from src.models import User, ConsentRecord, AuditLog, get_session, generate_user_id, generate_audit_id
 from src.config import Config
+from src.background_writer import background_writer
+from src.key_index import canonical_key, key_index_values, key_lookup
+from src.telemetry import span
+from src.token_revocation import revocation_list
 
 router = APIRouter()
 # Use a more compatible bcrypt configuration
@@ -30,6 +36,18 @@ pwd_context = CryptContext(
 )
 security = HTTPBearer()
 
+CONSENT_VERSION = "2.0"
+
+# Required consents, recorded individually for the audit trail
+CONSENT_TYPES = {
+    "data_collection": "I consent to YSense collecting my wisdom",
+    "commercial_use": "I consent to commercial use with attribution",
+    "ai_training": "I consent to ethical AI training use",
+    "revenue_sharing": "I accept 30% revenue share terms",
+    "attribution": "I understand attribution is permanent",
+    "terms": "I have read and accept Terms of Service v2.0"
+}
+
 # ==================== Pydantic Models ====================
 
 class UserRegistration(BaseModel):
@@ -80,6 +98,18 @@ class TokenResponse(BaseModel):
     z_protocol_tier: str
     crypto_key: str  # Return the crypto key to the user
     z_protocol_consent_key: str  # Z Protocol consent verification key
+    refresh_token: Optional[str] = None  # Exchange at /refresh instead of logging in again
+
+class RefreshRequest(BaseModel):
+    """Refresh token exchange"""
+    refresh_token: str
+
+class RefreshResponse(BaseModel):
+    """New access token (and rotated refresh token)"""
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+    refresh_token: str
 
 # ==================== Helper Functions ====================
 
@@ -128,38 +158,152 @@ def generate_crypto_key(username: str) -> str:
     return formatted_key
 
 def verify_crypto_key(provided_key: str, stored_key: str) -> bool:
-    """Verify crypto key (case-insensitive, ignore dashes)"""
-    # Normalize both keys: remove dashes and convert to lowercase
-    normalized_provided = provided_key.replace('-', '').lower()
-    normalized_stored = stored_key.replace('-', '').lower()
-    
-    return normalized_provided == normalized_stored
+    """Verify crypto key (case-insensitive, ignore dashes) in constant time"""
+    return hmac.compare_digest(canonical_key(provided_key).encode(), canonical_key(stored_key).encode())
+
+ACCESS_TOKEN_EXPIRES_IN = Config.JWT_ACCESS_TOKEN_MINUTES * 60
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
-    """Create JWT access token"""
+    """Create JWT access token (short-lived; jti/iat let it be revoked)"""
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(hours=Config.JWT_EXPIRATION_HOURS)
+        expire = datetime.utcnow() + timedelta(minutes=Config.JWT_ACCESS_TOKEN_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # Fractional iat so tokens issued right after a user-wide revocation stay valid
+    to_encode.update({"exp": expire, "iat": time.time(), "jti": secrets.token_urlsafe(16)})
     encoded_jwt = jwt.encode(to_encode, Config.JWT_SECRET_KEY, algorithm=Config.JWT_ALGORITHM)
     return encoded_jwt
 
+def create_refresh_token(user_id: str) -> str:
+    """Long-lived token that can only be exchanged for a new access token"""
+    return create_access_token(
+        data={"sub": user_id, "type": "refresh"},
+        expires_delta=timedelta(days=Config.JWT_REFRESH_EXPIRATION_DAYS)
+    )
+
+def access_token_claims(user: User) -> dict:
+    return {
+        "sub": user.id,
+        "username": user.username,
+        "z_protocol_tier": user.z_protocol_tier
+    }
+
 def generate_consent_signature(consent_data: dict) -> str:
     """Generate consent signature for legal proof"""
     consent_string = f"{consent_data['user_id']}:{consent_data['timestamp']}:{consent_data['version']}"
     return hashlib.sha256(consent_string.encode()).hexdigest()
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
-    """Get current authenticated user from JWT token"""
+def has_required_consents(registration: UserRegistration) -> bool:
+    return all(getattr(registration, f"consent_{consent_type}") for consent_type in CONSENT_TYPES)
+
+def build_registration_rows(registration: UserRegistration, ip_address: Optional[str] = None,
+                            user_agent: Optional[str] = None, now: Optional[datetime] = None,
+                            user_id: Optional[str] = None) -> Dict:
+    """
+    Column values for a new user and its consent records, plus the keys issued
+    to the user. Shared by /register and the bulk import pipeline (which passes
+    a fresh user_id when the generated one is already taken).
+    """
+    now = now or datetime.utcnow()
+    timestamp = now.isoformat()
+    
+    # Create consent record
+    consent_record = {
+        "data_collection": registration.consent_data_collection,
+        "commercial_use": registration.consent_commercial_use,
+        "ai_training": registration.consent_ai_training,
+        "revenue_sharing": registration.consent_revenue_sharing,
+        "attribution": registration.consent_attribution,
+        "terms": registration.consent_terms,
+        "marketing": registration.marketing_consent,
+        "research": registration.research_consent,
+        "timestamp": timestamp,
+        "version": CONSENT_VERSION
+    }
+    
+    # Generate crypto key for user
+    crypto_key = generate_crypto_key(registration.username)
+    
+    # Create user
+    user_id = user_id or generate_user_id(registration.username)
+    
+    # Generate Z Protocol consent verification key
+    z_protocol_consent_key = generate_z_protocol_consent_key(user_id, consent_record)
+    
+    user_values = {
+        "id": user_id,
+        "username": registration.username,
+        "email": registration.email,
+        "crypto_key": crypto_key,
+        "age": registration.age,
+        "age_verified": True,
+        "jurisdiction": registration.jurisdiction,
+        "cultural_context": registration.cultural_context,
+        
+        # Consent
+        "consent_signature": generate_consent_signature({
+            "user_id": user_id,
+            "timestamp": timestamp,
+            "version": CONSENT_VERSION
+        }),
+        "consent_timestamp": now,
+        "consent_version": CONSENT_VERSION,
+        "consent_record": consent_record,
+        
+        # Attribution
+        "attribution_id": secrets.token_urlsafe(16),
+        "attribution_name": registration.attribution_name or registration.username,
+        
+        # Z Protocol
+        "z_protocol_id": f"ZP_{secrets.token_hex(8).upper()}",
+        "z_protocol_score": 0.0,
+        "z_protocol_tier": "Bronze",
+        "z_protocol_consent_key": z_protocol_consent_key,
+        **key_index_values(crypto_key, z_protocol_consent_key),
+        
+        # Revenue
+        "revenue_tier": "Bronze",
+        "revenue_share_percentage": 30.0
+    }
+    
+    consents = [
+        {
+            "id": f"CONSENT_{secrets.token_hex(8).upper()}",
+            "user_id": user_id,
+            "consent_type": consent_type,
+            "consent_given": getattr(registration, f"consent_{consent_type}"),
+            "consent_text": consent_text,
+            "consent_version": CONSENT_VERSION,
+            "consent_method": "checkbox",
+            "consent_signature": generate_consent_signature({
+                "user_id": user_id,
+                "consent_type": consent_type,
+                "timestamp": timestamp,
+                "version": CONSENT_VERSION
+            }),
+            "ip_address": ip_address,
+            "user_agent": user_agent
+        }
+        for consent_type, consent_text in CONSENT_TYPES.items()
+    ]
+    
+    return {
+        "user": user_values,
+        "consents": consents,
+        "crypto_key": crypto_key,
+        "z_protocol_consent_key": z_protocol_consent_key
+    }
+
+async def get_token_payload(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """Decode and check the bearer access token (revocation is an in-memory lookup)"""
     token = credentials.credentials
     
     try:
         payload = jwt.decode(token, Config.JWT_SECRET_KEY, algorithms=[Config.JWT_ALGORITHM])
         user_id: str = payload.get("sub")
-        if user_id is None:
+        if user_id is None or payload.get("type") == "refresh":
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials",
@@ -171,16 +315,28 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             detail="Token has expired",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    except jwt.JWTError:
+    except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    db = get_session()
-    user = db.query(User).filter(User.id == user_id).first()
-    db.close()
+    if revocation_list.is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return payload
+
+async def get_current_user(payload: dict = Depends(get_token_payload)) -> User:
+    """Get current authenticated user from JWT token"""
+    with span("auth.load_user"):
+        db = get_session()
+        user = db.query(User).filter(User.id == payload["sub"]).first()
+        db.close()
     
     if user is None:
         raise HTTPException(
@@ -190,25 +346,45 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     
     return user
 
+async def require_admin(x_admin_key: Optional[str] = Header(None)):
+    """Guard for admin endpoints: X-Admin-Key must match Config.ADMIN_API_KEY"""
+    if not Config.ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin API is disabled (ADMIN_API_KEY not configured)"
+        )
+    if not x_admin_key or not hmac.compare_digest(x_admin_key.encode(), Config.ADMIN_API_KEY.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin key"
+        )
+
+def audit_values(user_id: str, action: str, action_type: str,
+                 entity_type: str = None, entity_id: str = None, metadata: dict = None,
+                 request: Request = None) -> dict:
+    """AuditLog column values for an action"""
+    return {
+        "id": generate_audit_id(user_id, action),
+        "user_id": user_id,
+        "action": action,
+        "action_type": action_type,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "audit_metadata": metadata or {},
+        "ip_address": request.client.host if request and request.client else None,
+        "user_agent": request.headers.get("User-Agent") if request else None,
+        "request_method": request.method if request else None,
+        "request_path": str(request.url.path) if request else None,
+        "created_at": datetime.utcnow()
+    }
+
 def log_audit(db: Session, user_id: str, action: str, action_type: str, 
               entity_type: str = None, entity_id: str = None, metadata: dict = None,
               request: Request = None):
     """Create audit log entry for compliance"""
-    audit_log = AuditLog(
-        id=generate_audit_id(user_id, action),
-        user_id=user_id,
-        action=action,
-        action_type=action_type,
-        entity_type=entity_type,
-        entity_id=entity_id,
-        audit_metadata=metadata or {},
-        ip_address=request.client.host if request else None,
-        user_agent=request.headers.get("User-Agent") if request else None,
-        request_method=request.method if request else None,
-        request_path=str(request.url.path) if request else None
-    )
-    db.add(audit_log)
-    db.commit()
+    with span("audit.log", **{"audit.action": action}):
+        db.add(AuditLog(**audit_values(user_id, action, action_type, entity_type, entity_id, metadata, request)))
+        db.commit()
 
 # ==================== API Endpoints ====================
 
@@ -231,112 +407,26 @@ async def register_user(registration: UserRegistration, request: Request):
             detail="Username or email already exists"
         )
     
-    # Validate all required consents
-    required_consents = [
-        registration.consent_data_collection,
-        registration.consent_commercial_use,
-        registration.consent_ai_training,
-        registration.consent_revenue_sharing,
-        registration.consent_attribution,
-        registration.consent_terms
-    ]
-    
-    if not all(required_consents):
+    if not has_required_consents(registration):
         db.close()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="All required consents must be accepted"
         )
     
-    # Create consent record
-    consent_record = {
-        "data_collection": registration.consent_data_collection,
-        "commercial_use": registration.consent_commercial_use,
-        "ai_training": registration.consent_ai_training,
-        "revenue_sharing": registration.consent_revenue_sharing,
-        "attribution": registration.consent_attribution,
-        "terms": registration.consent_terms,
-        "marketing": registration.marketing_consent,
-        "research": registration.research_consent,
-        "timestamp": datetime.utcnow().isoformat(),
-        "version": "2.0"
-    }
-    
-    # Generate crypto key for user
-    crypto_key = generate_crypto_key(registration.username)
-    
-    # Create user
-    user_id = generate_user_id(registration.username)
-    
-    # Generate Z Protocol consent verification key
-    z_protocol_consent_key = generate_z_protocol_consent_key(user_id, consent_record)
-    
-    user = User(
-        id=user_id,
-        username=registration.username,
-        email=registration.email,
-        crypto_key=crypto_key,
-        age=registration.age,
-        age_verified=True,
-        jurisdiction=registration.jurisdiction,
-        cultural_context=registration.cultural_context,
-        
-        # Consent
-        consent_signature=generate_consent_signature({
-            "user_id": user_id,
-            "timestamp": datetime.utcnow().isoformat(),
-            "version": "2.0"
-        }),
-        consent_timestamp=datetime.utcnow(),
-        consent_version="2.0",
-        consent_record=consent_record,
-        
-        # Attribution
-        attribution_id=secrets.token_urlsafe(16),
-        attribution_name=registration.attribution_name or registration.username,
-        
-        # Z Protocol
-        z_protocol_id=f"ZP_{secrets.token_hex(8).upper()}",
-        z_protocol_score=0.0,
-        z_protocol_tier="Bronze",
-        z_protocol_consent_key=z_protocol_consent_key,
-        
-        # Revenue
-        revenue_tier="Bronze",
-        revenue_share_percentage=30.0
+    rows = build_registration_rows(
+        registration, request.client.host, request.headers.get("User-Agent")
     )
+    user_id = rows["user"]["id"]
+    crypto_key = rows["crypto_key"]
+    z_protocol_consent_key = rows["z_protocol_consent_key"]
     
+    user = User(**rows["user"])
     db.add(user)
     
     # Create individual consent records for audit trail
-    consent_types = {
-        "data_collection": "I consent to YSense collecting my wisdom",
-        "commercial_use": "I consent to commercial use with attribution",
-        "ai_training": "I consent to ethical AI training use",
-        "revenue_sharing": "I accept 30% revenue share terms",
-        "attribution": "I understand attribution is permanent",
-        "terms": "I have read and accept Terms of Service v2.0"
-    }
-    
-    for consent_type, consent_text in consent_types.items():
-        consent = ConsentRecord(
-            id=f"CONSENT_{secrets.token_hex(8).upper()}",
-            user_id=user_id,
-            consent_type=consent_type,
-            consent_given=getattr(registration, f"consent_{consent_type}"),
-            consent_text=consent_text,
-            consent_version="2.0",
-            consent_method="checkbox",
-            consent_signature=generate_consent_signature({
-                "user_id": user_id,
-                "consent_type": consent_type,
-                "timestamp": datetime.utcnow().isoformat(),
-                "version": "2.0"
-            }),
-            ip_address=request.client.host,
-            user_agent=request.headers.get("User-Agent")
-        )
-        db.add(consent)
+    for consent_values in rows["consents"]:
+        db.add(ConsentRecord(**consent_values))
     
     # Log registration
     log_audit(db, user_id, "USER_REGISTRATION", "create", "user", user_id, 
@@ -346,24 +436,19 @@ async def register_user(registration: UserRegistration, request: Request):
     db.commit()
     
     # Create access token
-    access_token = create_access_token(
-        data={
-            "sub": user_id,
-            "username": user.username,
-            "z_protocol_tier": user.z_protocol_tier
-        }
-    )
+    access_token = create_access_token(data=access_token_claims(user))
     
     db.close()
     
     return TokenResponse(
         access_token=access_token,
-        expires_in=Config.JWT_EXPIRATION_HOURS * 3600,
+        expires_in=ACCESS_TOKEN_EXPIRES_IN,
         user_id=user_id,
         username=user.username,
         z_protocol_tier=user.z_protocol_tier,
         crypto_key=crypto_key,
-        z_protocol_consent_key=z_protocol_consent_key
+        z_protocol_consent_key=z_protocol_consent_key,
+        refresh_token=create_refresh_token(user_id)
     )
 
 @router.post("/login", response_model=TokenResponse)
@@ -372,14 +457,11 @@ async def login_user(credentials: UserLogin, request: Request):
     
     db = get_session()
     
-    # Find user by username or email
-    user = db.query(User).filter(
-        (User.username == credentials.username_or_email) |
-        (User.email == credentials.username_or_email)
-    ).first()
+    # Find user by username or email (one unique-index probe), then compare key digests
+    user = key_lookup.authenticate(db, credentials.username_or_email, credentials.crypto_key)
+    db.close()
     
-    if not user or not verify_crypto_key(credentials.crypto_key, user.crypto_key):
-        db.close()
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username/email or crypto key"
@@ -387,40 +469,78 @@ async def login_user(credentials: UserLogin, request: Request):
     
     # Check account status
     if user.account_status != "active":
-        db.close()
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"Account is {user.account_status}"
         )
     
-    # Update last active
-    user.last_active = datetime.utcnow()
-    
-    # Log login
-    log_audit(db, user.id, "USER_LOGIN", "access", "user", user.id,
-             {"method": "password"}, request)
-    
-    db.commit()
+    # last_active and the login audit entry are written in the next background batch
+    background_writer.touch_last_active(user.id)
+    background_writer.audit(audit_values(user.id, "USER_LOGIN", "access", "user", user.id,
+                                         {"method": "password"}, request))
     
     # Create access token
-    access_token = create_access_token(
-        data={
-            "sub": user.id,
-            "username": user.username,
-            "z_protocol_tier": user.z_protocol_tier
-        }
-    )
-    
-    db.close()
+    access_token = create_access_token(data=access_token_claims(user))
     
     return TokenResponse(
         access_token=access_token,
-        expires_in=Config.JWT_EXPIRATION_HOURS * 3600,
+        expires_in=ACCESS_TOKEN_EXPIRES_IN,
         user_id=user.id,
         username=user.username,
         z_protocol_tier=user.z_protocol_tier,
         crypto_key=user.crypto_key,
-        z_protocol_consent_key=user.z_protocol_consent_key
+        z_protocol_consent_key=user.z_protocol_consent_key,
+        refresh_token=create_refresh_token(user.id)
+    )
+
+@router.post("/refresh", response_model=RefreshResponse)
+async def refresh_access_token(body: RefreshRequest):
+    """Exchange a refresh token for a new access token (the refresh token is rotated)"""
+    
+    try:
+        payload = jwt.decode(body.refresh_token, Config.JWT_SECRET_KEY, algorithms=[Config.JWT_ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has expired"
+        )
+    except jwt.PyJWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+    
+    if payload.get("type") != "refresh" or not payload.get("sub"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+    
+    if revocation_list.is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked"
+        )
+    
+    db = get_session()
+    user = db.query(User).filter(User.id == payload["sub"]).first()
+    db.close()
+    
+    if user is None or user.account_status != "active":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Account is not active"
+        )
+    
+    background_writer.touch_last_active(user.id)
+    
+    # Rotation: each refresh token is usable once
+    revocation_list.revoke_token(payload)
+    
+    return RefreshResponse(
+        access_token=create_access_token(data=access_token_claims(user)),
+        expires_in=ACCESS_TOKEN_EXPIRES_IN,
+        refresh_token=create_refresh_token(user.id)
     )
 
 @router.get("/me")
@@ -502,7 +622,7 @@ async def lookup_user_by_consent_key(z_protocol_consent_key: str):
     
     db = get_session()
     
-    user = db.query(User).filter(User.z_protocol_consent_key == z_protocol_consent_key).first()
+    user = key_lookup.by_consent_key(db, z_protocol_consent_key)
     
     if not user:
         db.close()
@@ -537,7 +657,7 @@ async def withdraw_consent(
     
     db = get_session()
     
-    user = db.query(User).filter(User.z_protocol_consent_key == z_protocol_consent_key).first()
+    user = key_lookup.by_consent_key(db, z_protocol_consent_key)
     
     if not user:
         db.close()
@@ -568,8 +688,23 @@ async def withdraw_consent(
     }
 
 @router.post("/logout")
-async def logout_user(request: Request, current_user: User = Depends(get_current_user)):
-    """Logout user (mainly for audit trail)"""
+async def logout_user(
+    request: Request,
+    body: Optional[RefreshRequest] = None,
+    current_user: User = Depends(get_current_user),
+    token_payload: dict = Depends(get_token_payload)
+):
+    """Logout user: revokes the access token (and the refresh token, if sent)"""
+    
+    revocation_list.revoke_token(token_payload)
+    if body:
+        try:
+            refresh_payload = jwt.decode(body.refresh_token, Config.JWT_SECRET_KEY,
+                                         algorithms=[Config.JWT_ALGORITHM])
+        except jwt.PyJWTError:
+            refresh_payload = None
+        if refresh_payload and refresh_payload.get("sub") == current_user.id:
+            revocation_list.revoke_token(refresh_payload)
     
     db = get_session()
     
@@ -605,4 +740,6 @@ async def delete_account(
     db.commit()
     db.close()
     
+    revocation_list.revoke_user(current_user.id)
+    
     return {"message": "Account marked for deletion. Data will be retained for legal compliance."}
@@ -13,7 +13,12 @@ from email.mime.multipart import MIMEMultipart
 
 from src.models import User, get_session
 from src.config import Config
-from api.auth import get_current_user, generate_crypto_key, generate_z_protocol_consent_key
+from api.auth import (
+    get_current_user, generate_crypto_key, generate_z_protocol_consent_key,
+    create_access_token, create_refresh_token, access_token_claims, ACCESS_TOKEN_EXPIRES_IN
+)
+from src.key_index import set_user_keys
+from src.token_revocation import revocation_list
 
 router = APIRouter()
 
@@ -323,27 +328,35 @@ async def generate_new_keys(current_user: User = Depends(get_current_user)):
     db = get_session()
     
     try:
+        # current_user is detached - load the row in this session so the update is persisted
+        user = db.query(User).filter(User.id == current_user.id).first()
+        
         # Generate new crypto key
-        new_crypto_key = generate_crypto_key(current_user.username)
+        new_crypto_key = generate_crypto_key(user.username)
         
         # Generate new Z Protocol key
         new_z_protocol_key = generate_z_protocol_consent_key(
-            current_user.id, current_user.consent_record
+            user.id, user.consent_record
         )
         
-        # Update user with new keys
-        current_user.crypto_key = new_crypto_key
-        current_user.z_protocol_consent_key = new_z_protocol_key
-        current_user.updated_at = datetime.utcnow()
+        # Update user with new keys (and their index digests)
+        set_user_keys(user, new_crypto_key, new_z_protocol_key)
+        user.updated_at = datetime.utcnow()
         
         db.commit()
         db.close()
         
+        # Sessions opened with the old keys end here; this one continues on fresh tokens
+        revocation_list.revoke_user(user.id)
+        
         return {
             "success": True,
             "message": "New keys generated successfully",
             "crypto_key": new_crypto_key,
-            "z_protocol_consent_key": new_z_protocol_key
+            "z_protocol_consent_key": new_z_protocol_key,
+            "access_token": create_access_token(data=access_token_claims(user)),
+            "refresh_token": create_refresh_token(user.id),
+            "expires_in": ACCESS_TOKEN_EXPIRES_IN
         }
     
     except Exception as e:
@@ -8,8 +8,7 @@ from fastapi import APIRouter, HTTPException, Depends, Request, Response, status
 from pydantic import BaseModel, EmailStr
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-import json
+from typing import Dict, List, Optional, Union
 import io
 import csv
 import secrets
@@ -17,6 +16,11 @@ import secrets
 from src.models import User, WisdomDrop, ConsentRecord, AuditLog, get_session
 from api.auth import get_current_user, log_audit
 from src.compliance import TermsOfServiceV2, ConsentManagementV2
+from src.user_aggregates import record_deletion
+from src.responses import APIResponse, dumps_json
+from src.http_cache import cached_response, drop_versions, strong_etag
+from src.token_revocation import revocation_list
+from src.pagination import InvalidCursor, clamp_limit, estimate_count, page_total, paginate
 
 router = APIRouter()
 tos_manager = TermsOfServiceV2()
@@ -67,7 +71,7 @@ def anonymize_user_data(user: User) -> Dict:
 
 def generate_data_export(user: User, db: Session, export_format: str, 
                         include_wisdom: bool, include_revenue: bool, 
-                        include_audit: bool) -> str:
+                        include_audit: bool) -> Union[str, bytes]:
     """Generate complete data export for user"""
     
     export_data = {
@@ -87,8 +91,8 @@ def generate_data_export(user: User, db: Session, export_format: str,
     
     # Export wisdom drops
     if include_wisdom:
-        from src.models import WisdomDrop
-        wisdom_drops = db.query(WisdomDrop).filter(
+        from src.models import WisdomDrop, LOAD_LAYERS, LOAD_DISTILLATION
+        wisdom_drops = db.query(WisdomDrop).options(LOAD_LAYERS, LOAD_DISTILLATION).filter(
             WisdomDrop.user_id == user.id
         ).all()
         
@@ -179,41 +183,55 @@ def generate_data_export(user: User, db: Session, export_format: str,
         return output.getvalue()
     else:
         # JSON format
-        return json.dumps(export_data, indent=2)
+        return dumps_json(export_data, indent=True)
 
 # ==================== API Endpoints ====================
 
 @router.get("/terms-of-service")
 async def get_terms_of_service(
+    request: Request,
     jurisdiction: str = "Malaysia"
 ):
-    """Get current Terms of Service"""
-    
-    terms = tos_manager.get_regional_terms(jurisdiction)
+    """Get current Terms of Service (cacheable, ETag from version and jurisdiction)"""
+    
+    def build():
+        return {
+            "version": tos_manager.version,
+            "effective_date": tos_manager.effective_date,
+            "jurisdiction": jurisdiction,
+            "terms_text": tos_manager.get_regional_terms(jurisdiction),
+            "consent_required": True
+        }
     
-    return {
-        "version": tos_manager.version,
-        "effective_date": tos_manager.effective_date,
-        "jurisdiction": jurisdiction,
-        "terms_text": terms,
-        "consent_required": True
-    }
+    return cached_response(
+        request,
+        strong_etag("terms", tos_manager.version, tos_manager.effective_date, jurisdiction),
+        build,
+        last_modified=datetime.fromisoformat(tos_manager.effective_date)
+    )
 
 @router.get("/consent-requirements")
 async def get_consent_requirements(
+    request: Request,
     jurisdiction: str = "Malaysia"
 ):
-    """Get required consents for jurisdiction"""
-    
-    consent_form = consent_manager.generate_consent_form(jurisdiction)
+    """Get required consents for jurisdiction (cacheable, ETag from version and jurisdiction)"""
+    
+    def build():
+        consent_form = consent_manager.generate_consent_form(jurisdiction)
+        return {
+            "version": consent_manager.version,
+            "jurisdiction": jurisdiction,
+            "required_consents": [c for c in consent_form if c["required"]],
+            "optional_consents": [c for c in consent_form if not c["required"]],
+            "total_required": sum(1 for c in consent_form if c["required"])
+        }
     
-    return {
-        "version": consent_manager.version,
-        "jurisdiction": jurisdiction,
-        "required_consents": [c for c in consent_form if c["required"]],
-        "optional_consents": [c for c in consent_form if not c["required"]],
-        "total_required": sum(1 for c in consent_form if c["required"])
-    }
+    return cached_response(
+        request,
+        strong_etag("consent-requirements", consent_manager.version, jurisdiction),
+        build
+    )
 
 @router.get("/my-consents")
 async def get_my_consents(
@@ -386,6 +404,10 @@ async def request_data_deletion(
             drop.user_id = anonymization_data["anonymized_id"]
             drop.attribution_text = f"Wisdom by {anonymization_data['preserved_attribution']} (Anonymized)"
         
+        # Published drops moved to the anonymized id no longer count for this account
+        record_deletion(db, user)
+        drop_versions.forget(*(drop.id for drop in wisdom_drops))
+        
         # Mark user as deleted
         user.account_status = "deleted"
         user.email = f"deleted_{user.id}@deleted.com"
@@ -395,6 +417,8 @@ async def request_data_deletion(
     else:
         # Full deletion including wisdom
         db.query(WisdomDrop).filter(WisdomDrop.user_id == current_user.id).delete()
+        record_deletion(db, user)
+        drop_versions.forget_user(current_user.id)
         
         # Mark user as deleted
         user.account_status = "deleted"
@@ -413,6 +437,8 @@ async def request_data_deletion(
     db.commit()
     db.close()
     
+    revocation_list.revoke_user(current_user.id)
+    
     return {
         "message": message,
         "deletion_date": datetime.utcnow().isoformat(),
@@ -479,23 +505,44 @@ async def check_compliance_status(
 async def get_audit_trail(
     current_user: User = Depends(get_current_user),
     limit: int = 50,
-    action_type: Optional[str] = None
+    action_type: Optional[str] = None,
+    cursor: Optional[str] = None
 ):
-    """Get user's audit trail"""
-    
+    """Get user's audit trail, newest first, one keyset page at a time"""
+
     db = get_session()
-    
-    query = db.query(AuditLog).filter(AuditLog.user_id == current_user.id)
-    
+
+    query = db.query(
+        AuditLog.id,
+        AuditLog.action,
+        AuditLog.action_type,
+        AuditLog.entity_type,
+        AuditLog.entity_id,
+        AuditLog.ip_address,
+        AuditLog.created_at
+    ).filter(AuditLog.user_id == current_user.id)
+
     if action_type:
         query = query.filter(AuditLog.action_type == action_type)
-    
-    audit_logs = query.order_by(AuditLog.created_at.desc()).limit(limit).all()
-    
+
+    try:
+        audit_logs, next_cursor = paginate(
+            query, AuditLog.created_at, AuditLog.id, cursor, clamp_limit(limit)
+        )
+    except InvalidCursor as e:
+        db.close()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    estimate = estimate_count(db, query) if (next_cursor or cursor) else None
+    total, total_is_estimate = page_total(audit_logs, cursor, next_cursor, estimate)
+
     db.close()
-    
-    return {
+
+    return APIResponse({
         "total_records": len(audit_logs),
+        "total": total,
+        "total_is_estimate": total_is_estimate,
+        "next_cursor": next_cursor,
         "audit_trail": [
             {
                 "id": log.id,
@@ -504,11 +551,11 @@ async def get_audit_trail(
                 "entity_type": log.entity_type,
                 "entity_id": log.entity_id,
                 "ip_address": log.ip_address,
-                "created_at": log.created_at.isoformat()
+                "created_at": log.created_at
             }
             for log in audit_logs
         ]
-    }
+    })
 
 def get_consent_implications(consent_type: str) -> List[str]:
     """Get implications of withdrawing consent"""
@@ -15,6 +15,11 @@ import secrets
 from src.models import User, WisdomDrop, RevenueRecord, UsageRecord, get_session
 from api.auth import get_current_user, log_audit
 from src.config import Config
+from src.scoring_config import get_scoring_config
+from src.user_aggregates import record_usage, published_drop_count
+from src.responses import APIResponse
+from src.http_cache import drop_versions
+from src.pagination import InvalidCursor, clamp_limit, paginate
 
 router = APIRouter()
 
@@ -71,33 +76,13 @@ def calculate_usage_revenue(wisdom_drop: WisdomDrop, usage_type: str, user: User
     # Apply quality multiplier
     quality_multiplier = wisdom_drop.quality_score / 100.0
     
-    # Apply cultural multiplier
-    cultural_multipliers = {
-        'Malaysian': 1.6,
-        'Malaysian Chinese': 1.6,
-        'Hokkien': 1.7,
-        'Southeast Asian': 1.3,
-        'Kampung': 1.4,
-        'Indigenous': 1.4,
-        'Global South': 1.15,
-        'Global': 1.0
-    }
+    scoring = get_scoring_config()
     
-    cultural_multiplier = cultural_multipliers.get(
-        wisdom_drop.cultural_context,
-        1.0
-    )
+    # Apply cultural multiplier
+    cultural_multiplier = scoring.cultural_multiplier(wisdom_drop.cultural_context)
     
     # Apply Z Protocol tier multiplier
-    tier_multipliers = {
-        "Diamond": 1.5,
-        "Platinum": 1.3,
-        "Gold": 1.2,
-        "Silver": 1.1,
-        "Bronze": 1.0
-    }
-    
-    tier_multiplier = tier_multipliers.get(user.z_protocol_tier, 1.0)
+    tier_multiplier = scoring.tier_multipliers.get(user.z_protocol_tier, 1.0)
     
     # Calculate gross revenue
     gross_revenue = base_rate * quality_multiplier * cultural_multiplier * tier_multiplier
@@ -135,21 +120,20 @@ async def report_usage(
     
     db = get_session()
     
-    # Get wisdom drop
-    wisdom_drop = db.query(WisdomDrop).filter(
+    # Get wisdom drop and its contributor in one query (locked for the earnings update)
+    row = db.query(WisdomDrop, User).join(User, User.id == WisdomDrop.user_id).filter(
         WisdomDrop.id == usage_data.wisdom_drop_id,
         WisdomDrop.published == True
-    ).first()
+    ).with_for_update().first()
     
-    if not wisdom_drop:
+    if not row:
         db.close()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wisdom drop not found or not published"
         )
     
-    # Get user
-    user = db.query(User).filter(User.id == wisdom_drop.user_id).first()
+    wisdom_drop, user = row
     
     # Calculate revenue
     revenue_amount = calculate_usage_revenue(wisdom_drop, usage_data.usage_type, user)
@@ -185,9 +169,8 @@ async def report_usage(
     wisdom_drop.times_accessed += 1
     wisdom_drop.revenue_generated += revenue_amount
     
-    # Update user earnings
-    user.pending_earnings += revenue_amount
-    user.total_earnings += revenue_amount
+    # Update user earnings (pending and lifetime)
+    record_usage(user, revenue_amount)
     
     # Log usage
     log_audit(db, user.id, "REVENUE_GENERATED", "create",
@@ -196,6 +179,7 @@ async def report_usage(
              request)
     
     db.commit()
+    drop_versions.forget(wisdom_drop.id)
     
     # Check if attribution was included
     if not usage_data.attribution_included:
@@ -276,7 +260,7 @@ async def get_revenue_analytics(
         "next_tier_requirements": get_next_tier_requirements(current_user)
     }
     
-    return {
+    return APIResponse({
         "total_earnings": current_user.total_earnings,
         "pending_earnings": current_user.pending_earnings,
         "paid_earnings": current_user.total_earnings - current_user.pending_earnings,
@@ -291,14 +275,14 @@ async def get_revenue_analytics(
         ],
         "revenue_trend": [
             {
-                "date": trend.date.isoformat() if trend.date else None,
+                "date": trend.date,  # date on PostgreSQL, ISO string on SQLite
                 "revenue": trend.revenue
             }
             for trend in revenue_trend
         ],
         "tier_info": tier_info,
         "payment_threshold_reached": check_payment_threshold(current_user)
-    }
+    })
 
 @router.post("/request-payment")
 async def request_payment(
@@ -366,17 +350,20 @@ async def request_payment(
 @router.get("/payment-history")
 async def get_payment_history(
     current_user: User = Depends(get_current_user),
-    limit: int = 10
+    limit: int = 10,
+    cursor: Optional[str] = None
 ):
-    """Get payment history for current user"""
-    
+    """Get payment history for current user, newest first, one keyset page at a time"""
+
     db = get_session()
-    
+
+    payment_date = func.min(RevenueRecord.payment_date).label('payment_date')
+
     # Get unique payment transactions
-    payments = db.query(
+    query = db.query(
         RevenueRecord.transaction_id,
         func.sum(RevenueRecord.amount).label('amount'),
-        func.min(RevenueRecord.payment_date).label('payment_date'),
+        payment_date,
         func.min(RevenueRecord.payment_method).label('payment_method'),
         func.min(RevenueRecord.payment_status).label('payment_status')
     ).filter(
@@ -384,18 +371,26 @@ async def get_payment_history(
         RevenueRecord.transaction_id != None
     ).group_by(
         RevenueRecord.transaction_id
-    ).order_by(
-        func.min(RevenueRecord.payment_date).desc()
-    ).limit(limit).all()
-    
+    )
+
+    try:
+        # Keyset on the aggregated (payment_date, transaction_id), so the condition goes in HAVING
+        payments, next_cursor = paginate(
+            query, payment_date, RevenueRecord.transaction_id, cursor, clamp_limit(limit), having=True
+        )
+    except InvalidCursor as e:
+        db.close()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
     db.close()
-    
-    return {
+
+    return APIResponse({
+        "next_cursor": next_cursor,
         "payments": [
             {
                 "transaction_id": payment.transaction_id,
                 "amount": payment.amount,
-                "payment_date": payment.payment_date.isoformat() if payment.payment_date else None,
+                "payment_date": payment.payment_date,
                 "payment_method": payment.payment_method,
                 "status": payment.payment_status
             }
@@ -403,7 +398,7 @@ async def get_payment_history(
         ],
         "total_paid": current_user.total_earnings - current_user.pending_earnings,
         "pending_amount": current_user.pending_earnings
-    }
+    })
 
 @router.get("/tier-progress")
 async def get_tier_progress(
@@ -411,48 +406,28 @@ async def get_tier_progress(
 ):
     """Get progress towards next revenue tier"""
     
-    db = get_session()
-    
-    # Count published wisdom drops
-    published_drops = db.query(WisdomDrop).filter(
-        WisdomDrop.user_id == current_user.id,
-        WisdomDrop.published == True
-    ).count()
-    
-    db.close()
-    
-    # Define tier requirements
-    tier_requirements = {
-        "Bronze": {"min_score": 0, "min_drops": 0, "revenue_share": 30},
-        "Silver": {"min_score": 60, "min_drops": 5, "revenue_share": 35},
-        "Gold": {"min_score": 75, "min_drops": 15, "revenue_share": 40},
-        "Platinum": {"min_score": 85, "min_drops": 30, "revenue_share": 45},
-        "Diamond": {"min_score": 95, "min_drops": 50, "revenue_share": 50}
-    }
+    # Published count is a stored aggregate, no scan of the drop table
+    published_drops = published_drop_count(current_user)
     
     current_tier = current_user.z_protocol_tier
-    tier_order = ["Bronze", "Silver", "Gold", "Platinum", "Diamond"]
-    current_index = tier_order.index(current_tier)
+    next_tier = get_scoring_config().next_tier(current_tier)
     
     next_tier_info = None
-    if current_index < len(tier_order) - 1:
-        next_tier = tier_order[current_index + 1]
-        next_requirements = tier_requirements[next_tier]
-        
+    if next_tier:
         next_tier_info = {
-            "tier_name": next_tier,
+            "tier_name": next_tier.name,
             "requirements": {
-                "z_protocol_score_needed": next_requirements["min_score"],
-                "wisdom_drops_needed": next_requirements["min_drops"],
-                "revenue_share": next_requirements["revenue_share"]
+                "z_protocol_score_needed": next_tier.min_score,
+                "wisdom_drops_needed": next_tier.min_drops,
+                "revenue_share": next_tier.revenue_share
             },
             "current_progress": {
                 "z_protocol_score": current_user.z_protocol_score,
                 "wisdom_drops": published_drops
             },
             "progress_percentage": min(
-                (current_user.z_protocol_score / next_requirements["min_score"]) * 50 +
-                (published_drops / next_requirements["min_drops"]) * 50,
+                threshold_progress(current_user.z_protocol_score, next_tier.min_score) * 50 +
+                threshold_progress(published_drops, next_tier.min_drops) * 50,
                 100
             )
         }
@@ -466,21 +441,16 @@ async def get_tier_progress(
         "next_tier": next_tier_info
     }
 
+def threshold_progress(value: float, threshold: float) -> float:
+    """Fraction of a tier requirement reached (a zero threshold is already met)"""
+    return (value or 0) / threshold if threshold > 0 else 1.0
+
 def get_next_tier_requirements(user: User) -> Dict:
     """Helper function to get next tier requirements"""
     
-    tier_order = ["Bronze", "Silver", "Gold", "Platinum", "Diamond"]
-    tier_requirements = {
-        "Silver": {"min_score": 60, "min_drops": 5},
-        "Gold": {"min_score": 75, "min_drops": 15},
-        "Platinum": {"min_score": 85, "min_drops": 30},
-        "Diamond": {"min_score": 95, "min_drops": 50}
-    }
-    
-    current_index = tier_order.index(user.z_protocol_tier)
+    next_tier = get_scoring_config().next_tier(user.z_protocol_tier)
     
-    if current_index >= len(tier_order) - 1:
+    if not next_tier:
         return {"message": "Maximum tier achieved!"}
     
-    next_tier = tier_order[current_index + 1]
-    return tier_requirements.get(next_tier, {})
+    return {"min_score": next_tier.min_score, "min_drops": next_tier.min_drops}
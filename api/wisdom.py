@@ -6,21 +6,31 @@ Handles wisdom drop creation, distillation, and publication
 
 from fastapi import APIRouter, HTTPException, Depends, Request, status
 from pydantic import BaseModel, validator
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Load, Session
+from sqlalchemy import insert
 from datetime import datetime
 from typing import Dict, List, Optional
 import hashlib
 import secrets
 
-from src.models import User, WisdomDrop, UsageRecord, ZProtocolValidation, get_session, generate_wisdom_id
+from src.models import (User, WisdomDrop, UsageRecord, ZProtocolValidation, LOAD_LAYERS, LOAD_DISTILLATION,
+                        get_session, generate_wisdom_id)
 from api.auth import get_current_user, log_audit
 from src.five_prompt_toolkit import FivePromptToolkit
 from src.z_protocol_enhanced import ZProtocolValidator
+from src.scoring_config import get_scoring_config
+from src.user_aggregates import published_drop_count, record_publish
+from src.responses import APIResponse
+from src.http_cache import PRIVATE_REVALIDATE, cache_headers, drop_versions, is_not_modified, not_modified
+from src.pagination import DEFAULT_PAGE_SIZE, InvalidCursor, clamp_limit, estimate_count, page_total, paginate
 
 router = APIRouter()
 toolkit = FivePromptToolkit()
 z_validator = ZProtocolValidator()
 
+MAX_BATCH_PUBLISH = 500
+
+
 # ==================== Pydantic Models ====================
 
 class WisdomDropCreate(BaseModel):
@@ -88,6 +98,20 @@ class WisdomDropPublish(BaseModel):
             raise ValueError('All confirmations must be accepted before publishing')
         return v
 
+class WisdomDropBatchPublish(WisdomDropPublish):
+    """Publish many wisdom drops in one request"""
+    wisdom_ids: List[str]
+    reject_early: bool = True
+    
+    @validator('wisdom_ids')
+    def validate_wisdom_ids(cls, v):
+        v = list(dict.fromkeys(v))
+        if not v:
+            raise ValueError('Provide at least one wisdom drop id')
+        if len(v) > MAX_BATCH_PUBLISH:
+            raise ValueError(f'At most {MAX_BATCH_PUBLISH} wisdom drops can be published per request')
+        return v
+
 # ==================== Helper Functions ====================
 
 def generate_attribution_hash(wisdom_drop: WisdomDrop) -> str:
@@ -104,10 +128,9 @@ def generate_attribution_hash(wisdom_drop: WisdomDrop) -> str:
     attribution_string = f"{data['author_id']}:{data['title']}:{data['timestamp']}:{data['layers_hash']}"
     return hashlib.sha256(attribution_string.encode()).hexdigest()
 
-async def validate_with_z_protocol(wisdom_drop: WisdomDrop, user: User) -> Dict:
-    """Validate wisdom drop with Z Protocol"""
-    
-    validation_data = {
+def build_validation_data(wisdom_drop: WisdomDrop, user: User) -> Dict:
+    """Z Protocol validation input for a wisdom drop"""
+    return {
         "consent_record": user.consent_record,
         "attribution": {
             "contributor_id": user.id,
@@ -148,8 +171,39 @@ async def validate_with_z_protocol(wisdom_drop: WisdomDrop, user: User) -> Dict:
             }
         }
     }
-    
-    return await z_validator.validate_wisdom_drop(validation_data)
+
+async def validate_with_z_protocol(wisdom_drop: WisdomDrop, user: User) -> Dict:
+    """Validate wisdom drop with Z Protocol"""
+    validation_data = build_validation_data(wisdom_drop, user)
+    return await z_validator.validate_wisdom_drop(validation_data, consent_version=user.consent_version)
+
+def z_validation_values(wisdom_id: str, validation_result: Dict) -> Dict:
+    """Column values for a ZProtocolValidation record"""
+    details = validation_result['validation_details']
+    return {
+        "id": f"ZVAL_{secrets.token_hex(8).upper()}",
+        "wisdom_drop_id": wisdom_id,
+        "consent_score": details.get('consent', {}).get('score', 0),
+        "attribution_score": details.get('attribution', {}).get('score', 0),
+        "authenticity_score": details.get('authenticity', {}).get('score', 0),
+        "dignity_score": details.get('dignity', {}).get('score', 0),
+        "transparency_score": details.get('transparency', {}).get('score', 0),
+        "legal_score": details.get('legal', {}).get('score', 0),
+        "audit_score": details.get('audit', {}).get('score', 0),
+        "total_score": validation_result['z_protocol_score'],
+        "certification_status": validation_result['certification'],
+        "validation_details": details,
+        "failures": validation_result.get('failures', []),
+        "warnings": validation_result.get('warnings', [])
+    }
+
+def mark_published(wisdom_drop: WisdomDrop, z_protocol_score: float, published_at: datetime):
+    """Flag a validated wisdom drop as published"""
+    wisdom_drop.published = True
+    wisdom_drop.published_at = published_at
+    wisdom_drop.status = "published"
+    wisdom_drop.moderation_status = "approved"
+    wisdom_drop.z_protocol_score = z_protocol_score
 
 def calculate_revenue_potential(wisdom_drop: WisdomDrop) -> float:
     """Calculate revenue potential based on quality and cultural context"""
@@ -158,22 +212,8 @@ def calculate_revenue_potential(wisdom_drop: WisdomDrop) -> float:
     # Quality multiplier
     quality_multiplier = wisdom_drop.quality_score / 100.0
     
-    # Cultural multiplier based on toolkit configuration
-    cultural_multipliers = {
-        'Malaysian': 1.5,
-        'Malaysian Chinese': 1.6,
-        'Hokkien': 1.7,
-        'Southeast Asian': 1.3,
-        'Kampung': 1.4,
-        'Indigenous': 1.4,
-        'Global South': 1.15,
-        'Global': 1.0
-    }
-    
-    cultural_multiplier = cultural_multipliers.get(
-        wisdom_drop.cultural_context,
-        1.0
-    )
+    # Cultural multiplier from the shared scoring configuration
+    cultural_multiplier = get_scoring_config().cultural_multiplier(wisdom_drop.cultural_context)
     
     # Distillation bonus
     distillation_bonus = 1.2 if wisdom_drop.distillation_completed else 1.0
@@ -262,8 +302,8 @@ async def complete_distillation(
     
     db = get_session()
     
-    # Get wisdom drop
-    wisdom_drop = db.query(WisdomDrop).filter(
+    # Get wisdom drop (layers feed the quality score / Z Protocol validation)
+    wisdom_drop = db.query(WisdomDrop).options(LOAD_LAYERS).filter(
         WisdomDrop.id == wisdom_id,
         WisdomDrop.user_id == current_user.id
     ).first()
@@ -327,19 +367,24 @@ async def publish_wisdom_drop(
     
     db = get_session()
     
-    # Get wisdom drop
-    wisdom_drop = db.query(WisdomDrop).filter(
+    # Get wisdom drop (layers feed the quality score / Z Protocol validation) and, in the
+    # same query, its owner's row locked for the aggregate update (also guards double publish)
+    row = db.query(WisdomDrop, User).options(Load(WisdomDrop).undefer_group("layers")).join(
+        User, User.id == WisdomDrop.user_id
+    ).filter(
         WisdomDrop.id == wisdom_id,
         WisdomDrop.user_id == current_user.id
-    ).first()
+    ).with_for_update().first()
     
-    if not wisdom_drop:
+    if not row:
         db.close()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wisdom drop not found"
         )
     
+    wisdom_drop, owner = row
+    
     if not wisdom_drop.distillation_completed:
         db.close()
         raise HTTPException(
@@ -358,22 +403,7 @@ async def publish_wisdom_drop(
     validation_result = await validate_with_z_protocol(wisdom_drop, current_user)
     
     # Save validation record
-    z_validation = ZProtocolValidation(
-        id=f"ZVAL_{secrets.token_hex(8).upper()}",
-        wisdom_drop_id=wisdom_id,
-        consent_score=validation_result['validation_details'].get('consent', {}).get('score', 0),
-        attribution_score=validation_result['validation_details'].get('attribution', {}).get('score', 0),
-        authenticity_score=validation_result['validation_details'].get('authenticity', {}).get('score', 0),
-        dignity_score=validation_result['validation_details'].get('dignity', {}).get('score', 0),
-        transparency_score=validation_result['validation_details'].get('transparency', {}).get('score', 0),
-        legal_score=validation_result['validation_details'].get('legal', {}).get('score', 0),
-        audit_score=validation_result['validation_details'].get('audit', {}).get('score', 0),
-        total_score=validation_result['z_protocol_score'],
-        certification_status=validation_result['certification'],
-        validation_details=validation_result['validation_details'],
-        failures=validation_result.get('failures', []),
-        warnings=validation_result.get('warnings', [])
-    )
+    z_validation = ZProtocolValidation(**z_validation_values(wisdom_id, validation_result))
     
     db.add(z_validation)
     
@@ -387,45 +417,11 @@ async def publish_wisdom_drop(
             headers={"X-Validation-Failures": ", ".join(validation_result.get('failures', []))}
         )
     
+    # Update user's Z Protocol score (rolling average) from stored aggregates
+    record_publish(db, current_user.id, [validation_result['z_protocol_score']], owner)
+    
     # Publish wisdom drop
-    wisdom_drop.published = True
-    wisdom_drop.published_at = datetime.utcnow()
-    wisdom_drop.status = "published"
-    wisdom_drop.moderation_status = "approved"
-    wisdom_drop.z_protocol_score = validation_result['z_protocol_score']
-    
-    # Update user's Z Protocol score (rolling average)
-    user = db.query(User).filter(User.id == current_user.id).first()
-    current_drops = db.query(WisdomDrop).filter(
-        WisdomDrop.user_id == current_user.id,
-        WisdomDrop.published == True
-    ).count()
-    
-    if current_drops > 0:
-        user.z_protocol_score = (
-            (user.z_protocol_score * (current_drops - 1) + wisdom_drop.z_protocol_score) / 
-            current_drops
-        )
-    else:
-        user.z_protocol_score = wisdom_drop.z_protocol_score
-    
-    # Update user tier based on new score
-    if user.z_protocol_score >= 95:
-        user.z_protocol_tier = "Diamond"
-        user.revenue_tier = "Diamond"
-        user.revenue_share_percentage = 50.0
-    elif user.z_protocol_score >= 85:
-        user.z_protocol_tier = "Platinum"
-        user.revenue_tier = "Platinum"
-        user.revenue_share_percentage = 45.0
-    elif user.z_protocol_score >= 75:
-        user.z_protocol_tier = "Gold"
-        user.revenue_tier = "Gold"
-        user.revenue_share_percentage = 40.0
-    elif user.z_protocol_score >= 60:
-        user.z_protocol_tier = "Silver"
-        user.revenue_tier = "Silver"
-        user.revenue_share_percentage = 35.0
+    mark_published(wisdom_drop, validation_result['z_protocol_score'], datetime.utcnow())
     
     # Log publication
     log_audit(db, current_user.id, "WISDOM_PUBLISH", "update",
@@ -448,30 +444,169 @@ async def publish_wisdom_drop(
         "message": f"Wisdom drop published successfully! Z Protocol Score: {wisdom_drop.z_protocol_score}/100"
     }
 
-@router.get("/my-drops")
-async def get_my_wisdom_drops(
-    current_user: User = Depends(get_current_user),
-    status: Optional[str] = None,
-    published: Optional[bool] = None
+@router.post("/publish-batch")
+async def publish_wisdom_drops_batch(
+    publish_data: WisdomDropBatchPublish,
+    request: Request,
+    current_user: User = Depends(get_current_user)
 ):
-    """Get all wisdom drops for current user"""
+    """Publish many wisdom drops with one batched Z Protocol validation pass"""
     
     db = get_session()
     
-    query = db.query(WisdomDrop).filter(WisdomDrop.user_id == current_user.id)
+    # Load every requested drop in one query, locked (in id order) so overlapping
+    # batches or a single publish can't publish the same drop twice
+    drops = {
+        drop.id: drop for drop in db.query(WisdomDrop).options(LOAD_LAYERS).filter(
+            WisdomDrop.id.in_(publish_data.wisdom_ids),
+            WisdomDrop.user_id == current_user.id
+        ).order_by(WisdomDrop.id).with_for_update().all()
+    }
     
-    if status:
-        query = query.filter(WisdomDrop.status == status)
+    results = {}
+    candidates = []
+    for wisdom_id in publish_data.wisdom_ids:
+        drop = drops.get(wisdom_id)
+        if not drop:
+            results[wisdom_id] = {"id": wisdom_id, "published": False, "error": "Wisdom drop not found"}
+        elif not drop.distillation_completed:
+            results[wisdom_id] = {"id": wisdom_id, "published": False,
+                                  "error": "Please complete Deep Vibe Distillation before publishing"}
+        elif drop.published:
+            results[wisdom_id] = {"id": wisdom_id, "published": False, "error": "Wisdom drop already published"}
+        else:
+            candidates.append(drop)
+    
+    # Validate all candidates in one call
+    validations = await z_validator.validate_batch(
+        [build_validation_data(drop, current_user) for drop in candidates],
+        reject_early=publish_data.reject_early,
+        consent_versions=[current_user.consent_version] * len(candidates)
+    )
     
-    if published is not None:
-        query = query.filter(WisdomDrop.published == published)
+    # Re-check under the lock before writing: where FOR UPDATE is a no-op (SQLite),
+    # another request may have published some of these while validation ran
+    if candidates:
+        already_published = {
+            wisdom_id for wisdom_id, in db.query(WisdomDrop.id).filter(
+                WisdomDrop.id.in_([drop.id for drop in candidates]),
+                WisdomDrop.published == True
+            ).with_for_update()
+        }
+        for wisdom_id in already_published:
+            results[wisdom_id] = {"id": wisdom_id, "published": False, "error": "Wisdom drop already published"}
+        kept = [(drop, validation) for drop, validation in zip(candidates, validations)
+                if drop.id not in already_published]
+        candidates = [drop for drop, _ in kept]
+        validations = [validation for _, validation in kept]
+    
+    if candidates:
+        db.execute(insert(ZProtocolValidation), [
+            z_validation_values(drop.id, validation)
+            for drop, validation in zip(candidates, validations)
+        ])
+    
+    published = [
+        (drop, validation) for drop, validation in zip(candidates, validations)
+        if validation['z_protocol_score'] >= 80
+    ]
+    
+    user = None
+    if published:
+        user = record_publish(
+            db, current_user.id, [validation['z_protocol_score'] for _, validation in published]
+        )
+        published_at = datetime.utcnow()
+        for drop, validation in published:
+            mark_published(drop, validation['z_protocol_score'], published_at)
+    
+    for drop, validation in zip(candidates, validations):
+        passed = validation['z_protocol_score'] >= 80
+        results[drop.id] = {
+            "id": drop.id,
+            "title": drop.title,
+            "published": passed,
+            "z_protocol_score": validation['z_protocol_score'],
+            "certification": validation['certification'],
+            "revenue_potential": drop.revenue_potential if passed else None,
+            "failures": validation.get('failures', [])
+        }
     
-    wisdom_drops = query.order_by(WisdomDrop.created_at.desc()).all()
+    # Log publication
+    log_audit(db, current_user.id, "WISDOM_PUBLISH_BATCH", "update",
+             "wisdom_drop", None,
+             {
+                 "requested": len(publish_data.wisdom_ids),
+                 "published": [drop.id for drop, _ in published],
+                 "rejected": [drop.id for drop, v in zip(candidates, validations) if v['z_protocol_score'] < 80]
+             },
+             request)
     
+    db.commit()
     db.close()
     
+    published_count = len(published)
     return {
-        "total": len(wisdom_drops),
+        "requested": len(publish_data.wisdom_ids),
+        "published": published_count,
+        "failed": len(publish_data.wisdom_ids) - published_count,
+        "results": [results[wisdom_id] for wisdom_id in publish_data.wisdom_ids],
+        "z_protocol_score": user.z_protocol_score if user else current_user.z_protocol_score,
+        "z_protocol_tier": user.z_protocol_tier if user else current_user.z_protocol_tier,
+        "message": f"Published {published_count} of {len(publish_data.wisdom_ids)} wisdom drops"
+    }
+
+@router.get("/my-drops")
+async def get_my_wisdom_drops(
+    current_user: User = Depends(get_current_user),
+    status: Optional[str] = None,
+    published: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE
+):
+    """
+    Get wisdom drops for current user, newest first, one keyset page at a time.
+    published_drop_count and total_earnings cover every drop, not just this page.
+    """
+
+    db = get_session()
+
+    # Summary rows only, never the layer or distillation text
+    query = WisdomDrop.summary_query(db).filter(WisdomDrop.user_id == current_user.id)
+
+    if status:
+        query = query.filter(WisdomDrop.status == status)
+
+    if published is not None:
+        query = query.filter(WisdomDrop.published == published)
+
+    try:
+        wisdom_drops, next_cursor = paginate(
+            query, WisdomDrop.created_at, WisdomDrop.id, cursor, clamp_limit(limit)
+        )
+    except InvalidCursor as e:
+        db.close()
+        # `status` is shadowed by the filter parameter here
+        raise HTTPException(status_code=400, detail=str(e))
+
+    estimate = None
+    if next_cursor or cursor:
+        if published and not status and current_user.published_drop_count is not None:
+            estimate = current_user.published_drop_count
+        else:
+            estimate = estimate_count(db, query)
+    total, total_is_estimate = page_total(wisdom_drops, cursor, next_cursor, estimate)
+
+    db.close()
+
+    # Returned as a response instance so orjson encodes the rows directly
+    return APIResponse({
+        "total": total,
+        "total_is_estimate": total_is_estimate,
+        "next_cursor": next_cursor,
+        # Stored per-user aggregates, so no scan of the user's drops
+        "published_drop_count": published_drop_count(current_user),
+        "total_earnings": current_user.total_earnings or 0.0,
         "wisdom_drops": [
             {
                 "id": drop.id,
@@ -484,22 +619,28 @@ async def get_my_wisdom_drops(
                 "z_protocol_score": drop.z_protocol_score,
                 "revenue_potential": drop.revenue_potential,
                 "revenue_generated": drop.revenue_generated,
-                "created_at": drop.created_at.isoformat()
+                "created_at": drop.created_at
             }
             for drop in wisdom_drops
         ]
-    }
+    })
 
 @router.get("/{wisdom_id}")
 async def get_wisdom_drop(
     wisdom_id: str,
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
-    """Get detailed wisdom drop information"""
+    """Get detailed wisdom drop information (published drops are revalidated by ETag)"""
+    
+    # Known, unchanged published drop: answer 304 without querying it
+    version = drop_versions.get(wisdom_id)
+    if version and version.user_id == current_user.id and is_not_modified(request, version.etag, version.last_modified):
+        return not_modified(version.etag, version.last_modified, PRIVATE_REVALIDATE)
     
     db = get_session()
     
-    wisdom_drop = db.query(WisdomDrop).filter(
+    wisdom_drop = db.query(WisdomDrop).options(LOAD_LAYERS, LOAD_DISTILLATION).filter(
         WisdomDrop.id == wisdom_id,
         WisdomDrop.user_id == current_user.id
     ).first()
@@ -513,7 +654,7 @@ async def get_wisdom_drop(
     
     db.close()
     
-    return {
+    body = {
         "id": wisdom_drop.id,
         "title": wisdom_drop.title,
         "experience_title": wisdom_drop.experience_title,
@@ -540,3 +681,11 @@ async def get_wisdom_drop(
         "attribution_hash": wisdom_drop.attribution_hash,
         "created_at": wisdom_drop.created_at.isoformat()
     }
+    
+    if not wisdom_drop.published:
+        return body
+    
+    version = drop_versions.remember(wisdom_drop)
+    if is_not_modified(request, version.etag, version.last_modified):
+        return not_modified(version.etag, version.last_modified, PRIVATE_REVALIDATE)
+    return APIResponse(body, headers=cache_headers(version.etag, version.last_modified, PRIVATE_REVALIDATE))
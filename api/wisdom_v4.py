@@ -1,6 +1,7 @@
 # 🚀 YSense Platform v4.0 - AI-Powered Wisdom API
 
 from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, validator
 from sqlalchemy.orm import Session
 from datetime import datetime
@@ -8,14 +9,19 @@ from typing import Dict, List, Optional, Any
 import asyncio
 import hashlib
 import secrets
+import json
+import time
 
 from src.models import User, WisdomDrop, get_session, generate_wisdom_id
 from api.auth import get_current_user, log_audit
 from src.orchestrator_v4 import YSenseOrchestrator
+from src.layer_analyzer import LayerAnalyzer
 from src.z_protocol_v2_validator import z_protocol_validator
+from src.admission import AdmissionRejected, analysis_admission
 
 router = APIRouter()
 orchestrator = YSenseOrchestrator()
+layer_analyzer = LayerAnalyzer()
 
 # ==================== Pydantic Models ====================
 
@@ -95,8 +101,9 @@ async def analyze_story(story_input: StoryInput, request: Request,
             "z_protocol_tier": current_user.z_protocol_tier
         }
         
-        # Process story with orchestrator
-        results = await orchestrator.process_story(story_input.story, user_context)
+        # Process story with orchestrator (bounded per worker; sheds with 503 when saturated)
+        async with analysis_admission.slot():
+            results = await orchestrator.process_story(story_input.story, user_context)
         
         # Get agent feedback
         agent_feedback = orchestrator.get_agent_feedback(results)
@@ -125,6 +132,9 @@ async def analyze_story(story_input: StoryInput, request: Request,
             recommendations=recommendations
         )
     
+    except AdmissionRejected:
+        db.close()
+        raise
     except Exception as e:
         db.close()
         raise HTTPException(
@@ -132,6 +142,97 @@ async def analyze_story(story_input: StoryInput, request: Request,
             detail=f"AI analysis failed: {str(e)}"
         )
 
+@router.post("/analyze-story/stream")
+async def analyze_story_stream(story_input: StoryInput, request: Request,
+                               current_user: User = Depends(get_current_user)):
+    """Analyze user story with AI, streaming layer tokens as Server-Sent Events"""
+    
+    user_context = {
+        "user_id": current_user.id,
+        "username": current_user.username,
+        "cultural_context": story_input.cultural_context,
+        "jurisdiction": current_user.jurisdiction,
+        "age": current_user.age,
+        "z_protocol_tier": current_user.z_protocol_tier
+    }
+    
+    # Shed before the stream starts when the queue is already full
+    analysis_admission.ensure_capacity()
+    
+    async def event_stream():
+        start_time = time.time()
+        prompt_versions = {}
+        
+        try:
+            admitted = await analysis_admission.acquire()
+        except AdmissionRejected as e:
+            yield _sse("error", {"detail": str(e), "retry_after": e.retry_after})
+            return
+        
+        ok = False
+        layers = None
+        try:
+            # Stream the Five-Layer extraction token by token
+            async for event in layer_analyzer.stream_analysis(
+                story_input.story,
+                author=current_user.username,
+                cultural_context=story_input.cultural_context
+            ):
+                if event["event"] == "complete":
+                    wisdom = event["wisdom_drop"]
+                    layers = wisdom["layers"]
+                    prompt_versions = wisdom.get("prompt_versions", {})
+                    event = {
+                        "event": "layers_complete",
+                        "layers": wisdom["layers"],
+                        "quality_score": wisdom["quality_score"],
+                        "revenue_potential": wisdom["revenue_potential"]
+                    }
+                yield _sse(event["event"], event)
+            
+            # Agent review runs once the layers are on screen, on those same layers
+            results = await orchestrator.process_story(story_input.story, user_context, layers=layers)
+            
+            db = get_session()
+            try:
+                log_audit(db, current_user.id, "AI_STORY_ANALYSIS", "create", 
+                         "wisdom", "AI_ANALYSIS", {
+                             "story_length": len(story_input.story),
+                             "cultural_context": story_input.cultural_context,
+                             "overall_score": results["overall_score"],
+                             "streamed": True,
+                             "prompt_versions": prompt_versions,
+                             "time_total": round(time.time() - start_time, 3)
+                         }, request)
+            finally:
+                db.close()
+            
+            yield _sse("result", AIAnalysisResponse(
+                success=True,
+                story=story_input.story,
+                layers=results["layers"],
+                agent_feedback=orchestrator.get_agent_feedback(results),
+                overall_score=results["overall_score"],
+                processing_time=results["processing_time"],
+                status=results["status"],
+                recommendations=_generate_recommendations(results)
+            ).dict())
+            ok = True
+        
+        except Exception as e:
+            yield _sse("error", {"detail": f"AI analysis failed: {str(e)}"})
+        finally:
+            analysis_admission.release(admitted, ok)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering so tokens flush immediately
+        }
+    )
+
 @router.post("/review-layers")
 async def review_layers(review: WisdomReview, request: Request,
                        current_user: User = Depends(get_current_user)):
@@ -201,7 +302,8 @@ async def create_wisdom_drop(
             "z_protocol_tier": current_user.z_protocol_tier
         }
         
-        analysis_results = await orchestrator.process_story(story_input.story, user_context)
+        async with analysis_admission.slot():
+            analysis_results = await orchestrator.process_story(story_input.story, user_context)
         
         # Step 2: Apply user edits
         final_layers = analysis_results["layers"].copy()
@@ -315,6 +417,9 @@ async def create_wisdom_drop(
             "audit_data": audit_data
         }
     
+    except AdmissionRejected:
+        db.close()
+        raise
     except Exception as e:
         db.close()
         raise HTTPException(
@@ -348,7 +453,7 @@ async def get_analysis_history(current_user: User = Depends(get_current_user)):
     
     try:
         # Get recent wisdom drops created with AI
-        wisdom_drops = db.query(WisdomDrop).filter(
+        wisdom_drops = WisdomDrop.summary_query(db, WisdomDrop.completeness).filter(
             WisdomDrop.user_id == current_user.id,
             WisdomDrop.status == "complete"
         ).order_by(WisdomDrop.created_at.desc()).limit(10).all()
@@ -382,6 +487,10 @@ async def get_analysis_history(current_user: User = Depends(get_current_user)):
 
 # ==================== Helper Functions ====================
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
 def _generate_recommendations(results: Dict[str, Any]) -> List[str]:
     """Generate recommendations based on analysis results"""
     recommendations = []
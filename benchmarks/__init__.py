@@ -0,0 +1 @@
+# YSense Platform v4.0 - Benchmarks Package
\ No newline at end of file
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+YSense Platform v4.0 - Bulk Registration Throughput Benchmark
+Registers N synthetic users through the chunked import pipeline and through the
+per-user /register write path (uniqueness SELECT, ORM inserts, commit per user)
+into fresh databases and reports rows/second for each.
+
+Usage:
+    python -m benchmarks.bulk_registration_bench --users 10000
+    python -m benchmarks.bulk_registration_bench --users 50000 --database-url postgresql://.../bench
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine
+
+from api.auth import UserRegistration, build_registration_rows
+from src.bulk_registration import BulkRegistrationImporter, read_registrations
+from src.models import AuditLog, Base, ConsentRecord, User, generate_audit_id, get_session
+
+def registration_lines(count: int, prefix: str) -> Iterator[str]:
+    """NDJSON registrations, with every 50th row duplicating an earlier username"""
+    for i in range(count):
+        n = i - 1 if i % 50 == 49 else i
+        yield json.dumps({
+            "username": f"{prefix}_user_{n}",
+            "email": f"{prefix}_user_{n}@partner.example",
+            "age": 18 + i % 60,
+            "jurisdiction": "Malaysia" if i % 2 else "Singapore",
+            "cultural_context": "Malaysian",
+            "consent_data_collection": True,
+            "consent_commercial_use": True,
+            "consent_ai_training": True,
+            "consent_revenue_sharing": True,
+            "consent_attribution": True,
+            "consent_terms": True
+        }) + "\n"
+
+def fresh_engine(database_url: str):
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+def run_bulk(engine, count: int, chunk_size: int) -> Dict:
+    importer = BulkRegistrationImporter(chunk_size=chunk_size, session_factory=lambda: get_session(engine))
+    start = time.perf_counter()
+    for outcome in importer.run(read_registrations(registration_lines(count, "bulk"), "ndjson")):
+        pass
+    seconds = time.perf_counter() - start
+    return {"seconds": round(seconds, 3), "rows_per_second": round(count / seconds, 1), **importer.stats}
+
+def run_per_user(engine, count: int) -> Dict:
+    """The /register write pattern, one transaction per user"""
+    created = duplicate = 0
+    db = get_session(engine)
+    start = time.perf_counter()
+    for line in registration_lines(count, "single"):
+        registration = UserRegistration(**json.loads(line))
+        existing = db.query(User).filter(
+            (User.username == registration.username) | (User.email == registration.email)
+        ).first()
+        if existing:
+            duplicate += 1
+            continue
+        rows = build_registration_rows(registration)
+        db.add(User(**rows["user"]))
+        for consent in rows["consents"]:
+            db.add(ConsentRecord(**consent))
+        user_id = rows["user"]["id"]
+        db.add(AuditLog(id=generate_audit_id(user_id, "USER_REGISTRATION"), user_id=user_id,
+                        action="USER_REGISTRATION", action_type="create", entity_type="user", entity_id=user_id))
+        db.commit()
+        created += 1
+    seconds = time.perf_counter() - start
+    db.close()
+    return {"seconds": round(seconds, 3), "rows_per_second": round(count / seconds, 1),
+            "created": created, "duplicate": duplicate}
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk registration throughput benchmark")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite file (tables are dropped!)")
+    parser.add_argument("--skip-per-user", action="store_true", help="Only run the bulk pipeline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{tmp}/bulk_bench.db"
+
+        print(f"👥 Registering {args.users} users (chunk size {args.chunk_size})")
+        bulk = run_bulk(fresh_engine(database_url), args.users, args.chunk_size)
+        print(f"   bulk import : {bulk['rows_per_second']:>10,.1f} rows/s  ({bulk['seconds']}s, "
+              f"{bulk['created']} created, {bulk['duplicate']} duplicate)")
+
+        if not args.skip_per_user:
+            single = run_per_user(fresh_engine(database_url), args.users)
+            print(f"   per-user    : {single['rows_per_second']:>10,.1f} rows/s  ({single['seconds']}s, "
+                  f"{single['created']} created, {single['duplicate']} duplicate)")
+            print(f"   speedup     : {single['seconds'] / bulk['seconds']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+# benchmarks/conftest.py
+"""
+YSense Platform v4.0 - Benchmark Configuration
+Makes the repo root importable and tags saved pytest-benchmark runs with the git revision
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# load_test.py is a CLI driver, not a test module
+collect_ignore = ["load_test.py"]
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_benchmark_update_machine_info(config, machine_info):
+    """Record the commit being measured so saved runs can be compared across commits"""
+    try:
+        machine_info["git_revision"] = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        machine_info["git_revision"] = None
@@ -0,0 +1,83 @@
+# benchmarks/corpora.py
+"""
+YSense Platform v4.0 - Benchmark Corpora
+Fixed short/long/multilingual stories and layer sets so scoring benchmarks are comparable across commits
+"""
+
+from typing import Dict
+
+SHORT_STORY = (
+    "My grandmother taught me patience while making rendang. I learned that some things "
+    "cannot be rushed."
+)
+
+LONG_STORY = " ".join([
+    "In my kampung, grandmother teaches patience through making rendang.",
+    "Six hours of slow cooking, she says, cannot be rushed by modern flames.",
+    "Each stir carries generations of wisdom - the paste darkens like memories deepening with time.",
+    "When the monsoon came we gathered in the community hall because the river had risen,",
+    "and the elders shared traditional stories of ancestral floods and the ceremony of thanks afterwards.",
+    "I felt fear, then joy, then a quiet growth I only understood years later.",
+    "Specifically, we built a raft from bamboo and created a rota so every family was fed.",
+    "The universal principle I realized is that resilience is a community practice, not a personal trait.",
+    "This insight shaped my leadership, my teaching and my decision-making at work.",
+] * 6)
+
+MULTILINGUAL_STORY = (
+    "Nenek saya selalu berkata, 'biar lambat asalkan selamat'. 外婆做年糕的时候总是说，慢慢来，"
+    "心急吃不了热豆腐。In Hokkien we say 'ài piàⁿ chiah ē iâⁿ' - you must strive to win. "
+    "Di kampung, kami belajar tentang gotong-royong; 在槟城的老街，邻居们互相帮忙。"
+    "I learned that tradition and heritage live in the small rituals of everyday cooking, "
+    "and that the truth of community is felt, not explained."
+)
+
+STORIES: Dict[str, str] = {
+    "short": SHORT_STORY,
+    "long": LONG_STORY,
+    "multilingual": MULTILINGUAL_STORY
+}
+
+def analyzer_layers(story: str) -> Dict[str, str]:
+    """Five-Layer Perception layers (LayerAnalyzer shape) derived deterministically from a story"""
+    sentences = [s.strip() for s in story.replace("。", ".").split(".") if s.strip()]
+
+    def pick(start: int) -> str:
+        chosen = sentences[start::5]
+        return ". ".join(chosen) + "." if chosen else story
+
+    return {
+        "surface": pick(0),
+        "emotional": pick(1),
+        "contextual": pick(2),
+        "wisdom": pick(3),
+        "cultural": pick(4)
+    }
+
+def toolkit_layers(story: str) -> Dict[str, str]:
+    """5-Prompt Toolkit layers (narrative/somatic/...) derived deterministically from a story"""
+    layers = analyzer_layers(story)
+    return {
+        "narrative": layers["surface"],
+        "somatic": layers["emotional"],
+        "attention": layers["contextual"],
+        "synesthetic": layers["cultural"],
+        "temporal_auditory": layers["wisdom"]
+    }
+
+def toolkit_drop(story: str, distilled: bool = True) -> Dict:
+    """Toolkit-style wisdom drop dict used by _calculate_final_quality"""
+    return {
+        "layers": toolkit_layers(story),
+        "distillation_completed": distilled,
+        "vibe_words": ["Patience", "Warmth", "Memory"] if distilled else [],
+        "personal_connection": "It is how my grandmother taught me to wait" if distilled else None,
+        "essence": "Patience: Warmth of Memory" if distilled else None
+    }
+
+def analyzer_drop(story: str) -> Dict:
+    """LayerAnalyzer-style wisdom drop dict used by _generate_attribution_hash"""
+    return {
+        "author": "bench_author",
+        "timestamp": "2025-01-01T00:00:00",
+        "raw_content": story
+    }
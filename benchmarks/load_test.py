@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+YSense Platform v4.0 - End-to-End Load Test
+Drives the main API endpoints (and MCP query_wisdom) at a fixed concurrency and
+reports throughput, p50/p95/p99 latency and DB query counts per endpoint as JSON.
+
+Usage:
+    # Seed once, then run in-process against the seeded database
+    python -m benchmarks.seed_data --scale 10k --database-url sqlite:///bench_10k.db
+    python -m benchmarks.load_test --database-url sqlite:///bench_10k.db \
+        --manifest benchmarks/results/manifest_10k.json --concurrency 16 --requests 500
+
+    # Or against a running server (no query counts)
+    python -m benchmarks.load_test --base-url http://localhost:8004 --manifest ...
+
+For realistic analysis latency run scripts/llm_stub_server.py and set USE_LLM_STUB=true.
+
+In-process runs turn the rate limiter off and pin admission control to a fixed
+limit (--admission-limit) so the numbers measure the endpoints, not the
+throttles (--with-rate-limit keeps the limiter on). A remote server runs with
+its own config: start it with RATE_LIMIT_ENABLED=false for comparable results.
+Either way 429 (rate limited) and 503 (shed) responses are counted separately
+and left out of the latency percentiles.
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+ENDPOINTS = ["register", "login", "analyze_story", "create_wisdom_drop",
+             "report_usage", "analytics", "my_drops", "mcp_query_wisdom"]
+
+STORY = (
+    "In my kampung, grandmother teaches patience through making rendang. Six hours of slow "
+    "cooking, she says, cannot be rushed by modern flames. Each stir carries generations of "
+    "wisdom - the paste darkens like memories deepening with time. I learned that some "
+    "processes honor the journey, not just the destination."
+)
+
+# Per-request DB query counter, propagated into the app when running in-process
+_query_counter: contextvars.ContextVar = contextvars.ContextVar("bench_query_counter", default=None)
+
+def install_query_counter():
+    """Count every cursor execution made while a request is being driven"""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter = _query_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+# ==================== Results ====================
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(rank, 1)) - 1]
+
+@dataclass
+class EndpointStats:
+    name: str
+    latencies_ms: List[float] = field(default_factory=list)
+    query_counts: List[int] = field(default_factory=list)
+    statuses: Dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+    rate_limited: int = 0
+    shed: int = 0
+    wall_seconds: float = 0.0
+
+    def record(self, latency_ms: float, status: str, queries: Optional[int]):
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        # Throttled responses return almost instantly; keep them out of the percentiles
+        if status == "429":
+            self.rate_limited += 1
+            return
+        if status == "503":
+            self.shed += 1
+            return
+        self.latencies_ms.append(latency_ms)
+        if not status.startswith("2"):
+            self.errors += 1
+        if queries is not None:
+            self.query_counts.append(queries)
+
+    def summary(self) -> Dict:
+        lat = sorted(self.latencies_ms)
+        count = len(lat)
+        sent = sum(self.statuses.values())
+        result = {
+            "requests": sent,
+            "served": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "rate_limited": self.rate_limited,
+            "rate_limited_rate": round(self.rate_limited / sent, 4) if sent else 0.0,
+            "shed": self.shed,
+            "shed_rate": round(self.shed / sent, 4) if sent else 0.0,
+            "statuses": self.statuses,
+            "throughput_rps": round(count / self.wall_seconds, 2) if self.wall_seconds else 0.0,
+            "latency_ms": {
+                "mean": round(sum(lat) / count, 2) if count else 0.0,
+                "p50": round(percentile(lat, 50), 2),
+                "p95": round(percentile(lat, 95), 2),
+                "p99": round(percentile(lat, 99), 2),
+                "max": round(lat[-1], 2) if lat else 0.0
+            }
+        }
+        if self.query_counts:
+            queries = sorted(self.query_counts)
+            result["db_queries"] = {
+                "mean": round(sum(queries) / len(queries), 2),
+                "p50": percentile(queries, 50),
+                "max": queries[-1],
+                "total": sum(queries)
+            }
+        return result
+
+# ==================== Scenarios ====================
+
+class LoadContext:
+    """Shared state for scenarios: manifest users, tokens, drop ids"""
+
+    def __init__(self, manifest: Dict, run_id: str, rng: random.Random):
+        self.users = manifest["users"]
+        self.drop_ids = manifest["published_drop_ids"]
+        self.run_id = run_id
+        self.rng = rng
+        self.tokens: Dict[str, str] = {}
+        self.register_counter = 0
+        self.mcp_server = None
+
+    def user(self) -> Dict:
+        return self.rng.choice(self.users)
+
+    def auth_headers(self) -> Dict[str, str]:
+        user_id = self.rng.choice(list(self.tokens))
+        return {"Authorization": f"Bearer {self.tokens[user_id]}"}
+
+Scenario = Callable[[httpx.AsyncClient, LoadContext], Awaitable[str]]
+
+async def _register(client, ctx):
+    ctx.register_counter += 1
+    name = f"load_{ctx.run_id}_{ctx.register_counter}"
+    response = await client.post("/api/v3/auth/register", json={
+        "username": name, "email": f"{name}@load.ysense.ai", "age": 30,
+        "consent_data_collection": True, "consent_commercial_use": True,
+        "consent_ai_training": True, "consent_revenue_sharing": True,
+        "consent_attribution": True, "consent_terms": True
+    })
+    return str(response.status_code)
+
+async def _login(client, ctx):
+    user = ctx.user()
+    response = await client.post("/api/v3/auth/login", json={
+        "username_or_email": user["username"] if ctx.rng.random() < 0.5 else user["email"],
+        "crypto_key": user["crypto_key"]
+    })
+    return str(response.status_code)
+
+async def _analyze_story(client, ctx):
+    response = await client.post("/api/v4/wisdom/analyze-story", headers=ctx.auth_headers(), json={
+        "story": STORY, "cultural_context": "Malaysian", "language": "en"
+    })
+    return str(response.status_code)
+
+async def _create_wisdom_drop(client, ctx):
+    response = await client.post("/api/v4/wisdom/create-wisdom-drop", headers=ctx.auth_headers(), json={
+        "story_input": {"story": STORY, "experience_title": f"Load {ctx.rng.random():.8f}",
+                        "cultural_context": "Malaysian", "language": "en"},
+        "review": {"layers": {}, "user_edits": {}, "approved": True},
+        "vibe_input": {"vibe_words": ["patience", "memory", "fire"],
+                       "vibe_words_explanation": "These words hold the rhythm of the kitchen",
+                       "personal_connection": "It is how my grandmother taught me to wait"}
+    })
+    return str(response.status_code)
+
+async def _report_usage(client, ctx):
+    response = await client.post("/api/v3/revenue/report-usage", json={
+        "wisdom_drop_id": ctx.rng.choice(ctx.drop_ids),
+        "usage_type": ctx.rng.choice(["ai_training", "research", "commercial"]),
+        "usage_context": "load-test",
+        "client_id": f"load_client_{ctx.rng.randrange(20)}",
+        "attribution_included": True
+    })
+    return str(response.status_code)
+
+async def _analytics(client, ctx):
+    response = await client.get("/api/v3/revenue/analytics", headers=ctx.auth_headers())
+    return str(response.status_code)
+
+async def _my_drops(client, ctx):
+    response = await client.get("/api/v3/wisdom/my-drops", headers=ctx.auth_headers())
+    return str(response.status_code)
+
+async def _mcp_query_wisdom(client, ctx):
+    # MCP has no HTTP transport; call the server in-process
+    from src.rate_limit import RateLimitExceeded
+    if ctx.mcp_server is None:
+        from core.mcp_integration import YSenseMCPServer
+        ctx.mcp_server = YSenseMCPServer()
+    try:
+        result = await ctx.mcp_server.execute_tool("query_wisdom", {
+            "query": ctx.rng.choice(["patience", "rendang", "river", "harmony", "monsoon"]),
+            "min_quality_score": 60
+        })
+    except RateLimitExceeded:
+        return "429"
+    return "500" if "error" in result else "200"
+
+SCENARIOS: Dict[str, Scenario] = {
+    "register": _register,
+    "login": _login,
+    "analyze_story": _analyze_story,
+    "create_wisdom_drop": _create_wisdom_drop,
+    "report_usage": _report_usage,
+    "analytics": _analytics,
+    "my_drops": _my_drops,
+    "mcp_query_wisdom": _mcp_query_wisdom
+}
+
+# ==================== Driver ====================
+
+async def _timed(scenario: Scenario, client, ctx, stats: EndpointStats, count_queries: bool):
+    counter = [0] if count_queries else None
+    token = _query_counter.set(counter)
+    start = time.perf_counter()
+    try:
+        status = await scenario(client, ctx)
+    except Exception as e:
+        status = f"exception:{type(e).__name__}"
+    finally:
+        _query_counter.reset(token)
+    stats.record((time.perf_counter() - start) * 1000, status, counter[0] if counter else None)
+
+async def run_endpoint(name: str, client, ctx, requests: int, concurrency: int,
+                       count_queries: bool) -> EndpointStats:
+    stats = EndpointStats(name)
+    scenario = SCENARIOS[name]
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            await _timed(scenario, client, ctx, stats, count_queries)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    stats.wall_seconds = time.perf_counter() - start
+    return stats
+
+async def warm_up_tokens(client, ctx, users: int):
+    """Log a sample of seeded users in once so authenticated endpoints have tokens"""
+    for user in ctx.users[:users]:
+        response = await client.post("/api/v3/auth/login", json={
+            "username_or_email": user["username"], "crypto_key": user["crypto_key"]
+        })
+        if response.status_code == 200:
+            ctx.tokens[user["user_id"]] = response.json()["access_token"]
+    if not ctx.tokens:
+        raise RuntimeError("Could not log in any seeded user - was the database seeded with this manifest?")
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+def configure_throttles(args) -> Dict:
+    """
+    In-process only: rate limiter off (unless --with-rate-limit) and a fixed
+    admission limit with room to queue every worker, so nothing is shed
+    """
+    limit = str(args.admission_limit or args.concurrency)
+    settings = {
+        "RATE_LIMIT_ENABLED": "true" if args.with_rate_limit else "false",
+        "ADMISSION_INITIAL_LIMIT": limit,
+        "ADMISSION_MIN_LIMIT": limit,
+        "ADMISSION_MAX_LIMIT": limit,
+        "ADMISSION_MAX_QUEUE": str(args.concurrency),
+        "ADMISSION_QUEUE_TIMEOUT_SECONDS": str(args.timeout)
+    }
+    os.environ.update(settings)
+    return settings
+
+async def run_suite(args) -> Dict:
+    manifest = json.loads(Path(args.manifest).read_text())
+    ctx = LoadContext(manifest, run_id=datetime.utcnow().strftime("%H%M%S%f"), rng=random.Random(args.seed))
+
+    in_process = not args.base_url
+    server_config = None
+    if in_process:
+        # Config reads these at import time
+        os.environ["DATABASE_URL"] = args.database_url
+        server_config = configure_throttles(args)
+        install_query_counter()
+        from src.main import app
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout)
+    else:
+        print("⚠️ Remote target: rate limiting and admission follow the server's config; "
+              "429s and 503s are reported separately")
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+
+    endpoints = args.endpoints.split(",") if args.endpoints else ENDPOINTS
+    results = {}
+    async with client:
+        await warm_up_tokens(client, ctx, args.token_users)
+        for name in endpoints:
+            requests = args.llm_requests if name in ("analyze_story", "create_wisdom_drop") else args.requests
+            print(f"⏱️  {name}: {requests} requests @ concurrency {args.concurrency}")
+            stats = await run_endpoint(name, client, ctx, requests, args.concurrency, in_process)
+            results[name] = stats.summary()
+            lat = results[name]["latency_ms"]
+            print(f"   {results[name]['throughput_rps']} req/s  p50={lat['p50']}ms  "
+                  f"p95={lat['p95']}ms  p99={lat['p99']}ms  errors={results[name]['errors']}  "
+                  f"429={results[name]['rate_limited']}  503={results[name]['shed']}")
+
+    return {
+        "suite": "ysense-e2e-load",
+        "timestamp": datetime.utcnow().isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "mode": "in-process" if in_process else "remote",
+        "target": args.base_url or args.database_url,
+        "scale": manifest.get("scale"),
+        "concurrency": args.concurrency,
+        "llm_stub": os.getenv("USE_LLM_STUB", "false").lower() == "true",
+        "server_config": server_config,
+        "endpoints": results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="YSense end-to-end load test")
+    parser.add_argument("--manifest", required=True, help="Manifest written by benchmarks.seed_data")
+    parser.add_argument("--database-url", default="sqlite:///bench_10k.db")
+    parser.add_argument("--base-url", default=None, help="Drive a running server instead of in-process")
+    parser.add_argument("--endpoints", default=None, help=f"Comma separated subset of {','.join(ENDPOINTS)}")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--llm-requests", type=int, default=50, help="Requests for the LLM-backed endpoints")
+    parser.add_argument("--token-users", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--with-rate-limit", action="store_true",
+                        help="Keep the per-client rate limiter on (in-process runs)")
+    parser.add_argument("--admission-limit", type=int, default=None,
+                        help="Fixed concurrent analysis limit (in-process runs; default: --concurrency)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None, help="JSON report path")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_suite(args))
+
+    output = Path(args.output or f"benchmarks/results/load_{report['scale']}_{datetime.utcnow():%Y%m%d_%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"✅ Report written to {output}")
+
+if __name__ == "__main__":
+    main()
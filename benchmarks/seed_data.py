@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+YSense Platform v4.0 - Benchmark Dataset Seeder
+Seeds a realistic, reproducible dataset (users, wisdom drops, revenue, usage,
+consent and audit rows) at 10k / 100k / 1M wisdom-drop scale.
+
+Usage:
+    python -m benchmarks.seed_data --scale 10k --database-url sqlite:///bench_10k.db
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine
+
+from src.key_index import key_index_values
+from src.models import (
+    Base, User, WisdomDrop, RevenueRecord, UsageRecord, AuditLog, ConsentRecord
+)
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+CULTURES = [
+    ("Malaysian", 0.30), ("Southeast Asian", 0.15), ("Malaysian Chinese", 0.08),
+    ("Hokkien", 0.04), ("Kampung", 0.05), ("Indigenous", 0.05),
+    ("Global South", 0.08), ("Global", 0.25)
+]
+
+WORDS = (
+    "grandmother taught patience kampung rendang slow cooking generations wisdom "
+    "memory river morning market community harmony tradition learned realized "
+    "insight lesson principle truth felt emotions journey challenge growth because "
+    "when where circumstances heritage values customs ancestral ceremony teaching "
+    "learning innovation leadership respect gratitude family rhythm rain monsoon "
+    "village elders stories listened sizzle spices hands fire smoke laughter"
+).split()
+
+CONSENT_TYPES = ["data_collection", "commercial_use", "ai_training",
+                 "revenue_sharing", "attribution", "terms"]
+
+def _dashed(hex_string: str, group: int) -> str:
+    return '-'.join(hex_string[i:i + group] for i in range(0, len(hex_string), group))
+
+def _text(rng: random.Random, min_words: int, max_words: int) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + "."
+
+def _culture(rng: random.Random) -> str:
+    roll = rng.random()
+    for name, share in CULTURES:
+        roll -= share
+        if roll <= 0:
+            return name
+    return "Global"
+
+class DatasetSeeder:
+    """Generates rows deterministically from a seed and bulk-inserts them in chunks"""
+
+    def __init__(self, database_url: str, scale: int, seed: int = 42,
+                 chunk_size: int = 5000, layer_words: int = 60):
+        self.engine = create_engine(database_url)
+        self.scale = scale
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.layer_words = layer_words
+        self.user_count = max(scale // 20, 100)
+        self.now = datetime.utcnow()
+
+    def user_credentials(self, index: int) -> Dict[str, str]:
+        digest = hashlib.sha256(f"{self.seed}:user:{index}".encode()).hexdigest()
+        return {
+            "user_id": f"USER_B{index:09d}",
+            "username": f"bench_user_{index}",
+            "email": f"bench_user_{index}@bench.ysense.ai",
+            "crypto_key": _dashed(digest[:32], 4),
+            "z_protocol_consent_key": _dashed(digest[24:64], 5)
+        }
+
+    def _users(self, rng: random.Random) -> Iterator[Dict]:
+        for i in range(self.user_count):
+            creds = self.user_credentials(i)
+            created = self.now - timedelta(days=rng.uniform(30, 730))
+            consent_record = {c: True for c in CONSENT_TYPES}
+            consent_record.update({"timestamp": created.isoformat(), "version": "2.0"})
+            yield {
+                "id": creds["user_id"],
+                "email": creds["email"],
+                "username": creds["username"],
+                "crypto_key": creds["crypto_key"],
+                "jurisdiction": rng.choice(["Malaysia", "Singapore", "EU", "UK"]),
+                "age_verified": True,
+                "age": rng.randint(18, 80),
+                "consent_signature": hashlib.sha256(f"{creds['user_id']}:consent".encode()).hexdigest(),
+                "consent_timestamp": created,
+                "consent_version": "2.0",
+                "consent_record": consent_record,
+                "z_protocol_id": f"ZP_B{i:09d}",
+                "z_protocol_score": round(rng.uniform(0, 100), 1),
+                "z_protocol_tier": "Bronze",
+                "z_protocol_consent_key": creds["z_protocol_consent_key"],
+                **key_index_values(creds["crypto_key"], creds["z_protocol_consent_key"]),
+                "revenue_tier": "Bronze",
+                "revenue_share_percentage": 30.0,
+                "total_earnings": 0.0,
+                "pending_earnings": 0.0,
+                # Left unset so the first publish backfills them from the seeded drops
+                "published_drop_count": None,
+                "z_protocol_score_sum": None,
+                "attribution_id": f"ATTR_B{i:09d}",
+                "attribution_name": creds["username"],
+                "cultural_context": _culture(rng),
+                "created_at": created,
+                "updated_at": created,
+                "last_active": created,
+                "account_status": "active"
+            }
+
+    def _consents(self, rng: random.Random) -> Iterator[Dict]:
+        for i in range(self.user_count):
+            user_id = f"USER_B{i:09d}"
+            for consent_type in CONSENT_TYPES:
+                yield {
+                    "id": f"CONSENT_B{i:09d}_{consent_type}",
+                    "user_id": user_id,
+                    "consent_type": consent_type,
+                    "consent_given": True,
+                    "consent_text": f"I consent to {consent_type.replace('_', ' ')}",
+                    "consent_version": "2.0",
+                    "consent_method": "checkbox",
+                    "consent_signature": hashlib.sha256(f"{user_id}:{consent_type}".encode()).hexdigest(),
+                    "given_at": self.now - timedelta(days=rng.uniform(30, 730))
+                }
+
+    def _drops(self, rng: random.Random) -> Iterator[Dict]:
+        lw = self.layer_words
+        for i in range(self.scale):
+            user_index = int(rng.paretovariate(1.2)) % self.user_count  # a few heavy contributors
+            created = self.now - timedelta(days=rng.uniform(0, 365), seconds=rng.randint(0, 86400))
+            published = rng.random() < 0.7
+            distilled = published or rng.random() < 0.5
+            yield {
+                "id": f"DROP_B{i:010d}",
+                "user_id": f"USER_B{user_index:09d}",
+                "title": _text(rng, 3, 8)[:80],
+                "experience_title": None,
+                "layer_narrative": _text(rng, lw // 2, lw * 2),
+                "layer_somatic": _text(rng, lw // 2, lw * 2),
+                "layer_attention": _text(rng, lw // 2, lw * 2),
+                "layer_synesthetic": _text(rng, lw // 2, lw * 2),
+                "layer_temporal_auditory": _text(rng, lw // 2, lw * 2),
+                "vibe_words": [rng.choice(WORDS) for _ in range(3)] if distilled else None,
+                "vibe_words_explanation": _text(rng, 10, 30) if distilled else None,
+                "personal_connection": _text(rng, 10, 40) if distilled else None,
+                "essence": _text(rng, 5, 20) if distilled else None,
+                "distillation_completed": distilled,
+                "cultural_context": _culture(rng),
+                "cultural_multiplier": 1.0,
+                "language": rng.choice(["en", "ms", "zh", "ta"]),
+                "quality_score": round(rng.uniform(40, 100), 1),
+                "z_protocol_score": round(rng.uniform(60, 100), 1),
+                "completeness": {"layers": 5, "distillation": distilled},
+                "attribution_hash": hashlib.sha256(f"{self.seed}:drop:{i}".encode()).hexdigest(),
+                "attribution_text": f"Wisdom by bench_user_{user_index} via YSense™",
+                "revenue_potential": round(rng.uniform(10, 150), 2),
+                "times_accessed": 0,
+                "revenue_generated": 0.0,
+                "status": "published" if published else ("complete" if distilled else "awaiting_distillation"),
+                "moderation_status": "approved" if published else "pending",
+                "published": published,
+                "created_at": created,
+                "updated_at": created,
+                "published_at": created + timedelta(hours=1) if published else None
+            }
+
+    def _revenue_and_usage(self, rng: random.Random):
+        """Usage events against drops, each with its revenue row"""
+        for i in range(self.scale):
+            drop_index = rng.randrange(self.scale)
+            user_index = rng.randrange(self.user_count)
+            created = self.now - timedelta(days=rng.uniform(0, 180))
+            amount = round(rng.uniform(0.01, 0.5), 2)
+            usage_type = rng.choice(["ai_training", "research", "commercial", "educational"])
+            paid = rng.random() < 0.4
+            usage = {
+                "id": f"USAGE_B{i:010d}",
+                "wisdom_drop_id": f"DROP_B{drop_index:010d}",
+                "usage_type": usage_type,
+                "usage_context": "benchmark",
+                "client_id": f"client_{rng.randrange(50)}",
+                "attribution_included": True,
+                "revenue_generated": amount,
+                "created_at": created
+            }
+            revenue = {
+                "id": f"REV_B{i:010d}",
+                "user_id": f"USER_B{user_index:09d}",
+                "wisdom_drop_id": f"DROP_B{drop_index:010d}",
+                "amount": amount,
+                "currency": "EUR",
+                "revenue_type": usage_type,
+                "payment_status": "paid" if paid else "pending",
+                "payment_date": created + timedelta(days=7) if paid else None,
+                "payment_method": "bank_transfer" if paid else None,
+                "transaction_id": f"PAY_B{user_index:09d}_{created.month:02d}" if paid else None,
+                "created_at": created
+            }
+            yield usage, revenue
+
+    def _audits(self, rng: random.Random) -> Iterator[Dict]:
+        actions = [("USER_LOGIN", "access"), ("WISDOM_CREATED", "create"),
+                   ("WISDOM_PUBLISHED", "update"), ("REVENUE_GENERATED", "create")]
+        for i in range(self.scale):
+            action, action_type = rng.choice(actions)
+            yield {
+                "id": f"AUDIT_B{i:010d}",
+                "user_id": f"USER_B{rng.randrange(self.user_count):09d}",
+                "action": action,
+                "action_type": action_type,
+                "entity_type": "wisdom",
+                "entity_id": f"DROP_B{rng.randrange(self.scale):010d}",
+                "ip_address": "127.0.0.1",
+                "user_agent": "ysense-bench",
+                "audit_metadata": {"seed": self.seed},
+                "created_at": self.now - timedelta(days=rng.uniform(0, 365))
+            }
+
+    def _insert(self, table, rows: Iterator[Dict]) -> int:
+        total = 0
+        chunk: List[Dict] = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                with self.engine.begin() as conn:
+                    conn.execute(table.insert(), chunk)
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            with self.engine.begin() as conn:
+                conn.execute(table.insert(), chunk)
+            total += len(chunk)
+        return total
+
+    def seed_all(self) -> Dict:
+        """Create tables and insert every entity; returns row counts and timings"""
+        Base.metadata.create_all(bind=self.engine)
+        rng = random.Random(self.seed)
+        stats = {}
+
+        for name, table, rows in [
+            ("users", User.__table__, self._users(rng)),
+            ("consent_records", ConsentRecord.__table__, self._consents(rng)),
+            ("wisdom_drops", WisdomDrop.__table__, self._drops(rng)),
+        ]:
+            start = time.perf_counter()
+            stats[name] = {"rows": self._insert(table, rows)}
+            stats[name]["seconds"] = round(time.perf_counter() - start, 2)
+            print(f"🌱 {name}: {stats[name]['rows']:,} rows in {stats[name]['seconds']}s")
+
+        start = time.perf_counter()
+        # Regenerate the same stream for each table instead of holding row pairs in memory
+        usage_rows = self._insert(UsageRecord.__table__,
+                                  (u for u, _ in self._revenue_and_usage(random.Random(self.seed + 1))))
+        revenue_rows = self._insert(RevenueRecord.__table__,
+                                    (r for _, r in self._revenue_and_usage(random.Random(self.seed + 1))))
+        stats["usage_records"] = {"rows": usage_rows}
+        stats["revenue_records"] = {"rows": revenue_rows, "seconds": round(time.perf_counter() - start, 2)}
+        print(f"🌱 usage/revenue: {revenue_rows:,} rows each in {stats['revenue_records']['seconds']}s")
+
+        start = time.perf_counter()
+        stats["audit_logs"] = {"rows": self._insert(AuditLog.__table__, self._audits(rng)),
+                               "seconds": round(time.perf_counter() - start, 2)}
+        print(f"🌱 audit_logs: {stats['audit_logs']['rows']:,} rows in {stats['audit_logs']['seconds']}s")
+
+        return stats
+
+    def manifest(self, sample_users: int = 500, sample_drops: int = 2000) -> Dict:
+        """Credentials and ids the load driver needs, regenerated from the seed"""
+        rng = random.Random(self.seed)
+        # Replay the generators to find published drop ids without querying the DB
+        for _ in self._users(rng):
+            pass
+        for _ in self._consents(rng):
+            pass
+        published = []
+        for drop in self._drops(rng):
+            if drop["published"]:
+                published.append(drop["id"])
+                if len(published) >= sample_drops:
+                    break
+        return {
+            "seed": self.seed,
+            "scale": self.scale,
+            "user_count": self.user_count,
+            "users": [self.user_credentials(i) for i in range(min(sample_users, self.user_count))],
+            "published_drop_ids": published
+        }
+
+def parse_scale(value: str) -> int:
+    return SCALES.get(value.lower()) or int(value)
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a YSense benchmark dataset")
+    parser.add_argument("--scale", default="10k", help="10k | 100k | 1m | <number of wisdom drops>")
+    parser.add_argument("--database-url", default="sqlite:///bench_10k.db")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--layer-words", type=int, default=60)
+    parser.add_argument("--manifest", default=None, help="Where to write the credentials manifest JSON")
+    args = parser.parse_args()
+
+    seeder = DatasetSeeder(args.database_url, parse_scale(args.scale), args.seed,
+                           args.chunk_size, args.layer_words)
+    print(f"🚀 Seeding {seeder.scale:,} wisdom drops / {seeder.user_count:,} users into {args.database_url}")
+    stats = seeder.seed_all()
+
+    manifest_path = Path(args.manifest or f"benchmarks/results/manifest_{args.scale}.json")
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(dict(seeder.manifest(), stats=stats), indent=2))
+    print(f"✅ Manifest written to {manifest_path}")
+
+if __name__ == "__main__":
+    main()
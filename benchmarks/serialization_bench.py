@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+YSense Platform v4.0 - Response Serialization Benchmark
+Compares the previous JSON path (per-field .isoformat(), jsonable_encoder, json.dumps)
+with the orjson APIResponse path on payloads shaped like the large list endpoints,
+and reports bytes on the wire raw / gzip / brotli.
+
+Usage:
+    python -m benchmarks.serialization_bench --rows 50 500 5000 --repeat 20
+"""
+
+import argparse
+import gzip
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import orjson
+
+from benchmarks.corpora import STORIES
+from src.responses import dumps_json
+
+try:
+    from fastapi.encoders import jsonable_encoder
+except ImportError:
+    jsonable_encoder = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+RESULTS_DIR = Path(__file__).parent / "results"
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+# ==================== Payloads ====================
+# Each builder returns the response body with raw datetimes (new path)
+
+def _timestamps(rows: int) -> List[datetime]:
+    start = datetime(2025, 1, 1, 8, 30, 15, 123456)
+    return [start + timedelta(minutes=7 * i) for i in range(rows)]
+
+def my_drops_payload(rows: int) -> Dict:
+    return {
+        "total": rows,
+        "total_is_estimate": False,
+        "next_cursor": None,
+        "wisdom_drops": [
+            {
+                "id": f"WD_{i:08X}",
+                "title": f"Grandmother's rendang lesson #{i}",
+                "status": "complete",
+                "published": i % 3 == 0,
+                "distillation_completed": True,
+                "vibe_words": ["Patience", "Warmth", "Memory"],
+                "quality_score": 72.0 + i % 28,
+                "z_protocol_score": 80.0 + i % 20,
+                "revenue_potential": 31.25,
+                "revenue_generated": round(i * 0.37, 2),
+                "created_at": created_at
+            }
+            for i, created_at in enumerate(_timestamps(rows))
+        ]
+    }
+
+def analytics_payload(rows: int) -> Dict:
+    days = min(rows, 365)
+    return {
+        "total_earnings": 1234.56,
+        "pending_earnings": 78.9,
+        "paid_earnings": 1155.66,
+        "revenue_by_type": {"ai_training": 900.0, "research": 200.0, "commercial": 134.56},
+        "top_performing_drops": [
+            {"id": f"WD_{i:08X}", "title": f"Drop {i}", "revenue": 100.0 - i} for i in range(5)
+        ],
+        "revenue_trend": [
+            {"date": date(2025, 1, 1) + timedelta(days=i), "revenue": round(i * 1.1, 2)} for i in range(days)
+        ],
+        "tier_info": {"current_tier": "Silver", "revenue_share_percentage": 35.0, "z_protocol_score": 82.5,
+                      "next_tier_requirements": {"min_score": 75, "min_drops": 15}},
+        "payment_threshold_reached": True
+    }
+
+def audit_trail_payload(rows: int) -> Dict:
+    return {
+        "total_records": rows,
+        "total": rows,
+        "total_is_estimate": False,
+        "next_cursor": None,
+        "audit_trail": [
+            {
+                "id": f"AUDIT_{i:012X}",
+                "action": "WISDOM_PUBLISH",
+                "action_type": "update",
+                "entity_type": "wisdom_drop",
+                "entity_id": f"WD_{i:08X}",
+                "ip_address": "203.0.113.7",
+                "created_at": created_at
+            }
+            for i, created_at in enumerate(_timestamps(rows))
+        ]
+    }
+
+def data_export_payload(rows: int) -> Dict:
+    story = STORIES["long"]
+    return {
+        "user_data": {"id": "USER_BENCH", "email": "bench@example.com", "created_at": datetime(2024, 6, 1)},
+        "wisdom_drops": [
+            {
+                "id": f"WD_{i:08X}",
+                "title": f"Drop {i}",
+                "layers": {name: story for name in ("narrative", "somatic", "attention",
+                                                    "synesthetic", "temporal_auditory")},
+                "vibe_words": ["Patience", "Warmth", "Memory"],
+                "essence": "Patience: Warmth of Memory",
+                "quality_score": 88.0,
+                "revenue_generated": 12.5,
+                "published": True,
+                "created_at": created_at
+            }
+            for i, created_at in enumerate(_timestamps(rows))
+        ]
+    }
+
+def query_wisdom_payload(rows: int) -> Dict:
+    preview = STORIES["multilingual"][:200]
+    return {
+        "results": [
+            {
+                "id": f"WD_{i:08X}",
+                "title": f"Drop {i}",
+                "content": {
+                    "layers": {name: preview + "..." for name in ("narrative", "somatic", "attention",
+                                                                  "synesthetic", "temporal_auditory")},
+                    "vibe_words": ["Sabar", "耐心", "Memory"],
+                    "essence": "Patience: Warmth of Memory"
+                },
+                "attribution": "Wisdom by Bench Contributor",
+                "attribution_hash": "3f1c9a0b7d2e4f61...",
+                "cultural_context": "Malaysian",
+                "quality_score": 88.0,
+                "usage_fee": 0.18
+            }
+            for i in range(min(rows, 10))
+        ]
+    }
+
+PAYLOADS: Dict[str, Callable[[int], Dict]] = {
+    "my_drops": my_drops_payload,
+    "analytics": analytics_payload,
+    "audit_trail": audit_trail_payload,
+    "data_export": data_export_payload,
+    "mcp_query_wisdom": query_wisdom_payload
+}
+
+# ==================== Serializers ====================
+
+def _isoformat_fields(value):
+    """What the endpoints did before: stringify datetimes field by field"""
+    if isinstance(value, dict):
+        return {k: _isoformat_fields(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_isoformat_fields(v) for v in value]
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def serialize_previous(payload: Dict) -> bytes:
+    """Per-field isoformat, jsonable_encoder, then starlette JSONResponse.render"""
+    content = _isoformat_fields(payload)
+    if jsonable_encoder is not None:
+        content = jsonable_encoder(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+def serialize_orjson(payload: Dict) -> bytes:
+    return dumps_json(payload)
+
+SERIALIZERS = {"previous": serialize_previous, "orjson": serialize_orjson}
+
+# ==================== Runner ====================
+
+def time_serializer(serializer: Callable[[Dict], bytes], payload: Dict, repeat: int) -> Dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = serializer(payload)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "mean_ms": round(statistics.mean(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "bytes": len(body),
+        "gzip_bytes": len(gzip.compress(body, compresslevel=GZIP_LEVEL)),
+        "brotli_bytes": len(brotli.compress(body, quality=BROTLI_QUALITY)) if brotli else None
+    }
+
+def run(rows_list: List[int], repeat: int) -> List[Dict]:
+    results = []
+    for name, builder in PAYLOADS.items():
+        for rows in rows_list:
+            payload = builder(rows)
+            # Both paths must produce the same document
+            assert orjson.loads(serialize_orjson(payload)) == json.loads(serialize_previous(payload)), name
+            entry = {"endpoint": name, "rows": rows}
+            for label, serializer in SERIALIZERS.items():
+                entry[label] = time_serializer(serializer, payload, repeat)
+            entry["speedup"] = round(entry["previous"]["mean_ms"] / max(entry["orjson"]["mean_ms"], 1e-9), 2)
+            results.append(entry)
+    return results
+
+def print_table(results: List[Dict]):
+    print(f"{'endpoint':<18}{'rows':>7}{'json ms':>10}{'orjson ms':>11}{'speedup':>9}"
+          f"{'bytes':>11}{'gzip':>10}{'brotli':>10}")
+    for r in results:
+        brotli_bytes = r["orjson"]["brotli_bytes"]
+        print(f"{r['endpoint']:<18}{r['rows']:>7}{r['previous']['mean_ms']:>10.3f}{r['orjson']['mean_ms']:>11.3f}"
+              f"{r['speedup']:>8.1f}x{r['orjson']['bytes']:>11}{r['orjson']['gzip_bytes']:>10}"
+              f"{brotli_bytes if brotli_bytes is not None else '-':>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description="YSense response serialization benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="JSON report path (default: benchmarks/results/serialization_<ts>.json)")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    print_table(results)
+    if jsonable_encoder is None:
+        print("⚠️  fastapi not installed: 'previous' timings exclude jsonable_encoder")
+    if brotli is None:
+        print("⚠️  brotli not installed: Brotli sizes skipped")
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = Path(args.output) if args.output else RESULTS_DIR / f"serialization_{datetime.utcnow():%Y%m%d_%H%M%S}.json"
+    output.write_text(json.dumps({
+        "python": platform.python_version(),
+        "orjson": orjson.__version__,
+        "repeat": args.repeat,
+        "results": results
+    }, indent=2))
+    print(f"📄 Report written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# benchmarks/test_scoring_bench.py
+"""
+YSense Platform v4.0 - Scoring & Hashing Micro-Benchmarks
+pytest-benchmark suite over the quality/revenue scoring and attribution hashing hot paths.
+
+Usage:
+    pip install -r benchmarks/requirements-bench.txt
+
+    # Record a baseline for the current commit (saved under .benchmarks/)
+    python -m pytest benchmarks/test_scoring_bench.py --benchmark-autosave
+
+    # Compare against the latest saved run, failing on a >15% mean regression
+    python -m pytest benchmarks/test_scoring_bench.py --benchmark-compare \
+        --benchmark-compare-fail=mean:15%
+
+Each benchmark is parametrized over the short/long/multilingual corpora in benchmarks/corpora.py,
+and the git revision is recorded in the saved machine info so runs can be tracked across commits.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks.corpora import STORIES, analyzer_drop, analyzer_layers, toolkit_drop, toolkit_layers
+
+CORPORA = sorted(STORIES)
+
+# ==================== Fixtures ====================
+
+@pytest.fixture(scope="module")
+def analyzer():
+    pytest.importorskip("numpy")
+    pytest.importorskip("httpx")
+    from src.layer_analyzer import LayerAnalyzer
+    return LayerAnalyzer()
+
+@pytest.fixture(scope="module")
+def toolkit():
+    from src.five_prompt_toolkit import FivePromptToolkit
+    return FivePromptToolkit()
+
+@pytest.fixture(scope="module")
+def z_validator_v2():
+    from src.z_protocol_v2_validator import ZProtocolV2Validator
+    return ZProtocolV2Validator()
+
+def _wisdom_drop_row(story: str):
+    pytest.importorskip("sqlalchemy")
+    from src.models import WisdomDrop
+    layers = toolkit_layers(story)
+    return WisdomDrop(
+        id="DROP_BENCH",
+        user_id="USER_BENCH",
+        title="Benchmark Drop",
+        cultural_context="Malaysian",
+        layer_narrative=layers["narrative"],
+        layer_somatic=layers["somatic"],
+        layer_attention=layers["attention"],
+        layer_synesthetic=layers["synesthetic"],
+        layer_temporal_auditory=layers["temporal_auditory"],
+        vibe_words=["Patience", "Warmth", "Memory"],
+        personal_connection="It is how my grandmother taught me to wait",
+        essence="Patience: Warmth of Memory",
+        distillation_completed=True,
+        quality_score=88.0
+    )
+
+# ==================== LayerAnalyzer ====================
+
+@pytest.mark.parametrize("corpus", CORPORA)
+def test_layer_calculate_quality(benchmark, analyzer, corpus):
+    layers = analyzer_layers(STORIES[corpus])
+    score = benchmark(analyzer._calculate_quality, layers)
+    assert 0.0 <= score <= 1.0
+
+@pytest.mark.parametrize("corpus", CORPORA)
+def test_layer_analyze_layer_quality(benchmark, analyzer, corpus):
+    layers = analyzer_layers(STORIES[corpus])
+    score = benchmark(analyzer._analyze_layer_quality, layers["wisdom"], "wisdom")
+    assert 0.0 <= score <= 1.0
+
+@pytest.mark.parametrize("corpus", CORPORA)
+def test_layer_calculate_revenue(benchmark, analyzer, corpus):
+    layers = analyzer_layers(STORIES[corpus])
+    revenue = benchmark(analyzer._calculate_revenue, 0.85, "Malaysian", layers)
+    assert revenue > 0
+
+@pytest.mark.parametrize("corpus", CORPORA)
+def test_layer_attribution_hash(benchmark, analyzer, corpus):
+    drop = analyzer_drop(STORIES[corpus])
+    digest = benchmark(analyzer._generate_attribution_hash, drop)
+    assert len(digest) == 64
+
+# ==================== FivePromptToolkit ====================
+
+@pytest.mark.parametrize("corpus", CORPORA)
+def test_toolkit_initial_quality(benchmark, toolkit, corpus):
+    layers = toolkit_layers(STORIES[corpus])
+    score = benchmark(toolkit._calculate_initial_quality, layers)
+    assert 0.0 <= score <= 0.80
+
+@pytest.mark.parametrize("corpus", CORPORA)
+def test_toolkit_final_quality(benchmark, toolkit, corpus):
+    drop = toolkit_drop(STORIES[corpus])
+    score = benchmark(toolkit._calculate_final_quality, drop)
+    assert 0.0 <= score <= 1.0
+
+@pytest.mark.parametrize("corpus", CORPORA)
+def test_toolkit_attribution_hash(benchmark, toolkit, corpus):
+    layers = toolkit_layers(STORIES[corpus])
+    digest = benchmark(toolkit._generate_attribution_hash, "bench_author", "Benchmark Drop", layers)
+    assert len(digest) == 64
+
+# ==================== API / Models ====================
+
+@pytest.mark.parametrize("corpus", CORPORA)
+def test_api_calculate_revenue_potential(benchmark, corpus):
+    pytest.importorskip("fastapi")
+    from api.wisdom import calculate_revenue_potential
+    drop = _wisdom_drop_row(STORIES[corpus])
+    revenue = benchmark(calculate_revenue_potential, drop)
+    assert revenue > 0
+
+@pytest.mark.parametrize("corpus", CORPORA)
+def test_model_calculate_quality_score(benchmark, corpus):
+    drop = _wisdom_drop_row(STORIES[corpus])
+    score = benchmark(drop.calculate_quality_score)
+    assert 0.0 <= score <= 100.0
+
+# ==================== Z Protocol v2 ====================
+
+@pytest.mark.parametrize("corpus", CORPORA)
+def test_z_protocol_v2_attribution_hash(benchmark, z_validator_v2, corpus):
+    digest = benchmark(z_validator_v2.generate_attribution_hash, "USER_BENCH", "DROP_BENCH", STORIES[corpus])
+    assert len(digest) == 64
+
+# ==================== Batch Scoring ====================
+
+@pytest.mark.parametrize("size", [1_000, 100_000])
+def test_batch_quality_and_revenue(benchmark, size):
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("sqlalchemy")
+    from src.batch_scoring import BatchScorer, DropBatch
+
+    rng = np.random.default_rng(42)
+    batch = DropBatch(
+        ids=[f"DROP_{i}" for i in range(size)],
+        layer_lengths=rng.integers(0, 400, size=(size, 5)),
+        vibe_word_counts=rng.choice([0, 3], size=size),
+        has_personal_connection=rng.random(size) < 0.8,
+        has_essence=rng.random(size) < 0.6,
+        distillation_completed=rng.random(size) < 0.7,
+        cultural_contexts=rng.choice(np.array(["Malaysian", "Hokkien", "Global", "Indigenous"], dtype=object), size=size)
+    )
+    scorer = BatchScorer()
+
+    def score():
+        quality = scorer.quality_scores(batch)
+        return scorer.revenue_potential(batch, quality)
+
+    revenue = benchmark(score)
+    assert revenue.shape == (size,)
@@ -10,9 +10,34 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 from dataclasses import dataclass
 import hashlib
+import secrets
+import uuid
 
-from src.models import WisdomDrop, User, UsageRecord, get_session
+from sqlalchemy import func, or_
+
+from src.config import Config
+from src.models import WisdomDrop, User, UsageRecord, RevenueRecord, get_session
 from src.z_protocol_enhanced import ZProtocolValidator
+from src.pagination import clamp_limit, paginate
+from src.http_cache import drop_versions
+from src.rate_limit import rate_limiter
+from src.user_aggregates import record_usage
+
+LAYER_PREVIEW_COLUMNS = (
+    ("narrative", WisdomDrop.layer_narrative),
+    ("somatic", WisdomDrop.layer_somatic),
+    ("attention", WisdomDrop.layer_attention),
+    ("synesthetic", WisdomDrop.layer_synesthetic),
+    ("temporal_auditory", WisdomDrop.layer_temporal_auditory)
+)
+
+# Token bucket cost per tool call (query_wisdom runs a text search)
+TOOL_COSTS = {
+    "query_wisdom": 5,
+    "check_attribution": 1,
+    "report_usage": 2,
+    "validate_z_protocol": 3
+}
 
 @dataclass
 class MCPResource:
@@ -37,13 +62,24 @@ class YSenseMCPServer:
     Allows AI assistants to query and use wisdom drops with attribution
     """
     
-    def __init__(self):
+    def __init__(self, client_id: Optional[str] = None):
         self.name = "ysense-attribution"
         self.version = "2.0.0"
         self.z_validator = ZProtocolValidator()
+        # One server per MCP connection: rate limit by the identity the transport
+        # authenticated, else by this connection - never by a tool argument
+        self.rate_limit_key = f"mcp:client:{client_id}" if client_id else f"mcp:session:{uuid.uuid4().hex}"
+        # Static descriptors, built on first request
+        self._server_info: Optional[Dict] = None
+        self._tools: Optional[List[MCPTool]] = None
         
     def get_server_info(self) -> Dict:
         """Return MCP server information"""
+        if self._server_info is None:
+            self._server_info = self._build_server_info()
+        return self._server_info
+    
+    def _build_server_info(self) -> Dict:
         return {
             "name": self.name,
             "version": self.version,
@@ -56,15 +92,26 @@ class YSenseMCPServer:
             "description": "YSense Attribution Infrastructure for Ethical AI Training"
         }
     
-    def list_resources(self) -> List[MCPResource]:
-        """List available wisdom resources"""
+    def list_resources(self, cursor: Optional[str] = None, limit: int = 100) -> List[MCPResource]:
+        """List available wisdom resources (one page; see list_resources_page for the cursor)"""
+        return self.list_resources_page(cursor, limit)["resources"]
+
+    def list_resources_page(self, cursor: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+        """MCP resources/list page: {"resources": [...], "nextCursor": str | None}"""
         
         db = get_session()
         
-        # Get published wisdom drops
-        wisdom_drops = db.query(WisdomDrop).filter(
+        # Get published wisdom drops, only the fields a resource needs
+        query = WisdomDrop.summary_query(db).filter(
             WisdomDrop.published == True
-        ).limit(100).all()
+        )
+        
+        try:
+            wisdom_drops, next_cursor = paginate(
+                query, WisdomDrop.created_at, WisdomDrop.id, cursor, clamp_limit(limit, default=100)
+            )
+        finally:
+            db.close()
         
         resources = []
         for drop in wisdom_drops:
@@ -83,13 +130,15 @@ class YSenseMCPServer:
             )
             resources.append(resource)
         
-        db.close()
-        
-        return resources
+        return {"resources": resources, "nextCursor": next_cursor}
     
     def list_tools(self) -> List[MCPTool]:
         """List available MCP tools"""
-        
+        if self._tools is None:
+            self._tools = self._build_tools()
+        return list(self._tools)
+    
+    def _build_tools(self) -> List[MCPTool]:
         tools = [
             MCPTool(
                 name="query_wisdom",
@@ -193,7 +242,10 @@ class YSenseMCPServer:
         return tools
     
     async def execute_tool(self, tool_name: str, arguments: Dict) -> Dict:
-        """Execute MCP tool"""
+        """Execute MCP tool (raises RateLimitExceeded when the client's bucket is empty)"""
+        
+        if Config.RATE_LIMIT_ENABLED and tool_name in TOOL_COSTS:
+            rate_limiter.enforce(self.rate_limit_key, TOOL_COSTS[tool_name])
         
         if tool_name == "query_wisdom":
             return await self._query_wisdom(arguments)
@@ -211,7 +263,18 @@ class YSenseMCPServer:
         
         db = get_session()
         
-        query = db.query(WisdomDrop).filter(WisdomDrop.published == True)
+        # Only 200-character layer previews leave the database, never the full text
+        query = db.query(
+            WisdomDrop.id,
+            WisdomDrop.title,
+            *[func.substr(column, 1, 200).label(name) for name, column in LAYER_PREVIEW_COLUMNS],
+            WisdomDrop.vibe_words,
+            WisdomDrop.essence,
+            WisdomDrop.attribution_text,
+            WisdomDrop.attribution_hash,
+            WisdomDrop.cultural_context,
+            WisdomDrop.quality_score
+        ).filter(WisdomDrop.published == True)
         
         # Apply filters
         if "cultural_context" in args:
@@ -220,62 +283,62 @@ class YSenseMCPServer:
         if "min_quality_score" in args:
             query = query.filter(WisdomDrop.quality_score >= args["min_quality_score"])
         
-        # Search in title and layers (basic text search)
+        # Search in title and layers (basic text search), matched in the database
         search_term = args["query"].lower()
-        wisdom_drops = query.all()
+        query = query.filter(or_(
+            func.lower(WisdomDrop.title).contains(search_term, autoescape=True),
+            func.lower(WisdomDrop.layer_narrative).contains(search_term, autoescape=True),
+            func.lower(WisdomDrop.layer_somatic).contains(search_term, autoescape=True)
+        ))
+        wisdom_drops = query.limit(10).all()  # Limit to 10 results
+        
+        db.close()
         
         results = []
         for drop in wisdom_drops:
-            # Basic relevance check
-            if (search_term in drop.title.lower() or
-                search_term in (drop.layer_narrative or "").lower() or
-                search_term in (drop.layer_somatic or "").lower()):
-                
-                # Calculate usage fee
-                usage_fee = self._calculate_usage_fee(drop)
-                
-                results.append({
-                    "id": drop.id,
-                    "title": drop.title,
-                    "content": {
-                        "layers": {
-                            "narrative": drop.layer_narrative[:200] + "..." if drop.layer_narrative else None,
-                            "somatic": drop.layer_somatic[:200] + "..." if drop.layer_somatic else None,
-                            "attention": drop.layer_attention[:200] + "..." if drop.layer_attention else None,
-                            "synesthetic": drop.layer_synesthetic[:200] + "..." if drop.layer_synesthetic else None,
-                            "temporal_auditory": drop.layer_temporal_auditory[:200] + "..." if drop.layer_temporal_auditory else None
-                        },
-                        "vibe_words": drop.vibe_words,
-                        "essence": drop.essence
+            # Calculate usage fee
+            usage_fee = self._calculate_usage_fee(drop)
+            
+            results.append({
+                "id": drop.id,
+                "title": drop.title,
+                "content": {
+                    "layers": {
+                        name: getattr(drop, name) + "..." if getattr(drop, name) else None
+                        for name, _ in LAYER_PREVIEW_COLUMNS
                     },
-                    "attribution": drop.attribution_text,
-                    "attribution_hash": drop.attribution_hash[:16] + "...",
-                    "cultural_context": drop.cultural_context,
-                    "quality_score": drop.quality_score,
-                    "usage_fee": usage_fee
-                })
-        
-        db.close()
-        
-        return {"results": results[:10]}  # Limit to 10 results
+                    "vibe_words": drop.vibe_words,
+                    "essence": drop.essence
+                },
+                "attribution": drop.attribution_text,
+                "attribution_hash": drop.attribution_hash[:16] + "...",
+                "cultural_context": drop.cultural_context,
+                "quality_score": drop.quality_score,
+                "usage_fee": usage_fee
+            })
+        
+        return {"results": results}
     
     async def _check_attribution(self, args: Dict) -> Dict:
         """Check attribution requirements"""
         
         db = get_session()
         
-        wisdom_drop = db.query(WisdomDrop).filter(
+        # Drop plus its contributor's tier in one query (outer join: the tier may be missing)
+        row = db.query(WisdomDrop, User.z_protocol_tier).outerjoin(
+            User, User.id == WisdomDrop.user_id
+        ).filter(
             WisdomDrop.id == args["wisdom_id"]
         ).first()
         
-        if not wisdom_drop:
+        if not row:
             db.close()
             return {
                 "error": "Wisdom drop not found",
                 "attribution_required": False
             }
         
-        user = db.query(User).filter(User.id == wisdom_drop.user_id).first()
+        wisdom_drop, contributor_tier = row
         
         # Calculate usage fee
         usage_fee = self._calculate_usage_fee(wisdom_drop, args.get("usage_type", "default"))
@@ -290,7 +353,7 @@ class YSenseMCPServer:
             "usage_fee": usage_fee,
             "z_protocol_compliant": wisdom_drop.z_protocol_score >= 80,
             "cultural_context": wisdom_drop.cultural_context,
-            "contributor_tier": user.z_protocol_tier if user else "Unknown"
+            "contributor_tier": contributor_tier or "Unknown"
         }
     
     async def _report_usage(self, args: Dict) -> Dict:
@@ -298,15 +361,17 @@ class YSenseMCPServer:
         
         db = get_session()
         
-        # Verify wisdom drop exists
-        wisdom_drop = db.query(WisdomDrop).filter(
+        # Verify wisdom drop exists (with its contributor, whose earnings are updated below)
+        row = db.query(WisdomDrop, User).outerjoin(User, User.id == WisdomDrop.user_id).filter(
             WisdomDrop.id == args["wisdom_id"]
         ).first()
         
-        if not wisdom_drop:
+        if not row:
             db.close()
             return {"error": "Wisdom drop not found"}
         
+        wisdom_drop, user = row
+        
         # Check attribution
         if not args.get("attribution_included", False):
             db.close()
@@ -319,7 +384,6 @@ class YSenseMCPServer:
         # Create usage record
         usage_id = f"MCP_USAGE_{hashlib.md5(f'{args["wisdom_id"]}_{args["client_id"]}_{datetime.utcnow()}'.encode()).hexdigest()[:8].upper()}"
         
-        user = db.query(User).filter(User.id == wisdom_drop.user_id).first()
         revenue = self._calculate_usage_fee(wisdom_drop, args["usage_type"])
         
         usage_record = UsageRecord(
@@ -340,11 +404,23 @@ class YSenseMCPServer:
         wisdom_drop.revenue_generated += revenue
         
         if user:
-            user.pending_earnings += revenue
-            user.total_earnings += revenue
+            # Lock the contributor row (FOR UPDATE can't cover the outer join's nullable side)
+            db.refresh(user, with_for_update=True)
+            # Same revenue row as the HTTP endpoint, so payments and the aggregate verifier see it
+            db.add(RevenueRecord(
+                id=f"REV_{secrets.token_hex(8).upper()}",
+                user_id=user.id,
+                wisdom_drop_id=wisdom_drop.id,
+                amount=revenue,
+                currency="EUR",
+                revenue_type=args["usage_type"],
+                payment_status="pending"
+            ))
+            record_usage(user, revenue)
         
         db.commit()
         db.close()
+        drop_versions.forget(wisdom_drop.id)
         
         return {
             "usage_id": usage_id,
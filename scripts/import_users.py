@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+YSense Platform v4.0 - Bulk User Import
+Registers a partner community from a CSV / NDJSON file and writes per-row outcomes
+(including each new user's crypto key) as NDJSON
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.bulk_registration import FORMATS, import_registrations
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-register users from CSV or NDJSON")
+    parser.add_argument("input", help="Registrations file (.csv or .ndjson)")
+    parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension")
+    parser.add_argument("--output", required=True, help="Where to write NDJSON outcomes (contains secrets)")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.input.endswith(".csv") else "ndjson")
+
+    print(f"📥 Importing {args.input} ({fmt})...")
+    with open(args.input, encoding="utf-8-sig", newline="") as lines, open(args.output, "w") as out:
+        for outcome in import_registrations(lines, fmt, chunk_size=args.chunk_size, source="cli_import"):
+            out.write(json.dumps(outcome) + "\n")
+            if "summary" in outcome:
+                summary = outcome["summary"]
+
+    print(f"✅ {summary['created']} created, {summary['duplicate']} duplicate, {summary['invalid']} invalid, "
+          f"{summary['failed']} failed in {summary['seconds']}s ({summary['rows_per_second']} rows/s)")
+    print(f"📄 Outcomes written to {args.output}")
+
+if __name__ == "__main__":
+    main()
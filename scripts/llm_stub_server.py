@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+YSense Platform v4.0 - Offline LLM Stub Server
+Speaks the dashscope (QWEN) and Anthropic Messages wire formats so the API can be
+load-tested without network access or API quota.
+
+Usage:
+    python scripts/llm_stub_server.py --port 8090 --latency lognormal:400,0.5 \
+        --tokens-per-second 40 --error-rate 0.01 --throttle-rate 0.02
+
+Then start the API with USE_LLM_STUB=true (and LLM_STUB_URL if not the default).
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DASHSCOPE_PATH = "/api/v1/services/aigc/text-generation/generation"
+ANTHROPIC_PATH = "/v1/messages"
+
+VOCABULARY = (
+    "wisdom patience kampung grandmother memory tradition community harmony "
+    "learned realized insight lesson principle truth culture heritage values "
+    "felt emotions growth challenge journey because when where circumstances "
+    "teaching learning innovation respect gratitude family river morning rhythm"
+).split()
+
+# ==================== Settings ====================
+
+@dataclass
+class StubSettings:
+    """Fault and latency profile for the stub"""
+    latency: str = "lognormal:300,0.4"   # fixed:MS | uniform:MIN,MAX | lognormal:MEDIAN_MS,SIGMA
+    tokens_per_second: float = 50.0
+    max_output_tokens: int = 120
+    error_rate: float = 0.0               # share of requests answered with a 5xx
+    throttle_rate: float = 0.0            # share of requests answered with a 429
+    retry_after_seconds: int = 1
+    seed: int = 42
+    attempts: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    seen_prefixes: set = field(default_factory=set)
+
+    @classmethod
+    def from_env(cls) -> "StubSettings":
+        return cls(
+            latency=os.getenv("LLM_STUB_LATENCY", cls.latency),
+            tokens_per_second=float(os.getenv("LLM_STUB_TOKENS_PER_SECOND", cls.tokens_per_second)),
+            max_output_tokens=int(os.getenv("LLM_STUB_MAX_OUTPUT_TOKENS", cls.max_output_tokens)),
+            error_rate=float(os.getenv("LLM_STUB_ERROR_RATE", cls.error_rate)),
+            throttle_rate=float(os.getenv("LLM_STUB_THROTTLE_RATE", cls.throttle_rate)),
+            retry_after_seconds=int(os.getenv("LLM_STUB_RETRY_AFTER", cls.retry_after_seconds)),
+            seed=int(os.getenv("LLM_STUB_SEED", cls.seed))
+        )
+
+    def rng_for(self, body: bytes) -> random.Random:
+        """Deterministic RNG per (seed, request body, attempt number)"""
+        digest = hashlib.sha256(body).hexdigest()
+        self.attempts[digest] += 1
+        return random.Random(f"{self.seed}:{digest}:{self.attempts[digest]}")
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Time to first token in seconds"""
+        kind, _, params = self.latency.partition(":")
+        values = [float(v) for v in params.split(",") if v]
+        if kind == "fixed":
+            ms = values[0]
+        elif kind == "uniform":
+            ms = rng.uniform(values[0], values[1])
+        elif kind == "lognormal":
+            ms = rng.lognormvariate(math.log(values[0]), values[1] if len(values) > 1 else 0.4)
+        else:
+            raise ValueError(f"Unknown latency distribution: {self.latency}")
+        return max(ms, 0.0) / 1000
+
+    def fault(self, rng: random.Random) -> Optional[int]:
+        """Status code to inject for this request, if any"""
+        roll = rng.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 500
+        return None
+
+# ==================== Content Generation ====================
+
+def _count_tokens(text: str) -> int:
+    return max(1, int(len(text.split()) * 1.3))
+
+def _generate_tokens(rng: random.Random, prompt: str, max_tokens: int) -> List[str]:
+    """Deterministic pseudo-text, JSON when the prompt asks for it"""
+    if "Return as JSON" in prompt:
+        layers = {
+            key: " ".join(rng.choice(VOCABULARY) for _ in range(12))
+            for key in ("surface", "emotional", "contextual", "wisdom", "cultural")
+        }
+        text = json.dumps(layers)
+        return [text[i:i + 8] for i in range(0, len(text), 8)]
+
+    count = min(max_tokens, rng.randint(max_tokens // 2 or 1, max_tokens))
+    words = [rng.choice(VOCABULARY) for _ in range(count)]
+    return [word + ("." if i % 12 == 11 else "") + " " for i, word in enumerate(words)]
+
+def _dashscope_prompt(payload: Dict) -> Tuple[str, str]:
+    messages = payload.get("input", {}).get("messages", [])
+    parts = []
+    system = ""
+    for msg in messages:
+        content = msg.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(block.get("text", "") for block in content)
+        if msg.get("role") == "system":
+            system = content
+        parts.append(content)
+    return system, "\n".join(parts)
+
+def _anthropic_prompt(payload: Dict) -> Tuple[str, str, bool]:
+    system = payload.get("system", "")
+    cacheable = False
+    if isinstance(system, list):
+        cacheable = any(block.get("cache_control") for block in system)
+        system = " ".join(block.get("text", "") for block in system)
+    parts = [system]
+    for msg in payload.get("messages", []):
+        content = msg.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(block.get("text", "") for block in content)
+        parts.append(content)
+    return system, "\n".join(parts), cacheable
+
+# ==================== App ====================
+
+def create_app(settings: Optional[StubSettings] = None) -> FastAPI:
+    settings = settings or StubSettings.from_env()
+    app = FastAPI(title="YSense LLM Stub", version="1.0")
+    app.state.settings = settings
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy", "latency": settings.latency,
+                "tokens_per_second": settings.tokens_per_second,
+                "error_rate": settings.error_rate, "throttle_rate": settings.throttle_rate}
+
+    @app.post(DASHSCOPE_PATH)
+    async def dashscope_generation(request: Request):
+        body = await request.body()
+        payload = json.loads(body or b"{}")
+        rng = settings.rng_for(body)
+        request_id = str(uuid.UUID(int=rng.getrandbits(128)))
+
+        await asyncio.sleep(settings.sample_latency(rng))
+
+        fault = settings.fault(rng)
+        if fault == 429:
+            return JSONResponse(status_code=429, headers={"Retry-After": str(settings.retry_after_seconds)}, content={
+                "code": "Throttling.RateQuota",
+                "message": "Requests rate limit exceeded, please try again later.",
+                "request_id": request_id
+            })
+        if fault:
+            return JSONResponse(status_code=fault, content={
+                "code": "InternalError", "message": "Stub injected failure", "request_id": request_id
+            })
+
+        system, prompt = _dashscope_prompt(payload)
+        parameters = payload.get("parameters", {})
+        max_tokens = min(parameters.get("max_tokens", settings.max_output_tokens), settings.max_output_tokens)
+        tokens = _generate_tokens(rng, prompt, max_tokens)
+        input_tokens = _count_tokens(prompt)
+
+        def envelope(content: str, output_tokens: int, finish_reason: str) -> Dict:
+            return {
+                "output": {"choices": [{
+                    "finish_reason": finish_reason,
+                    "message": {"role": "assistant", "content": content}
+                }]},
+                "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                          "total_tokens": input_tokens + output_tokens},
+                "request_id": request_id
+            }
+
+        if request.headers.get("X-DashScope-SSE", "").lower() != "enable":
+            await asyncio.sleep(len(tokens) / settings.tokens_per_second)
+            return envelope("".join(tokens), len(tokens), "stop")
+
+        incremental = parameters.get("incremental_output", False)
+
+        async def events():
+            text = ""
+            for i, token in enumerate(tokens, start=1):
+                if i > 1:
+                    await asyncio.sleep(1 / settings.tokens_per_second)
+                text += token
+                finish = "stop" if i == len(tokens) else "null"
+                data = envelope(token if incremental else text, i, finish)
+                yield f"id:{i}\nevent:result\n:HTTP_STATUS/200\ndata:{json.dumps(data)}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post(ANTHROPIC_PATH)
+    async def anthropic_messages(request: Request):
+        body = await request.body()
+        payload = json.loads(body or b"{}")
+        rng = settings.rng_for(body)
+        message_id = f"msg_stub_{rng.getrandbits(64):016x}"
+
+        await asyncio.sleep(settings.sample_latency(rng))
+
+        fault = settings.fault(rng)
+        if fault == 429:
+            return JSONResponse(status_code=429, headers={"retry-after": str(settings.retry_after_seconds)}, content={
+                "type": "error",
+                "error": {"type": "rate_limit_error", "message": "Stub injected rate limit"}
+            })
+        if fault:
+            return JSONResponse(status_code=fault, content={
+                "type": "error", "error": {"type": "api_error", "message": "Stub injected failure"}
+            })
+
+        system, prompt, cacheable = _anthropic_prompt(payload)
+        max_tokens = min(payload.get("max_tokens", settings.max_output_tokens), settings.max_output_tokens)
+        tokens = _generate_tokens(rng, prompt, max_tokens)
+
+        # Emulate prompt caching: a cache_control prefix is a cache read once seen
+        system_tokens = _count_tokens(system) if system else 0
+        cache_read = cache_write = 0
+        if cacheable:
+            prefix = hashlib.sha256(system.encode()).hexdigest()
+            if prefix in settings.seen_prefixes:
+                cache_read = system_tokens
+            else:
+                settings.seen_prefixes.add(prefix)
+                cache_write = system_tokens
+        usage = {
+            "input_tokens": _count_tokens(prompt) - cache_read - cache_write,
+            "output_tokens": len(tokens),
+            "cache_creation_input_tokens": cache_write,
+            "cache_read_input_tokens": cache_read
+        }
+        model = payload.get("model", "stub")
+
+        if not payload.get("stream"):
+            await asyncio.sleep(len(tokens) / settings.tokens_per_second)
+            return {
+                "id": message_id, "type": "message", "role": "assistant", "model": model,
+                "content": [{"type": "text", "text": "".join(tokens)}],
+                "stop_reason": "end_turn", "stop_sequence": None, "usage": usage
+            }
+
+        def frame(event: str, data: Dict) -> str:
+            return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+        async def events():
+            yield frame("message_start", {"type": "message_start", "message": {
+                "id": message_id, "type": "message", "role": "assistant", "model": model,
+                "content": [], "stop_reason": None, "stop_sequence": None,
+                "usage": dict(usage, output_tokens=1)
+            }})
+            yield frame("content_block_start", {"type": "content_block_start", "index": 0,
+                                                "content_block": {"type": "text", "text": ""}})
+            for i, token in enumerate(tokens):
+                if i:
+                    await asyncio.sleep(1 / settings.tokens_per_second)
+                yield frame("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                    "delta": {"type": "text_delta", "text": token}})
+            yield frame("content_block_stop", {"type": "content_block_stop", "index": 0})
+            yield frame("message_delta", {"type": "message_delta",
+                                          "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                          "usage": {"output_tokens": len(tokens)}})
+            yield frame("message_stop", {"type": "message_stop"})
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+def main():
+    defaults = StubSettings.from_env()
+    parser = argparse.ArgumentParser(description="Offline dashscope/Anthropic stub for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default=defaults.latency,
+                        help="fixed:MS | uniform:MIN_MS,MAX_MS | lognormal:MEDIAN_MS,SIGMA")
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--max-output-tokens", type=int, default=defaults.max_output_tokens)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--throttle-rate", type=float, default=defaults.throttle_rate)
+    parser.add_argument("--retry-after", type=int, default=defaults.retry_after_seconds)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    settings = StubSettings(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        max_output_tokens=args.max_output_tokens,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after_seconds=args.retry_after,
+        seed=args.seed
+    )
+
+    import uvicorn
+    print(f"🧪 LLM stub listening on http://{args.host}:{args.port} "
+          f"(latency={settings.latency}, {settings.tokens_per_second} tok/s, "
+          f"errors={settings.error_rate:.1%}, 429s={settings.throttle_rate:.1%})")
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
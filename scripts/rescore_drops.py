@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+YSense Platform v4.0 - Corpus Re-scoring
+Recomputes quality and revenue for every wisdom drop after scoring weights or multipliers change
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.batch_scoring import rescore_corpus
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score all wisdom drops in bulk")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--dry-run", action="store_true", help="Compute scores without writing them")
+    args = parser.parse_args()
+
+    print("🔄 Re-scoring wisdom drops...")
+    stats = rescore_corpus(chunk_size=args.chunk_size, dry_run=args.dry_run)
+    rate = stats['drops'] / stats['seconds'] if stats['seconds'] else 0
+    print(f"✅ {stats['drops']} drops in {stats['chunks']} chunks, {stats['seconds']}s ({rate:,.0f} drops/s)")
+    if args.dry_run:
+        print(f"ℹ️  Dry run - nothing written ({stats['changed']} drops would change)")
+    else:
+        print(f"📝 {stats['changed']} drops had new scores")
+
+if __name__ == "__main__":
+    main()
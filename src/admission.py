@@ -0,0 +1,153 @@
+# src/admission.py
+"""
+YSense Platform v4.0 - Admission Control
+Bounds in-flight AI analyses per worker. Requests over the limit wait in a
+FIFO queue with a deadline; when the queue is full or the deadline passes they
+are shed (503 + Retry-After) instead of piling up. The limit adapts AIMD-style:
++1/limit per on-target completion while saturated, x backoff when latency
+exceeds the target or the call fails, so a slow LLM provider shrinks it.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+from src.config import Config
+
+class AdmissionRejected(Exception):
+    """Shed request; retry_after is a hint in seconds"""
+
+    def __init__(self, reason: str, retry_after: int):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"{reason} (retry after {retry_after}s)")
+
+class AdmissionController:
+    """Adaptive concurrency limit with a deadline-bounded wait queue (one per worker event loop)"""
+
+    def __init__(self, name: str, initial_limit: Optional[int] = None, min_limit: Optional[int] = None,
+                 max_limit: Optional[int] = None, max_queue: Optional[int] = None,
+                 queue_timeout: Optional[float] = None, latency_target: Optional[float] = None,
+                 backoff: Optional[float] = None, clock=time.monotonic):
+        self.name = name
+        self.min_limit = min_limit or Config.ADMISSION_MIN_LIMIT
+        self.max_limit = max_limit or Config.ADMISSION_MAX_LIMIT
+        self.limit = float(initial_limit or Config.ADMISSION_INITIAL_LIMIT)
+        self.max_queue = Config.ADMISSION_MAX_QUEUE if max_queue is None else max_queue
+        self.queue_timeout = queue_timeout or Config.ADMISSION_QUEUE_TIMEOUT_SECONDS
+        self.latency_target = latency_target or Config.ADMISSION_LATENCY_TARGET_SECONDS
+        self.backoff = backoff or Config.ADMISSION_BACKOFF
+        self.clock = clock
+
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = float("-inf")
+        self._latency_ewma: Optional[float] = None
+        self.admitted = 0
+        self.rejected = 0
+
+    # ==================== Admission ====================
+
+    async def acquire(self) -> float:
+        """Wait for a slot; returns the admission time to pass back to release()"""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            return self._admit()
+
+        self.ensure_capacity()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as the deadline hit
+                self.admitted += 1
+                return self.clock()
+            self._discard(waiter)
+            self.rejected += 1
+            raise AdmissionRejected(f"{self.name} queue wait exceeded {self.queue_timeout}s", self.retry_after())
+        except asyncio.CancelledError:
+            # Client went away: give back a slot that was already handed over
+            if waiter.done() and not waiter.cancelled():
+                self.in_flight -= 1
+                self._wake()
+            self._discard(waiter)
+            raise
+        # release() counted us in when it handed over the slot
+        self.admitted += 1
+        return self.clock()
+
+    def ensure_capacity(self):
+        """Shed now if a new request could not even be queued"""
+        if self.in_flight >= int(self.limit) and len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected(f"{self.name} queue is full", self.retry_after())
+
+    def release(self, started: float, ok: bool = True):
+        """Free the slot and feed the observed latency into the limit"""
+        self.in_flight -= 1
+        latency = self.clock() - started
+        self._latency_ewma = latency if self._latency_ewma is None else 0.8 * self._latency_ewma + 0.2 * latency
+
+        if not ok or latency > self.latency_target:
+            # One decrease per congestion event: ignore calls admitted before the last cut
+            if started > self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = self.clock()
+        elif self.in_flight + 1 >= int(self.limit):
+            # Only grow while the limit is actually what's holding requests back
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self):
+        """async with controller.slot(): ... - errors count as congestion signals"""
+        started = await self.acquire()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.release(started, ok)
+
+    def _admit(self) -> float:
+        self.in_flight += 1
+        self.admitted += 1
+        return self.clock()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    # ==================== Introspection ====================
+
+    def retry_after(self) -> int:
+        """Rough time for the current queue to drain"""
+        latency = self._latency_ewma or self.latency_target
+        return max(1, math.ceil(latency * (len(self._waiters) + 1) / max(1, int(self.limit))))
+
+    def stats(self) -> Dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "latency_ewma_seconds": round(self._latency_ewma, 3) if self._latency_ewma is not None else None
+        }
+
+# Orchestrator runs (analyze-story, create-wisdom-drop)
+analysis_admission = AdmissionController("analysis")
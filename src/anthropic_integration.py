@@ -5,12 +5,18 @@ Advanced AI reasoning for orchestrator agents
 """
 
 import os
+import re
 import asyncio
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 from datetime import datetime
 from dotenv import load_dotenv
 import anthropic
 
+from src.config import Config
+from src.metrics import llm_timer
+from src.prompt_registry import prompt_registry
+from src.telemetry import record_llm_usage, span
+
 load_dotenv()
 
 class AnthropicClient:
@@ -19,46 +25,125 @@ class AnthropicClient:
     def __init__(self):
         self.api_key = os.getenv("ANTHROPIC_API_KEY", "")
         self.model = os.getenv("ANTHROPIC_MODEL", "claude-3-sonnet")
+        self.base_url = None
+        
+        if Config.USE_LLM_STUB:
+            # Offline stub speaking the Anthropic Messages wire format (scripts/llm_stub_server.py)
+            self.base_url = Config.LLM_STUB_URL
+            self.api_key = self.api_key or "stub-key"
+            print(f"🧪 Anthropic client using LLM stub at {Config.LLM_STUB_URL}")
         
         if not self.api_key:
             print("⚠️ ANTHROPIC_API_KEY not found. Using fallback mode.")
             self.use_fallback = True
         else:
             self.use_fallback = False
-            self.client = anthropic.Anthropic(api_key=self.api_key)
+            self.client = anthropic.Anthropic(api_key=self.api_key, base_url=self.base_url)
+            self.async_client = anthropic.AsyncAnthropic(api_key=self.api_key, base_url=self.base_url)
     
     async def create_completion(self, messages: List[Dict], 
                                temperature: float = 0.7,
                                max_tokens: int = 1000) -> str:
         """Create completion using Anthropic API"""
         
-        if self.use_fallback:
-            return self._fallback_response(messages)
-        
-        try:
-            # Convert messages to Anthropic format
-            system_message = ""
-            user_message = ""
+        with span("llm.anthropic.completion"), llm_timer("anthropic", self.model):
+            if self.use_fallback:
+                record_llm_usage("anthropic", self.model, fallback=True)
+                return self._fallback_response(messages)
             
-            for msg in messages:
-                if msg["role"] == "system":
-                    system_message = msg["content"]
-                elif msg["role"] == "user":
-                    user_message = msg["content"]
-            
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                system=system_message,
-                messages=[{"role": "user", "content": user_message}]
-            )
+            try:
+                system_message, user_message = self._split_messages(messages)
+                
+                response = self.client.messages.create(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    system=system_message,
+                    messages=[{"role": "user", "content": user_message}]
+                )
+                self._record_usage(response.usage)
+                
+                return response.content[0].text
+                
+            except Exception as e:
+                print(f"Anthropic API Error: {e}")
+                record_llm_usage("anthropic", self.model, fallback=True)
+                return self._fallback_response(messages)
+    
+    async def stream_completion(self, messages: List[Dict],
+                                temperature: float = 0.7,
+                                max_tokens: int = 1000) -> AsyncIterator[str]:
+        """Stream completion tokens using the Anthropic streaming API"""
+        
+        with span("llm.anthropic.stream", current=False) as llm_span, llm_timer("anthropic", self.model):
+            if self.use_fallback:
+                record_llm_usage("anthropic", self.model, fallback=True, target=llm_span)
+                for chunk in self._chunk_text(self._fallback_response(messages)):
+                    yield chunk
+                return
             
-            return response.content[0].text
+            emitted = False
+            try:
+                system_message, user_message = self._split_messages(messages)
+                
+                async with self.async_client.messages.stream(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    system=system_message,
+                    messages=[{"role": "user", "content": user_message}]
+                ) as stream:
+                    async for text in stream.text_stream:
+                        if text:
+                            emitted = True
+                            yield text
+                    self._record_usage((await stream.get_final_message()).usage, llm_span)
+                            
+            except Exception as e:
+                print(f"Anthropic API Stream Error: {e}")
             
-        except Exception as e:
-            print(f"Anthropic API Error: {e}")
-            return self._fallback_response(messages)
+            # Nothing arrived from the API - keep the caller's stream non-empty
+            if not emitted:
+                record_llm_usage("anthropic", self.model, fallback=True, target=llm_span)
+                for chunk in self._chunk_text(self._fallback_response(messages)):
+                    yield chunk
+    
+    def _record_usage(self, usage, target=None):
+        """Token counts (incl. prompt-cache reads/writes) on the LLM span"""
+        record_llm_usage(
+            "anthropic", self.model,
+            input_tokens=getattr(usage, "input_tokens", None),
+            output_tokens=getattr(usage, "output_tokens", None),
+            cache_read_tokens=getattr(usage, "cache_read_input_tokens", None),
+            cache_write_tokens=getattr(usage, "cache_creation_input_tokens", None),
+            target=target
+        )
+    
+    @staticmethod
+    def _split_messages(messages: List[Dict]) -> Tuple[Union[str, List[Dict]], str]:
+        """Convert OpenAI-style messages to Anthropic system/user pair"""
+        system_message = ""
+        user_message = ""
+        
+        for msg in messages:
+            if msg["role"] == "system":
+                system_message = msg["content"]
+                if msg.get("cache_control"):
+                    # Static prefix from the prompt registry - let Anthropic cache it
+                    system_message = [{
+                        "type": "text",
+                        "text": msg["content"],
+                        "cache_control": msg["cache_control"]
+                    }]
+            elif msg["role"] == "user":
+                user_message = msg["content"]
+        
+        return system_message, user_message
+    
+    @staticmethod
+    def _chunk_text(text: str) -> List[str]:
+        """Split text into word-sized chunks for streaming"""
+        return re.findall(r'\S+\s*', text) or [text]
     
     def _fallback_response(self, messages: List[Dict]) -> str:
         """Fallback response when API is unavailable"""
@@ -90,6 +175,13 @@ class AnthropicOrchestratorAgent:
         self.expertise = expertise
         self.logs = []
         self.anthropic_client = AnthropicClient()
+        # Persona prefix rendered once and reused (and provider-cached) on every call
+        self.persona_prompt = prompt_registry.bind(
+            "agent.persona",
+            role=role,
+            expertise=expertise,
+            activation_phrase=activation_phrase
+        )
         
     async def log_action(self, action: str, result: dict):
         """Log all actions"""
@@ -97,6 +189,7 @@ class AnthropicOrchestratorAgent:
             'agent': self.role,
             'action': action,
             'result': result,
+            'prompt_version': self.persona_prompt.template_id,
             'timestamp': datetime.now().isoformat()
         }
         self.logs.append(log_entry)
@@ -104,17 +197,16 @@ class AnthropicOrchestratorAgent:
     
     async def get_ai_response(self, prompt: str, context: str = "") -> str:
         """Get AI response from Anthropic"""
-        messages = [
-            {"role": "system", "content": f"You are {self.role}, {self.expertise}. {self.activation_phrase}"},
-            {"role": "user", "content": f"{context}\n\n{prompt}"}
-        ]
+        messages = self.persona_prompt.messages(context=context, prompt=prompt)
         
         try:
-            response = await self.anthropic_client.create_completion(
-                messages=messages,
-                temperature=0.7,
-                max_tokens=800
-            )
+            with span("agent.ai_response", **{"agent.role": self.role,
+                                              "prompt.version": self.persona_prompt.template_id}):
+                response = await self.anthropic_client.create_completion(
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=800
+                )
             return response
         except Exception as e:
             print(f"Anthropic API Error in {self.role}: {e}")
@@ -0,0 +1,131 @@
+# src/background_writer.py
+"""
+YSense Platform v4.0 - Background Writer
+Bookkeeping writes that don't need to block a response (last_active stamps,
+access audit entries) are queued here and flushed in batches by one daemon
+thread: last_active is coalesced per user, audit rows go in one executemany
+"""
+
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+
+from src.config import Config
+from src.models import AuditLog, User, get_session
+
+class BackgroundWriter:
+    """Batched, best-effort writer; flush() drains everything queued so far"""
+
+    def __init__(self, interval_seconds: Optional[float] = None, max_batch: Optional[int] = None,
+                 session_factory=get_session):
+        self.interval_seconds = interval_seconds or Config.BACKGROUND_WRITE_INTERVAL_SECONDS
+        self.max_batch = max_batch or Config.BACKGROUND_WRITE_BATCH_SIZE
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_active: Dict[str, datetime] = {}
+        self._audit_rows: List[Dict] = []
+
+    # ==================== Queueing ====================
+
+    def touch_last_active(self, user_id: str, when: Optional[datetime] = None):
+        """Record activity; only the latest stamp per user is written"""
+        with self._lock:
+            self._last_active[user_id] = when or datetime.utcnow()
+            queued = len(self._last_active) + len(self._audit_rows)
+        self._queued(queued)
+
+    def audit(self, values: Dict):
+        """Queue an AuditLog row (column -> value)"""
+        with self._lock:
+            self._audit_rows.append(values)
+            queued = len(self._last_active) + len(self._audit_rows)
+        self._queued(queued)
+
+    def pending(self) -> Dict[str, int]:
+        """Queue depth by kind (exported as a metric)"""
+        with self._lock:
+            return {"last_active": len(self._last_active), "audit": len(self._audit_rows)}
+
+    def _queued(self, queued: int):
+        self.start()
+        if queued >= self.max_batch:
+            self._wake.set()
+
+    # ==================== Flushing ====================
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="ysense-background-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the thread after a final flush (called on shutdown)"""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+            self.flush()
+        self.flush()
+
+    def flush(self) -> int:
+        """Write everything queued; returns the number of rows written"""
+        with self._lock:
+            last_active, self._last_active = self._last_active, {}
+            audit_rows, self._audit_rows = self._audit_rows, []
+        if not last_active and not audit_rows:
+            return 0
+
+        db = self.session_factory()
+        try:
+            if last_active:
+                db.bulk_update_mappings(User, [
+                    {"id": user_id, "last_active": when} for user_id, when in last_active.items()
+                ])
+            if audit_rows:
+                db.execute(insert(AuditLog), audit_rows)
+            db.commit()
+            return len(last_active) + len(audit_rows)
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️ Background batch failed ({e}), retrying rows individually")
+            return self._flush_rows(db, last_active, audit_rows)
+        finally:
+            db.close()
+
+    def _flush_rows(self, db, last_active: Dict[str, datetime], audit_rows: List[Dict]) -> int:
+        """One commit per row, so a bad row (e.g. a duplicate audit id) only loses itself"""
+        statements = [
+            (User, [{"id": user_id, "last_active": when}]) for user_id, when in last_active.items()
+        ] + [(AuditLog, values) for values in audit_rows]
+
+        written = 0
+        for model, values in statements:
+            try:
+                if model is User:
+                    db.bulk_update_mappings(User, values)
+                else:
+                    db.execute(insert(AuditLog), [values])
+                db.commit()
+                written += 1
+            except Exception as e:
+                db.rollback()
+                print(f"⚠️ Dropped background {model.__tablename__} write: {e}")
+        return written
+
+background_writer = BackgroundWriter()
@@ -0,0 +1,187 @@
+# src/batch_scoring.py
+"""
+YSense Platform v4.0 - Batch Scoring Engine
+Vectorized (NumPy) quality and revenue scoring for re-scoring the whole corpus
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func, select, update
+
+from src.models import WisdomDrop, get_session
+from src.scoring_config import get_scoring_config
+
+TOOLKIT_LAYER_COLUMNS = (
+    WisdomDrop.layer_narrative,
+    WisdomDrop.layer_somatic,
+    WisdomDrop.layer_attention,
+    WisdomDrop.layer_synesthetic,
+    WisdomDrop.layer_temporal_auditory
+)
+
+# ==================== Columnar Batches ====================
+
+@dataclass
+class DropBatch:
+    """Columnar features for a batch of stored wisdom drops"""
+    ids: List[str]
+    layer_lengths: np.ndarray          # (n, 5) character length per toolkit layer, 0 when empty
+    vibe_word_counts: np.ndarray       # (n,)
+    has_personal_connection: np.ndarray
+    has_essence: np.ndarray
+    distillation_completed: np.ndarray
+    cultural_contexts: np.ndarray      # (n,) object array of strings
+    stored_scores: Optional[np.ndarray] = None  # (n, 3) quality, multiplier, revenue as stored; NaN when NULL
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence) -> "DropBatch":
+        """
+        Build from (id, len x5, vibe_words, personal_connection_len, essence_len,
+        distilled, culture[, quality, multiplier, revenue]) rows
+        """
+        n = len(rows)
+        layer_lengths = np.zeros((n, len(TOOLKIT_LAYER_COLUMNS)), dtype=np.int64)
+        vibe_counts = np.zeros(n, dtype=np.int64)
+        personal = np.zeros(n, dtype=bool)
+        essence = np.zeros(n, dtype=bool)
+        distilled = np.zeros(n, dtype=bool)
+        cultures = np.empty(n, dtype=object)
+        stored = np.full((n, 3), np.nan) if n and len(rows[0]) > 11 else None
+        ids = []
+
+        for i, row in enumerate(rows):
+            ids.append(row[0])
+            layer_lengths[i] = [length or 0 for length in row[1:6]]
+            vibe_counts[i] = len(row[6]) if row[6] else 0
+            personal[i] = bool(row[7])
+            essence[i] = bool(row[8])
+            distilled[i] = bool(row[9])
+            cultures[i] = row[10] or 'Global'
+            if stored is not None:
+                stored[i] = [np.nan if value is None else value for value in row[11:14]]
+
+        return cls(ids, layer_lengths, vibe_counts, personal, essence, distilled, cultures, stored)
+
+# ==================== Scoring ====================
+
+class BatchScorer:
+    """Array versions of the per-drop scoring functions"""
+
+    def __init__(self, cultural_multipliers: Optional[Dict[str, float]] = None, base_rate: float = 50.0):
+        # Snapshot the shared config so a whole re-score run uses one set of multipliers
+        scoring = get_scoring_config()
+        self.cultural_multipliers = cultural_multipliers or scoring.cultural_multipliers
+        self.default_multiplier = scoring.default_multiplier
+        self.base_rate = base_rate
+
+    def cultural_multiplier(self, cultural_contexts: np.ndarray) -> np.ndarray:
+        """Look up each distinct context once, then broadcast back"""
+        if len(cultural_contexts) == 0:
+            return np.zeros(0)
+        unique, inverse = np.unique(cultural_contexts.astype(str), return_inverse=True)
+        table = np.array([self.cultural_multipliers.get(c, self.default_multiplier) for c in unique], dtype=np.float64)
+        return table[inverse]
+
+    def quality_scores(self, batch: DropBatch) -> np.ndarray:
+        """WisdomDrop.calculate_quality_score: 12 per layer over 50 chars, up to 40 for distillation"""
+        score = (batch.layer_lengths > 50).sum(axis=1) * 12.0
+        distillation = (
+            (batch.vibe_word_counts == 3) * 20.0
+            + batch.has_personal_connection * 10.0
+            + batch.has_essence * 10.0
+        )
+        score += np.where(batch.distillation_completed, distillation, 0.0)
+        return np.minimum(score, 100.0)
+
+    def revenue_potential(self, batch: DropBatch, quality_scores: np.ndarray,
+                          multipliers: Optional[np.ndarray] = None) -> np.ndarray:
+        """api.wisdom.calculate_revenue_potential over a batch"""
+        if multipliers is None:
+            multipliers = self.cultural_multiplier(batch.cultural_contexts)
+        distillation_bonus = np.where(batch.distillation_completed, 1.2, 1.0)
+        revenue = self.base_rate * (quality_scores / 100.0) * multipliers * distillation_bonus
+        return np.round(revenue, 2)
+
+# ==================== Corpus Re-scoring ====================
+
+def _feature_query(after_id: Optional[str], chunk_size: int):
+    """Only lengths and flags leave the database, never the layer text"""
+    query = select(
+        WisdomDrop.id,
+        *[func.length(column) for column in TOOLKIT_LAYER_COLUMNS],
+        WisdomDrop.vibe_words,
+        func.length(WisdomDrop.personal_connection),
+        func.length(WisdomDrop.essence),
+        WisdomDrop.distillation_completed,
+        WisdomDrop.cultural_context,
+        WisdomDrop.quality_score,
+        WisdomDrop.cultural_multiplier,
+        WisdomDrop.revenue_potential
+    ).order_by(WisdomDrop.id).limit(chunk_size)
+    if after_id is not None:
+        query = query.where(WisdomDrop.id > after_id)
+    return query
+
+def iter_drop_batches(db, chunk_size: int = 10000) -> Iterator[DropBatch]:
+    """Keyset-paginate the drop table by id as columnar batches"""
+    after_id = None
+    while True:
+        rows = db.execute(_feature_query(after_id, chunk_size)).all()
+        if not rows:
+            return
+        yield DropBatch.from_rows(rows)
+        after_id = rows[-1][0]
+
+def rescore_corpus(db=None, scorer: Optional[BatchScorer] = None, chunk_size: int = 10000,
+                   dry_run: bool = False) -> Dict:
+    """
+    Re-score every wisdom drop and write quality_score, cultural_multiplier and
+    revenue_potential back with one executemany UPDATE per chunk. Only drops whose
+    scores actually change are written; 'changed' counts them (in a dry run, the
+    drops that would change).
+    """
+    owns_session = db is None
+    db = db or get_session()
+    scorer = scorer or BatchScorer()
+    stats = {'drops': 0, 'chunks': 0, 'changed': 0, 'seconds': 0.0}
+    start = time.perf_counter()
+
+    try:
+        for batch in iter_drop_batches(db, chunk_size):
+            quality = scorer.quality_scores(batch)
+            multipliers = scorer.cultural_multiplier(batch.cultural_contexts)
+            revenue = scorer.revenue_potential(batch, quality, multipliers)
+
+            scores = np.column_stack([quality, multipliers, revenue])
+            if batch.stored_scores is None:
+                changed = np.ones(len(batch), dtype=bool)
+            else:
+                changed = ~np.isclose(scores, batch.stored_scores).all(axis=1)  # NULL (NaN) counts as changed
+
+            stats['drops'] += len(batch)
+            stats['chunks'] += 1
+            stats['changed'] += int(changed.sum())
+
+            if not dry_run and changed.any():
+                db.execute(update(WisdomDrop), [
+                    {
+                        'id': batch.ids[i],
+                        'quality_score': float(quality[i]),
+                        'cultural_multiplier': float(multipliers[i]),
+                        'revenue_potential': float(revenue[i])
+                    }
+                    for i in np.flatnonzero(changed)
+                ])
+                db.commit()
+    finally:
+        if owns_session:
+            db.close()
+
+    stats['seconds'] = round(time.perf_counter() - start, 3)
+    return stats
@@ -0,0 +1,225 @@
+# src/bulk_registration.py
+"""
+YSense Platform v4.0 - Bulk Registration Import
+Streams CSV / NDJSON registrations in chunks: one set-based uniqueness query
+per chunk, executemany inserts for users, consent records and audit entries,
+and one outcome per input row (the issued keys for created users)
+"""
+
+import csv
+import json
+import secrets
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from api.auth import UserRegistration, build_registration_rows, has_required_consents
+from src.config import Config
+from src.models import AuditLog, ConsentRecord, User, generate_audit_id, generate_user_id, get_session
+
+FORMATS = ("csv", "ndjson")
+
+# Tries per row when its generated user id is already taken
+ID_ATTEMPTS = 3
+
+# ==================== Parsing ====================
+
+def _clean(record: Dict) -> Dict:
+    """Strip values and drop blank fields so model defaults apply"""
+    return {
+        key.strip(): value.strip() if isinstance(value, str) else value
+        for key, value in record.items()
+        if key and value not in (None, "")
+    }
+
+def read_registrations(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """Yield (line number, fields, parse error) per record without loading the whole file"""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, _clean(record), None
+    elif fmt == "ndjson":
+        for line_no, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "Each line must be a JSON object"
+                continue
+            yield line_no, _clean(record), None
+    else:
+        raise ValueError(f"Unsupported import format '{fmt}' (expected one of: {', '.join(FORMATS)})")
+
+# ==================== Import Pipeline ====================
+
+class BulkRegistrationImporter:
+    """Chunked registration import; run() yields one outcome per row, then a summary"""
+
+    def __init__(self, chunk_size: Optional[int] = None, source: str = "bulk_import",
+                 ip_address: Optional[str] = None, user_agent: Optional[str] = None,
+                 session_factory=get_session):
+        self.chunk_size = chunk_size or Config.BULK_IMPORT_CHUNK_SIZE
+        self.source = source
+        self.ip_address = ip_address
+        self.user_agent = user_agent
+        self.session_factory = session_factory
+        # Usernames / emails already claimed earlier in this file
+        self._seen_usernames: Set[str] = set()
+        self._seen_emails: Set[str] = set()
+        self.stats = {"rows": 0, "created": 0, "duplicate": 0, "invalid": 0, "failed": 0}
+
+    def run(self, records: Iterable[Tuple[int, Optional[Dict], Optional[str]]]) -> Iterator[Dict]:
+        start = time.perf_counter()
+        db = self.session_factory()
+        try:
+            chunk = []
+            for record in records:
+                chunk.append(record)
+                if len(chunk) >= self.chunk_size:
+                    yield from self._import_chunk(db, chunk)
+                    chunk = []
+            if chunk:
+                yield from self._import_chunk(db, chunk)
+        finally:
+            db.close()
+
+        seconds = time.perf_counter() - start
+        yield {"summary": {
+            **self.stats,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(self.stats["rows"] / seconds, 1) if seconds else None
+        }}
+
+    def _outcome(self, line: int, status: str, **fields) -> Dict:
+        self.stats["rows"] += 1
+        self.stats[status] += 1
+        return {"line": line, "status": status, **fields}
+
+    def _import_chunk(self, db, chunk: List[Tuple[int, Optional[Dict], Optional[str]]]) -> Iterator[Dict]:
+        candidates: List[Tuple[int, UserRegistration]] = []
+
+        for line, fields, error in chunk:
+            if error:
+                yield self._outcome(line, "invalid", errors=[error])
+                continue
+            try:
+                registration = UserRegistration(**fields)
+            except ValidationError as e:
+                yield self._outcome(line, "invalid", username=fields.get("username"),
+                                    errors=[f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()])
+                continue
+            if not has_required_consents(registration):
+                yield self._outcome(line, "invalid", username=registration.username,
+                                    errors=["All required consents must be accepted"])
+                continue
+            candidates.append((line, registration))
+
+        # One set-based uniqueness query for the whole chunk
+        taken_usernames, taken_emails = self._existing(db, candidates)
+
+        accepted = []
+        for line, registration in candidates:
+            if (registration.username in taken_usernames or registration.username in self._seen_usernames
+                    or registration.email in taken_emails or registration.email in self._seen_emails):
+                yield self._outcome(line, "duplicate", username=registration.username,
+                                    error="Username or email already exists")
+                continue
+            self._seen_usernames.add(registration.username)
+            self._seen_emails.add(registration.email)
+            accepted.append((line, registration))
+
+        yield from self._insert(db, accepted)
+
+    def _existing(self, db, candidates: List[Tuple[int, UserRegistration]]) -> Tuple[Set[str], Set[str]]:
+        if not candidates:
+            return set(), set()
+        usernames = {registration.username for _, registration in candidates}
+        emails = {registration.email for _, registration in candidates}
+        rows = db.execute(
+            select(User.username, User.email).where(or_(User.username.in_(usernames), User.email.in_(emails)))
+        ).all()
+        return {row.username for row in rows}, {row.email for row in rows}
+
+    def _build(self, registration: UserRegistration, now: datetime, user_id: Optional[str] = None) -> Dict:
+        return build_registration_rows(registration, self.ip_address, self.user_agent, now, user_id)
+
+    def _write(self, db, built: List[Tuple[int, UserRegistration, Dict]]):
+        db.execute(insert(User), [rows["user"] for _, _, rows in built])
+        db.execute(insert(ConsentRecord), [consent for _, _, rows in built for consent in rows["consents"]])
+        db.execute(insert(AuditLog), [
+            {
+                "id": generate_audit_id(rows["user"]["id"], "USER_REGISTRATION"),
+                "user_id": rows["user"]["id"],
+                "action": "USER_REGISTRATION",
+                "action_type": "create",
+                "entity_type": "user",
+                "entity_id": rows["user"]["id"],
+                "audit_metadata": {
+                    "username": registration.username,
+                    "jurisdiction": registration.jurisdiction,
+                    "source": self.source
+                },
+                "ip_address": self.ip_address,
+                "user_agent": self.user_agent
+            }
+            for _, registration, rows in built
+        ])
+        db.commit()
+
+    def _created(self, line: int, registration: UserRegistration, rows: Dict) -> Dict:
+        return self._outcome(
+            line, "created",
+            username=registration.username,
+            user_id=rows["user"]["id"],
+            crypto_key=rows["crypto_key"],
+            z_protocol_consent_key=rows["z_protocol_consent_key"]
+        )
+
+    def _insert(self, db, accepted: List[Tuple[int, UserRegistration]]) -> Iterator[Dict]:
+        if not accepted:
+            return
+
+        now = datetime.utcnow()
+        built = [(line, registration, self._build(registration, now)) for line, registration in accepted]
+
+        try:
+            self._write(db, built)
+        except IntegrityError:
+            db.rollback()
+            # A user registered since the uniqueness check, or a generated user id is
+            # taken (ids are a 32-bit hash): settle the chunk row by row
+            for line, registration, rows in built:
+                yield self._insert_row(db, line, registration, rows, now)
+            return
+
+        for line, registration, rows in built:
+            yield self._created(line, registration, rows)
+
+    def _insert_row(self, db, line: int, registration: UserRegistration, rows: Dict, now: datetime) -> Dict:
+        """One row in its own transaction; a clashing user id is redrawn up to ID_ATTEMPTS times"""
+        error = None
+        for _ in range(ID_ATTEMPTS):
+            try:
+                self._write(db, [(line, registration, rows)])
+                return self._created(line, registration, rows)
+            except IntegrityError as e:
+                db.rollback()
+                error = e
+            taken_usernames, taken_emails = self._existing(db, [(line, registration)])
+            if taken_usernames or taken_emails:
+                return self._outcome(line, "duplicate", username=registration.username,
+                                     error="Username or email already exists")
+            rows = self._build(registration, now, generate_user_id(f"{registration.username}:{secrets.token_hex(8)}"))
+        return self._outcome(line, "failed", username=registration.username, error=str(error.orig))
+
+def import_registrations(lines: Iterable[str], fmt: str, **options) -> Iterator[Dict]:
+    """Parse and import a CSV / NDJSON stream, yielding per-row outcomes then a summary"""
+    return BulkRegistrationImporter(**options).run(read_registrations(lines, fmt))
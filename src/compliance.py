@@ -17,6 +17,8 @@ from sqlalchemy import Column, String, Float, Integer, DateTime, Boolean, Text,
 from sqlalchemy.ext.declarative import declarative_base
 from pydantic import BaseModel, Field, validator, EmailStr
 
+from src.scoring_config import TierSpec, get_scoring_config
+
 Base = declarative_base()
 
 # ==================== Regional Compliance Configuration ====================
@@ -92,6 +94,14 @@ class RevenueTier(Enum):
     PLATINUM = "platinum"
     DIAMOND = "diamond"
 
+def revenue_tier_for(tier: TierSpec) -> RevenueTier:
+    """Enum member for a configured tier: by name, else by level (config names may differ)"""
+    try:
+        return RevenueTier(tier.name.lower())
+    except ValueError:
+        members = list(RevenueTier)
+        return members[min(max(tier.level, 1), len(members)) - 1]
+
 @dataclass
 class TierConfiguration:
     """Revenue tier configuration with dynamic percentages"""
@@ -104,6 +114,7 @@ class TierConfiguration:
     certification_badge: str
     benefits: List[str]
 
+# Badges and benefits per tier; thresholds and shares used for tier derivation come from src.scoring_config
 REVENUE_TIERS = {
     RevenueTier.BRONZE: TierConfiguration(
         tier=RevenueTier.BRONZE,
@@ -164,10 +175,24 @@ class TermsOfServiceV2:
     
     def __init__(self):
         self.version = "2.0"
-        self.effective_date = datetime.now().isoformat()
+        # Fixed per version (bump both together): it dates the document and feeds its
+        # ETag / Last-Modified, so it must match across workers and restarts
+        self.effective_date = "2025-09-01T00:00:00"
         self.jurisdictions = ["Malaysia", "Singapore", "ASEAN", "Global"]
+        self._terms_cache: Dict[Tuple[str, str, str], str] = {}
     
     def get_regional_terms(self, user_region: str) -> str:
+        """Region-specific terms of service, rendered once per known region and version"""
+        if user_region not in self.jurisdictions:
+            return self._render_regional_terms(user_region)
+        
+        key = (user_region, self.version, self.effective_date)
+        terms = self._terms_cache.get(key)
+        if terms is None:
+            terms = self._terms_cache[key] = self._render_regional_terms(user_region)
+        return terms
+    
+    def _render_regional_terms(self, user_region: str) -> str:
         """Generate region-specific terms of service"""
         
         base_terms = f"""
@@ -408,6 +433,7 @@ class ConsentManagementV2:
     def __init__(self):
         self.version = "2.0"
         self.consent_categories = self._define_consent_categories()
+        self._form_cache: Dict[Tuple[str, str], Tuple[Dict, ...]] = {}
     
     def _define_consent_categories(self) -> Dict[str, Dict]:
         """Define granular consent categories"""
@@ -532,6 +558,19 @@ class ConsentManagementV2:
         }
     
     def generate_consent_form(self, user_jurisdiction: str) -> List[Dict]:
+        """Jurisdiction-specific consent form, built once per jurisdiction and version"""
+        jurisdiction = user_jurisdiction.lower()
+        named = {j for c in self.consent_categories.values() for j in c.get("jurisdictions", [])}
+        # Jurisdictions no category names get the same "all"-only form, so they share one entry
+        key = (jurisdiction if jurisdiction in named else "*", self.version)
+        
+        form = self._form_cache.get(key)
+        if form is None:
+            form = self._form_cache[key] = tuple(self._build_consent_form(user_jurisdiction))
+        # Copies, so callers can tick "checked" without touching the cached form
+        return [dict(item) for item in form]
+    
+    def _build_consent_form(self, user_jurisdiction: str) -> List[Dict]:
         """Generate jurisdiction-specific consent form"""
         consent_items = []
         
@@ -639,6 +678,9 @@ class UserV2(Base):
     z_protocol_tier = Column(SQLEnum(RevenueTier), default=RevenueTier.BRONZE)
     z_protocol_history = Column(JSON)  # Track score changes
     
+    # Published contributions, read by calculate_revenue_tier
+    contribution_count = Column(Integer, default=0)
+    
     # Dynamic Revenue Tier
     revenue_tier = Column(SQLEnum(RevenueTier), default=RevenueTier.BRONZE)
     revenue_share_percentage = Column(Float, default=30.0)
@@ -691,40 +733,27 @@ class UserV2(Base):
     
     def calculate_revenue_tier(self) -> RevenueTier:
         """Calculate user's revenue tier based on Z Protocol score and contributions"""
-        
-        for tier in [RevenueTier.DIAMOND, RevenueTier.PLATINUM, RevenueTier.GOLD, 
-                    RevenueTier.SILVER, RevenueTier.BRONZE]:
-            config = REVENUE_TIERS[tier]
-            
-            if (self.z_protocol_score >= config.z_protocol_minimum and 
-                self.contribution_count >= config.contribution_minimum):
-                return tier
-        
-        return RevenueTier.BRONZE
+        return revenue_tier_for(get_scoring_config().tier_for(self.z_protocol_score, self.contribution_count))
     
     def update_revenue_tier(self):
         """Update user's revenue tier and benefits"""
-        new_tier = self.calculate_revenue_tier()
+        scoring = get_scoring_config()
+        spec = scoring.tier_for(self.z_protocol_score, self.contribution_count)
+        new_tier = revenue_tier_for(spec)
         
         if new_tier != self.revenue_tier:
             self.revenue_tier = new_tier
-            config = REVENUE_TIERS[new_tier]
-            self.revenue_share_percentage = config.revenue_share_percentage
-            self.cultural_multiplier = config.cultural_multiplier_bonus
+            self.revenue_share_percentage = spec.revenue_share
+            self.cultural_multiplier = spec.multiplier
             self.tier_achievement_date = datetime.utcnow()
             
             # Calculate next tier requirements
-            tier_order = [RevenueTier.BRONZE, RevenueTier.SILVER, RevenueTier.GOLD,
-                         RevenueTier.PLATINUM, RevenueTier.DIAMOND]
-            
-            current_index = tier_order.index(new_tier)
-            if current_index < len(tier_order) - 1:
-                next_tier = tier_order[current_index + 1]
-                next_config = REVENUE_TIERS[next_tier]
+            next_tier = scoring.next_tier(spec.name)
+            if next_tier:
                 self.next_tier_requirements = {
-                    "tier": next_tier.value,
-                    "z_protocol_needed": next_config.z_protocol_minimum,
-                    "contributions_needed": next_config.contribution_minimum,
+                    "tier": next_tier.name.lower(),
+                    "z_protocol_needed": next_tier.min_score,
+                    "contributions_needed": next_tier.min_drops,
                     "current_score": self.z_protocol_score,
                     "current_contributions": self.contribution_count
                 }
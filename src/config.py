@@ -30,12 +30,27 @@ class Config:
     QWEN_API_KEY = os.getenv('QWEN_API_KEY')
     ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
     
+    # ==================== LLM Stub (Load Testing) ====================
+    # Points QWENClient and AnthropicClient at scripts/llm_stub_server.py
+    USE_LLM_STUB = os.getenv('USE_LLM_STUB', 'false').lower() == 'true'
+    LLM_STUB_URL = os.getenv('LLM_STUB_URL', 'http://127.0.0.1:8090').rstrip('/')
+    
     # ==================== Security ====================
     SECRET_KEY = os.getenv('SECRET_KEY', secrets.token_hex(32))
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', secrets.token_hex(32))
     JWT_ALGORITHM = "HS256"
-    JWT_EXPIRATION_HOURS = 24
+    JWT_ACCESS_TOKEN_MINUTES = int(os.getenv('JWT_ACCESS_TOKEN_MINUTES', '15'))
+    # Refresh tokens let clients renew access tokens without re-sending the crypto key
+    JWT_REFRESH_EXPIRATION_DAYS = int(os.getenv('JWT_REFRESH_EXPIRATION_DAYS', '30'))
+    # Revocations reach other workers within this interval (in-process ones apply immediately)
+    TOKEN_REVOCATION_SYNC_SECONDS = int(os.getenv('TOKEN_REVOCATION_SYNC_SECONDS', '30'))
     ENCRYPTION_KEY = os.getenv('ENCRYPTION_KEY', secrets.token_hex(32))
+    # Admin endpoints (bulk import) are disabled unless a key is configured
+    ADMIN_API_KEY = os.getenv('ADMIN_API_KEY', '')
+    BULK_IMPORT_CHUNK_SIZE = int(os.getenv('BULK_IMPORT_CHUNK_SIZE', '1000'))
+    # HMAC key for the stored key index. Deliberately separate from SECRET_KEY so rotating that
+    # leaves the index alone; changing this one triggers a full reindex at startup
+    KEY_INDEX_SECRET = os.getenv('KEY_INDEX_SECRET', 'ysense-local-key-index')
     
     # ==================== Database ====================
     USE_POSTGRESQL = os.getenv('USE_POSTGRESQL', 'false').lower() == 'true'
@@ -58,40 +73,69 @@ class Config:
     Z_PROTOCOL_VERSION = os.getenv('Z_PROTOCOL_VERSION', '2.0')
     ENABLE_Z_PROTOCOL = os.getenv('ENABLE_Z_PROTOCOL', 'true').lower() == 'true'
     
-    # Z Protocol Tiers with revenue sharing percentages
+    # Z Protocol Tiers with revenue sharing percentages and promotion minimums
+    # (defaults for src.scoring_config; override with SCORING_CONFIG_PATH)
     Z_PROTOCOL_TIERS = {
         1: {
             "name": "Bronze",
             "multiplier": 1.0,
             "consent_required": True,
-            "revenue_share": 30.0
+            "revenue_share": 30.0,
+            "min_score": 0.0,
+            "min_drops": 0
         },
         2: {
             "name": "Silver",
             "multiplier": 1.1,
             "consent_required": True,
-            "revenue_share": 35.0
+            "revenue_share": 35.0,
+            "min_score": 60.0,
+            "min_drops": 5
         },
         3: {
             "name": "Gold",
             "multiplier": 1.2,
             "consent_required": True,
-            "revenue_share": 40.0
+            "revenue_share": 40.0,
+            "min_score": 75.0,
+            "min_drops": 15
         },
         4: {
             "name": "Platinum",
             "multiplier": 1.3,
             "consent_required": True,
-            "revenue_share": 45.0
+            "revenue_share": 45.0,
+            "min_score": 85.0,
+            "min_drops": 30
         },
         5: {
             "name": "Diamond",
             "multiplier": 1.5,
             "consent_required": True,
-            "revenue_share": 50.0
+            "revenue_share": 50.0,
+            "min_score": 95.0,
+            "min_drops": 50
         }
     }
     
+    # Cultural context multipliers for revenue
+    CULTURAL_MULTIPLIERS = {
+        'Malaysian': 1.5,
+        'Malaysian Chinese': 1.6,
+        'Hokkien': 1.7,
+        'Southeast Asian': 1.3,
+        'Kampung': 1.4,
+        'Indigenous': 1.4,
+        'Asian': 1.2,
+        'Global South': 1.15,
+        'Global': 1.0,
+        'Default': 1.0
+    }
+    
+    # Optional JSON file overriding tiers/multipliers, re-read when it changes
+    SCORING_CONFIG_PATH = os.getenv('SCORING_CONFIG_PATH', '')
+    SCORING_CONFIG_CHECK_SECONDS = float(os.getenv('SCORING_CONFIG_CHECK_SECONDS', '5'))
+    
     # ==================== Defensive Publication ====================
     DEFENSIVE_PUBLICATION_DOI = os.getenv('DEFENSIVE_PUBLICATION_DOI', 
                                           '10.5281/zenodo.17072168')
@@ -109,6 +153,60 @@ class Config:
     CORS_ALLOW_ALL = os.getenv('CORS_ALLOW_ALL', 'true').lower() == 'true'
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*').split(',') if not CORS_ALLOW_ALL else ['*']
     
+    # Response compression: bodies under the threshold are sent as-is
+    COMPRESSION_MINIMUM_SIZE = int(os.getenv('COMPRESSION_MINIMUM_SIZE', '1000'))
+    GZIP_COMPRESSION_LEVEL = int(os.getenv('GZIP_COMPRESSION_LEVEL', '6'))
+    ENABLE_BROTLI = os.getenv('ENABLE_BROTLI', 'true').lower() == 'true'  # needs brotli-asgi
+    BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '4'))
+    
+    # HTTP caching: max-age for public documents, TTL of the per-process drop version map
+    HTTP_CACHE_PUBLIC_MAX_AGE = int(os.getenv('HTTP_CACHE_PUBLIC_MAX_AGE', '3600'))
+    HTTP_CACHE_VERSION_TTL_SECONDS = float(os.getenv('HTTP_CACHE_VERSION_TTL_SECONDS', '30'))
+    HTTP_CACHE_MAX_ENTRIES = int(os.getenv('HTTP_CACHE_MAX_ENTRIES', '10000'))
+    
+    # Rate limiting: token bucket per client; route costs live in src/rate_limit.py
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_CAPACITY = int(os.getenv('RATE_LIMIT_CAPACITY', '60'))
+    RATE_LIMIT_REFILL_PER_SECOND = float(os.getenv('RATE_LIMIT_REFILL_PER_SECOND', '1.0'))
+    RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', '100000'))
+    
+    # Admission control for AI analyses (per worker): adaptive in-flight limit + bounded wait queue
+    ADMISSION_INITIAL_LIMIT = int(os.getenv('ADMISSION_INITIAL_LIMIT', '8'))
+    ADMISSION_MIN_LIMIT = int(os.getenv('ADMISSION_MIN_LIMIT', '1'))
+    ADMISSION_MAX_LIMIT = int(os.getenv('ADMISSION_MAX_LIMIT', '64'))
+    ADMISSION_MAX_QUEUE = int(os.getenv('ADMISSION_MAX_QUEUE', '32'))
+    ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv('ADMISSION_QUEUE_TIMEOUT_SECONDS', '10'))
+    ADMISSION_LATENCY_TARGET_SECONDS = float(os.getenv('ADMISSION_LATENCY_TARGET_SECONDS', '30'))
+    ADMISSION_BACKOFF = float(os.getenv('ADMISSION_BACKOFF', '0.8'))
+    
+    # Deferred bookkeeping writes (last_active, access audit entries)
+    BACKGROUND_WRITE_INTERVAL_SECONDS = float(os.getenv('BACKGROUND_WRITE_INTERVAL_SECONDS', '2'))
+    BACKGROUND_WRITE_BATCH_SIZE = int(os.getenv('BACKGROUND_WRITE_BATCH_SIZE', '500'))
+    
+    # ==================== Observability ====================
+    # Tracing needs opentelemetry-sdk (+ opentelemetry-exporter-otlp-proto-http for OTLP)
+    TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'false').lower() == 'true'
+    TRACE_EXPORTER = os.getenv('TRACE_EXPORTER', 'otlp')  # otlp, file, console
+    OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces')
+    OTEL_SERVICE_NAME = os.getenv('OTEL_SERVICE_NAME', 'ysense-platform')
+    TRACE_FILE_PATH = os.getenv('TRACE_FILE_PATH', 'traces.jsonl')
+    TRACE_SAMPLE_RATIO = float(os.getenv('TRACE_SAMPLE_RATIO', '1.0'))
+    # Prometheus metrics at /metrics (needs prometheus-client)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    # Request profiling: slow requests on PROFILE_PATHS (empty = all) are saved with a
+    # pyinstrument profile (if installed), their SQL query log and LLM call timings
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILE_PATHS = [p for p in os.getenv(
+        'PROFILE_PATHS', '/api/v4/wisdom/create-wisdom-drop,/api/v4/wisdom/analyze-story'
+    ).split(',') if p]
+    PROFILE_SLOW_MS = float(os.getenv('PROFILE_SLOW_MS', '2000'))
+    PROFILE_INTERVAL_SECONDS = float(os.getenv('PROFILE_INTERVAL_SECONDS', '0.001'))
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+    PROFILE_MAX_CAPTURES = int(os.getenv('PROFILE_MAX_CAPTURES', '200'))
+    # Per-request SQL counts in X-Query-* response headers (development; on with DEBUG)
+    QUERY_DEBUG_HEADERS = os.getenv('QUERY_DEBUG_HEADERS', str(DEBUG)).lower() == 'true'
+    QUERY_REPEAT_WARNING = int(os.getenv('QUERY_REPEAT_WARNING', '5'))
+    
     # ==================== Email Settings (Optional) ====================
     SMTP_HOST = os.getenv('SMTP_HOST')
     SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
@@ -150,10 +248,20 @@ class Config:
         elif cls.ANTHROPIC_API_KEY.startswith('sk-ant-your'):
             errors.append("Anthropic API key is still a placeholder")
         
+        if cls.USE_LLM_STUB and cls.ENVIRONMENT == 'production':
+            errors.append("USE_LLM_STUB must not be enabled in production")
+        
         # Check security keys
         if len(cls.SECRET_KEY) < 32:
             warnings.append("SECRET_KEY should be at least 32 characters")
         
+        if not os.getenv('KEY_INDEX_SECRET'):
+            msg = "KEY_INDEX_SECRET not set - key index uses the local development secret"
+            if strict or cls.ENVIRONMENT == 'production':
+                errors.append(msg)
+            else:
+                warnings.append(msg)
+        
         # Display warnings
         if warnings:
             print("\n⚠️  Configuration Warnings:")
@@ -193,10 +301,12 @@ class Config:
         print("\n🔑 API Keys:")
         print(f"   QWEN: {'✅ Configured' if cls.QWEN_API_KEY else '⚠️  Not configured'}")
         print(f"   Anthropic: {'✅ Configured' if cls.ANTHROPIC_API_KEY else '⚠️  Not configured'}")
+        if cls.USE_LLM_STUB:
+            print(f"   LLM Stub: ⚠️  Enabled ({cls.LLM_STUB_URL})")
         
         print("\n🛡️  Security:")
         print(f"   JWT Algorithm: {cls.JWT_ALGORITHM}")
-        print(f"   JWT Expiration: {cls.JWT_EXPIRATION_HOURS} hours")
+        print(f"   JWT Expiration: {cls.JWT_ACCESS_TOKEN_MINUTES} minutes (refresh: {cls.JWT_REFRESH_EXPIRATION_DAYS} days)")
         print(f"   Secret Key: {'✅ Generated' if cls.SECRET_KEY else '❌ Missing'}")
         
         print("\n💰 Revenue Settings:")
@@ -221,7 +331,8 @@ class Config:
     @classmethod
     def get_tier_info(cls, level: int):
         """Get information about a specific Z Protocol tier"""
-        return cls.Z_PROTOCOL_TIERS.get(level, cls.Z_PROTOCOL_TIERS[1])
+        from src.scoring_config import get_scoring_config
+        return get_scoring_config().tier_info(level)
     
     @classmethod
     def is_production(cls):
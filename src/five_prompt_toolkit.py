@@ -11,6 +11,8 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 import re
 
+from src.scoring_config import get_scoring_config
+
 class FivePromptToolkit:
     """
     Implementation of the 5-Prompt Perception Toolkit™ 
@@ -55,21 +57,14 @@ class FivePromptToolkit:
         # The Sacred Distillation Prompt - Y's Role
         self.distillation_prompt = "If you had to describe the single, core 'echo' that this entire experience leaves in your heart, what is that feeling?"
         
-        # Cultural multipliers for Malaysian context
-        self.cultural_multipliers = {
-            'Malaysian': 1.5,
-            'Malaysian Chinese': 1.6,
-            'Hokkien': 1.7,
-            'Southeast Asian': 1.3,
-            'Kampung': 1.4,
-            'Indigenous': 1.4,
-            'Global South': 1.15,
-            'Default': 1.0
-        }
-        
         # Archive of Alton's wisdom drops (from documentation)
         self.wisdom_archive = self._load_archive()
     
+    @property
+    def cultural_multipliers(self):
+        """Cultural multipliers for Malaysian context (shared scoring config)"""
+        return get_scoring_config().cultural_multipliers
+    
     def _load_archive(self) -> List[Dict]:
         """Load the documented wisdom drops from Alton's archive"""
         return [
@@ -263,10 +258,7 @@ class FivePromptToolkit:
         base_rate = 50.0  # €50 base
         
         # Get cultural multiplier
-        multiplier = self.cultural_multipliers.get(
-            cultural_context,
-            self.cultural_multipliers['Default']
-        )
+        multiplier = get_scoring_config().cultural_multiplier(cultural_context)
         
         # Special bonus for complete distillation
         if quality_score >= 0.95:
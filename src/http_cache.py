@@ -0,0 +1,155 @@
+# src/http_cache.py
+"""
+YSense Platform v4.0 - HTTP Caching
+Strong ETags / Last-Modified derived from content versions, 304 Not Modified
+answers for conditional requests, and a process-local map of published drop
+versions so revalidation of a known drop skips the database
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.config import Config
+from src.metrics import cache_lookup
+from src.responses import APIResponse
+
+PUBLIC_CACHE_CONTROL = f"public, max-age={Config.HTTP_CACHE_PUBLIC_MAX_AGE}"
+# Owner-only content: clients keep a copy but revalidate every time
+PRIVATE_REVALIDATE = "private, no-cache"
+
+# ==================== Validators ====================
+
+def strong_etag(*parts: Any) -> str:
+    """Quoted strong ETag over the content version parts"""
+    digest = hashlib.sha256("\x1f".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+def http_date(value: datetime) -> str:
+    """RFC 7231 HTTP-date; naive datetimes are treated as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match (weak comparison), falling back to If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        modified = last_modified if last_modified.tzinfo else last_modified.replace(tzinfo=timezone.utc)
+        return modified.replace(microsecond=0) <= since
+    return False
+
+def cache_headers(etag: str, last_modified: Optional[datetime] = None,
+                  cache_control: str = PUBLIC_CACHE_CONTROL) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None,
+                 cache_control: str = PUBLIC_CACHE_CONTROL) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, last_modified, cache_control))
+
+def cached_response(request: Request, etag: str, build: Callable[[], Any],
+                    last_modified: Optional[datetime] = None,
+                    cache_control: str = PUBLIC_CACHE_CONTROL) -> Response:
+    """304 when the client's copy is current, otherwise build() the body; build is skipped on a hit"""
+    if is_not_modified(request, etag, last_modified):
+        cache_lookup("http_conditional", True)
+        return not_modified(etag, last_modified, cache_control)
+    if "if-none-match" in request.headers or "if-modified-since" in request.headers:
+        cache_lookup("http_conditional", False)
+    return APIResponse(build(), headers=cache_headers(etag, last_modified, cache_control))
+
+# ==================== Drop Version Map ====================
+
+@dataclass(frozen=True)
+class DropVersion:
+    user_id: str
+    etag: str
+    last_modified: datetime
+    expires_at: float
+
+class DropVersionMap:
+    """
+    Bounded LRU of wisdom_id -> current ETag for published drops. Writes in
+    this process invalidate entries directly; the TTL bounds staleness from
+    writes made by other workers.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, DropVersion]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def version_time(wisdom_drop) -> datetime:
+        # updated_at has onupdate=utcnow, so every ORM or Core UPDATE bumps it
+        return wisdom_drop.updated_at or wisdom_drop.created_at
+
+    @classmethod
+    def etag_for(cls, wisdom_drop) -> str:
+        return strong_etag("wisdom_drop", wisdom_drop.id, cls.version_time(wisdom_drop).isoformat())
+
+    def get(self, wisdom_id: str) -> Optional[DropVersion]:
+        with self._lock:
+            entry = self._entries.get(wisdom_id)
+            if entry is not None and entry.expires_at < time.monotonic():
+                del self._entries[wisdom_id]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(wisdom_id)
+        cache_lookup("drop_versions", entry is not None)
+        return entry
+
+    def remember(self, wisdom_drop) -> DropVersion:
+        entry = DropVersion(
+            user_id=wisdom_drop.user_id,
+            etag=self.etag_for(wisdom_drop),
+            last_modified=self.version_time(wisdom_drop),
+            expires_at=time.monotonic() + self.ttl_seconds
+        )
+        with self._lock:
+            self._entries[wisdom_drop.id] = entry
+            self._entries.move_to_end(wisdom_drop.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def forget(self, *wisdom_ids: str):
+        with self._lock:
+            for wisdom_id in wisdom_ids:
+                self._entries.pop(wisdom_id, None)
+
+    def forget_user(self, user_id: str):
+        with self._lock:
+            for wisdom_id in [k for k, v in self._entries.items() if v.user_id == user_id]:
+                del self._entries[wisdom_id]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+drop_versions = DropVersionMap(Config.HTTP_CACHE_MAX_ENTRIES, Config.HTTP_CACHE_VERSION_TTL_SECONDS)
@@ -5,6 +5,8 @@ Each agent has a specific lens for finding value in human wisdom
 """
 
 from qwen_integration import QWENClient, QWENWisdomExtractor
+from prompt_registry import prompt_registry
+from scoring_config import get_scoring_config
 from typing import Dict, List
 import json
 import asyncio
@@ -124,38 +126,20 @@ class WisdomExtractionTeam:
     async def synthesize_response(self, story: str, layers: Dict, agent_insights: Dict) -> str:
         """Create beautiful unified response to user"""
         
-        synthesis_prompt = f"""
-        Create a warm, meaningful response to someone who shared their wisdom.
-        
-        Their story essence:
-        - Wisdom found: {layers.get('wisdom', '')}
-        - Cultural gift: {layers.get('cultural', '')}
-        - Emotional core: {layers.get('emotional', '')}
-        
-        Key insights from our team:
-        - Vision (ALTON): {agent_insights.get('ALTON', '')}
-        - Learning (PED): {agent_insights.get('PED', '')}
-        
-        Write a 2-3 sentence response that:
-        1. Honors their contribution
-        2. Shows we deeply understood
-        3. Explains how this wisdom will help AI learn
-        
-        Be warm, genuine, and specific to their story.
-        """
+        messages = prompt_registry.bound("team.synthesis").messages(
+            wisdom=layers.get('wisdom', ''),
+            cultural=layers.get('cultural', ''),
+            emotional=layers.get('emotional', ''),
+            alton=agent_insights.get('ALTON', ''),
+            ped=agent_insights.get('PED', '')
+        )
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You craft meaningful responses that make people feel their wisdom matters."},
-                    {"role": "user", "content": synthesis_prompt}
-                ],
+            return await self.extractor.client.create_completion(
+                messages=messages,
                 temperature=0.8,
                 max_tokens=150
             )
-            
-            return response.choices[0].message.content
         except:
             return "Your wisdom has been received with gratitude. Every story shared helps AI understand the beauty of human experience."
     
@@ -169,13 +153,7 @@ class WisdomExtractionTeam:
         base_rate = 50.0  # EUR
         quality = self._calculate_quality(layers) / 100
         
-        cultural_multipliers = {
-            'Malaysian': 1.6,
-            'Southeast Asian': 1.3,
-            'Global': 1.0
-        }
-        
-        multiplier = cultural_multipliers.get(culture, 1.0)
+        multiplier = get_scoring_config().cultural_multiplier(culture)
         return round(base_rate * quality * multiplier, 2)
 
 # Interactive Response Generator for UI
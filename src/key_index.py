@@ -0,0 +1,123 @@
+# src/key_index.py
+"""
+YSense Platform v4.0 - Hashed Key Index
+Crypto keys and Z Protocol consent keys are indexed by an HMAC of their
+canonical form (no dashes/whitespace, lowercase), so a pasted key in any
+formatting resolves with one unique-index probe and is compared in constant time
+"""
+
+import hashlib
+import hmac
+import re
+from typing import Dict, Optional
+
+from sqlalchemy import or_
+
+from src.config import Config
+from src.models import User, get_session
+
+CRYPTO_KEY = "crypto_key"
+CONSENT_KEY = "z_protocol_consent_key"
+
+_SEPARATORS = re.compile(r"[\s\-]+")
+
+# ==================== Canonical Form ====================
+
+def canonical_key(key: str) -> str:
+    """Key as issued, minus the display dashes, case-insensitive"""
+    return _SEPARATORS.sub("", key or "").lower()
+
+def key_digest(key: str, purpose: str) -> str:
+    """HMAC-SHA256 of the canonical key; purpose keeps crypto and consent digests distinct"""
+    message = f"{purpose}:{canonical_key(key)}".encode()
+    return hmac.new(Config.KEY_INDEX_SECRET.encode(), message, hashlib.sha256).hexdigest()
+
+def key_index_values(crypto_key: Optional[str], z_protocol_consent_key: Optional[str]) -> Dict[str, Optional[str]]:
+    """Index column values for a user's keys"""
+    return {
+        "crypto_key_index": key_digest(crypto_key, CRYPTO_KEY) if crypto_key else None,
+        "consent_key_index": key_digest(z_protocol_consent_key, CONSENT_KEY) if z_protocol_consent_key else None
+    }
+
+def set_user_keys(user: User, crypto_key: str, z_protocol_consent_key: str):
+    """Assign new keys and their index values together"""
+    user.crypto_key = crypto_key
+    user.z_protocol_consent_key = z_protocol_consent_key
+    for column, value in key_index_values(crypto_key, z_protocol_consent_key).items():
+        setattr(user, column, value)
+
+# ==================== Lookup Service ====================
+
+class KeyLookupService:
+    """Single indexed probe per lookup; digests compared with hmac.compare_digest"""
+
+    def by_consent_key(self, db, z_protocol_consent_key: str) -> Optional[User]:
+        digest = key_digest(z_protocol_consent_key, CONSENT_KEY)
+        user = db.query(User).filter(User.consent_key_index == digest).first()
+        if user and hmac.compare_digest(user.consent_key_index, digest):
+            return user
+        return None
+
+    def crypto_key_matches(self, user: User, crypto_key: str) -> bool:
+        if not user.crypto_key_index:
+            return False
+        return hmac.compare_digest(user.crypto_key_index, key_digest(crypto_key, CRYPTO_KEY))
+
+    def by_identifier(self, db, username_or_email: str) -> Optional[User]:
+        """
+        Probe the email or username unique index depending on the input's shape
+        (an OR across both columns can't use either index on many planners)
+        """
+        if "@" in username_or_email:
+            user = db.query(User).filter(User.email == username_or_email).first()
+            if user:
+                return user
+        # Usernames aren't restricted, so an '@' identifier can still be a username
+        return db.query(User).filter(User.username == username_or_email).first()
+
+    def authenticate(self, db, username_or_email: str, crypto_key: str) -> Optional[User]:
+        """User for the identifier whose crypto key matches, else None"""
+        user = self.by_identifier(db, username_or_email)
+        if user and self.crypto_key_matches(user, crypto_key):
+            return user
+        return None
+
+def index_secret_changed(db) -> bool:
+    """True when stored digests were made with a different KEY_INDEX_SECRET (checked on one indexed row)"""
+    row = db.query(User.crypto_key, User.crypto_key_index).filter(User.crypto_key_index != None).first()
+    return row is not None and not hmac.compare_digest(row.crypto_key_index, key_digest(row.crypto_key, CRYPTO_KEY))
+
+def backfill_key_index(batch_size: int = 1000, reindex: bool = False) -> int:
+    """
+    Fill index columns for users created before they existed. reindex=True
+    recomputes every row; that also happens automatically when the stored
+    digests show KEY_INDEX_SECRET has changed, so lookups keep working.
+    """
+    db = get_session()
+    updated = 0
+    try:
+        if not reindex and index_secret_changed(db):
+            print("🔑 KEY_INDEX_SECRET changed since the key index was built - reindexing every user")
+            reindex = True
+        query = db.query(User.id, User.crypto_key, User.z_protocol_consent_key)
+        if not reindex:
+            query = query.filter(or_(
+                User.crypto_key_index == None,
+                (User.consent_key_index == None) & (User.z_protocol_consent_key != None)
+            ))
+        rows = query.all()
+        for start in range(0, len(rows), batch_size):
+            db.bulk_update_mappings(User, [
+                {"id": user_id, **key_index_values(crypto_key, consent_key)}
+                for user_id, crypto_key, consent_key in rows[start:start + batch_size]
+            ])
+            db.commit()
+            updated += len(rows[start:start + batch_size])
+    finally:
+        db.close()
+
+    if updated:
+        print(f"🔑 Key index backfilled for {updated} users")
+    return updated
+
+key_lookup = KeyLookupService()
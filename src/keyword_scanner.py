@@ -0,0 +1,81 @@
+# src/keyword_scanner.py
+"""
+YSense Platform v4.0 - Multi-Pattern Keyword Scanner
+One precompiled word-boundary regex that finds every indicator keyword in a single pass
+"""
+
+import re
+from typing import Dict, Iterable, List, Tuple
+
+def sentence_span(text: str, position: int) -> Tuple[int, int]:
+    """Bounds of the '.'-delimited sentence containing position"""
+    start = text.rfind('.', 0, position) + 1
+    end = text.find('.', position)
+    return start, len(text) if end == -1 else end
+
+class KeywordHits:
+    """Result of one scan: every keyword found and where"""
+
+    def __init__(self, positions: Dict[str, List[int]], groups: Dict[str, Tuple[str, ...]]):
+        self._positions = positions
+        self._groups = groups
+
+    def has(self, keyword: str) -> bool:
+        return keyword.lower() in self._positions
+
+    def found(self, group: str) -> List[str]:
+        """Keywords of a group that were hit, in the group's declared order"""
+        return [keyword for keyword in self._groups[group] if keyword in self._positions]
+
+    def count(self, group: str) -> int:
+        """Number of distinct keywords of a group that were hit"""
+        return sum(1 for keyword in self._groups[group] if keyword in self._positions)
+
+    def first_position(self, keyword: str) -> int:
+        return self._positions[keyword.lower()][0]
+
+    def positions(self, group: str) -> List[int]:
+        """All match offsets for a group's keywords, in text order"""
+        return sorted(
+            position
+            for keyword in self._groups[group] if keyword in self._positions
+            for position in self._positions[keyword]
+        )
+
+class KeywordScanner:
+    """
+    Scans text once for all keyword groups.
+
+    Keywords match case-insensitively on word boundaries, so "when" no longer
+    matches inside "whenever". A multi-word keyword also credits the keywords
+    it contains ("oral tradition" counts as "tradition" too).
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        self.groups: Dict[str, Tuple[str, ...]] = {
+            name: tuple(dict.fromkeys(keyword.lower() for keyword in keywords))
+            for name, keywords in groups.items()
+        }
+        keywords = sorted({k for group in self.groups.values() for k in group}, key=len, reverse=True)
+
+        # Longest first so the alternation prefers "oral tradition" over "tradition"
+        self.pattern = re.compile(
+            r'\b(?:' + '|'.join(re.escape(keyword) for keyword in keywords) + r')\b',
+            re.IGNORECASE
+        )
+        self._contained = {
+            keyword: tuple(
+                other for other in keywords
+                if other != keyword and re.search(r'\b' + re.escape(other) + r'\b', keyword)
+            )
+            for keyword in keywords
+        }
+
+    def scan(self, text: str) -> KeywordHits:
+        positions: Dict[str, List[int]] = {}
+        if text:
+            for match in self.pattern.finditer(text):
+                keyword = match.group(0).lower()
+                for hit in (keyword,) + self._contained.get(keyword, ()):
+                    positions.setdefault(hit, []).append(match.start())
+        return KeywordHits(positions, self.groups)
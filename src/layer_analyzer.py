@@ -7,10 +7,15 @@ Extracts maximum value from each wisdom drop with QWEN AI integration
 import os
 import json
 import hashlib
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime
 import numpy as np
+from collections import OrderedDict
 from src.qwen_integration import QWENClient
+from src.prompt_registry import prompt_registry, LAYER_ANALYSIS_INSTRUCTIONS
+from src.keyword_scanner import KeywordScanner, sentence_span
+from src.metrics import cache_lookup
+from src.scoring_config import get_scoring_config
 
 class LayerAnalyzer:
     """Deep analysis for Five-Layer Perception™"""
@@ -28,21 +33,120 @@ class LayerAnalyzer:
             'cultural': "Identify cultural perspective: What cultural values, traditions, or viewpoints are present?"
         }
         
-        # Cultural context multipliers for revenue
-        self.cultural_multipliers = {
-            'Malaysian': 1.5,
-            'Southeast Asian': 1.3,
-            'Asian': 1.2,
-            'Global South': 1.15,
-            'Indigenous': 1.4,
-            'Default': 1.0
+        # Versioned layer prompts from the registry (static prefix is provider-cached)
+        self.layer_templates = {
+            layer: prompt_registry.bound(f"layer_analysis.{layer}")
+            for layer in LAYER_ANALYSIS_INSTRUCTIONS
         }
+        
+        # Completed layer responses keyed by template version + story
+        self._layer_cache = OrderedDict()
+        self._layer_cache_size = 256
+        
+        # Every indicator list used for scoring and fallback extraction, matched in one pass
+        self.keyword_scanner = KeywordScanner({
+            # Layer quality indicators
+            'quality.surface': ['specifically', 'concretely', 'achieved', 'accomplished', 'created', 'built'],
+            'quality.emotional': ['felt', 'experienced', 'emotions', 'feeling', 'joy', 'challenge', 'growth'],
+            'quality.contextual': ['when', 'where', 'because', 'circumstances', 'environment', 'situation'],
+            'quality.wisdom': ['learned', 'realized', 'insight', 'principle', 'truth', 'lesson', 'understanding'],
+            'quality.cultural': ['values', 'tradition', 'culture', 'community', 'heritage', 'beliefs', 'customs'],
+            # Revenue value indicators
+            'value.wisdom': ['universal', 'timeless', 'principle', 'fundamental', 'essential',
+                             'breakthrough', 'innovation', 'discovery', 'insight', 'truth'],
+            'value.cultural_rarity': ['traditional', 'ancestral', 'indigenous', 'heritage', 'ancient',
+                                      'ritual', 'ceremony', 'custom', 'folklore', 'oral tradition'],
+            'value.commercial': ['training', 'learning', 'teaching', 'education', 'development',
+                                 'problem-solving', 'decision-making', 'leadership', 'innovation'],
+            # Fallback extraction markers
+            'extract.surface': ['did', 'made', 'created', 'built', 'achieved', 'completed', 'started'],
+            'emotion.positive': ['happy', 'excited', 'proud', 'grateful', 'inspired', 'confident'],
+            'emotion.negative': ['frustrated', 'worried', 'anxious', 'disappointed', 'stressed'],
+            'emotion.neutral': ['focused', 'determined', 'curious', 'thoughtful'],
+            'context.time': ['when', 'during', 'after', 'before', 'while'],
+            'context.place': ['at', 'in', 'from', 'where'],
+            'context.reason': ['because', 'since', 'due to', 'for', 'to'],
+            'extract.wisdom': ['learned', 'realized', 'discovered', 'understood',
+                               'lesson', 'insight', 'principle', 'truth'],
+            'culture.Malaysian': ['Malaysia', 'Malaysian', 'Teluk Intan', 'kampung'],
+            'culture.Asian': ['Asian', 'Eastern', 'collective', 'harmony'],
+            'culture.Western': ['Western', 'individual', 'independent'],
+            'culture.Indigenous': ['indigenous', 'traditional', 'ancestral']
+        })
+        # Layers are scored by quality and revenue; scan each distinct text once.
+        # Keyed by digest so no story text is retained (hits only hold positions)
+        self._scan_cache = OrderedDict()
+        self._scan_cache_size = 64
+    
+    @property
+    def cultural_multipliers(self):
+        """Cultural context multipliers for revenue (shared scoring config)"""
+        return get_scoring_config().cultural_multipliers
     
     async def analyze_wisdom(self, raw_content: str, author: str, cultural_context: str = None) -> Dict:
         """
         Perform deep Five-Layer analysis on raw wisdom content
         """
-        wisdom_drop = {
+        wisdom_drop = self._new_wisdom_drop(raw_content, author, cultural_context)
+        
+        # Analyze each layer
+        if self.use_fallback:
+            wisdom_drop['layers'] = self._fallback_analysis(raw_content)
+        else:
+            wisdom_drop['layers'] = await self._deep_analysis(raw_content)
+        
+        return self._score_wisdom_drop(wisdom_drop, cultural_context)
+    
+    async def stream_analysis(self, raw_content: str, author: str,
+                              cultural_context: str = None) -> AsyncIterator[Dict]:
+        """
+        Stream Five-Layer analysis as events while tokens arrive from QWEN
+        
+        Yields 'layer_start', 'token' and 'layer_complete' events per layer,
+        then a single 'complete' event carrying the scored wisdom drop.
+        """
+        wisdom_drop = self._new_wisdom_drop(raw_content, author, cultural_context)
+        
+        if self.use_fallback:
+            wisdom_drop['layers'] = self._fallback_analysis(raw_content)
+            for layer_name, layer_content in wisdom_drop['layers'].items():
+                yield {'event': 'layer_complete', 'layer': layer_name, 'content': layer_content}
+        else:
+            for layer_name, template in self.layer_templates.items():
+                yield {'event': 'layer_start', 'layer': layer_name}
+                
+                cache_key = template.cache_key(story=raw_content)
+                layer_content = self._layer_cache.get(cache_key)
+                cache_lookup("layer_analysis", layer_content is not None)
+                
+                if layer_content is not None:
+                    yield {'event': 'token', 'layer': layer_name, 'text': layer_content}
+                else:
+                    chunks = []
+                    try:
+                        async for token in self.QWEN_client.stream_completion(
+                            messages=template.messages(story=raw_content),
+                            temperature=0.3,
+                            max_tokens=200
+                        ):
+                            chunks.append(token)
+                            yield {'event': 'token', 'layer': layer_name, 'text': token}
+                        
+                        layer_content = ''.join(chunks).strip()
+                        self._cache_layer(cache_key, layer_content, template.messages(story=raw_content))
+                        
+                    except Exception as e:
+                        print(f"QWEN stream failed for {layer_name}: {e}")
+                        layer_content = self._extract_layer_fallback(layer_name, raw_content)
+                
+                wisdom_drop['layers'][layer_name] = layer_content
+                yield {'event': 'layer_complete', 'layer': layer_name, 'content': layer_content}
+        
+        yield {'event': 'complete', 'wisdom_drop': self._score_wisdom_drop(wisdom_drop, cultural_context)}
+    
+    def _new_wisdom_drop(self, raw_content: str, author: str, cultural_context: str = None) -> Dict:
+        """Create an empty wisdom drop record for analysis"""
+        return {
             'id': self._generate_id(raw_content, author),
             'timestamp': datetime.now().isoformat(),
             'author': author,
@@ -53,15 +157,14 @@ class LayerAnalyzer:
             'revenue_potential': 0.0,
             'consent_verified': False,
             'attribution_hash': '',
-            'z_protocol_version': 'v2.0'
+            'z_protocol_version': 'v2.0',
+            'prompt_versions': {
+                layer: template.template_id for layer, template in self.layer_templates.items()
+            }
         }
-        
-        # Analyze each layer
-        if self.use_fallback:
-            wisdom_drop['layers'] = self._fallback_analysis(raw_content)
-        else:
-            wisdom_drop['layers'] = await self._deep_analysis(raw_content)
-        
+    
+    def _score_wisdom_drop(self, wisdom_drop: Dict, cultural_context: str = None) -> Dict:
+        """Fill in quality, revenue and attribution once layers are extracted"""
         # Calculate quality and revenue with enhanced analysis
         wisdom_drop['quality_score'] = self._calculate_quality(wisdom_drop['layers'])
         wisdom_drop['revenue_potential'] = self._calculate_revenue(
@@ -79,53 +182,24 @@ class LayerAnalyzer:
         """Use QWEN AI for deep layer extraction with enhanced prompts"""
         layers = {}
         
-        # Enhanced prompts for better analysis
-        enhanced_prompts = {
-            'surface': """
-            Extract the factual events and observations from this wisdom story.
-            Focus on: What specifically happened? What actions were taken? What was achieved?
-            Be specific and detailed about the concrete events.
-            """,
-            'emotional': """
-            Identify the emotions, feelings, and inner experiences captured in this story.
-            Focus on: How did this experience feel? What emotions were present? 
-            What was the emotional journey? Include both positive and challenging emotions.
-            """,
-            'contextual': """
-            Analyze the context, circumstances, and background of this experience.
-            Focus on: When and where did this occur? What circumstances led to this?
-            What was the situation or environment? What external factors influenced this?
-            """,
-            'wisdom': """
-            Extract the universal lesson, insight, or wisdom from this experience.
-            Focus on: What truth or principle emerged? What can others learn from this?
-            What timeless insight was gained? What universal value does this hold?
-            """,
-            'cultural': """
-            Identify the cultural perspective, values, and worldview present in this story.
-            Focus on: What cultural values are expressed? What traditions or beliefs are shown?
-            How does this reflect the contributor's cultural background? What cultural wisdom is shared?
-            """
-        }
-        
-        for layer_name, prompt in enhanced_prompts.items():
+        for layer_name, template in self.layer_templates.items():
+            cache_key = template.cache_key(story=content)
+            cached = cache_key in self._layer_cache
+            cache_lookup("layer_analysis", cached)
+            if cached:
+                layers[layer_name] = self._layer_cache[cache_key]
+                continue
+            
             try:
+                messages = template.messages(story=content)
                 response = await self.QWEN_client.create_completion(
-                    messages=[
-                        {
-                            "role": "system", 
-                            "content": f"You are an expert analyst for the YSense Five-Layer Perception Framework. You extract deep insights from human wisdom stories for ethical AI training. Focus on the {layer_name} layer with precision and cultural sensitivity."
-                        },
-                        {
-                            "role": "user", 
-                            "content": f"{prompt}\n\nWisdom Story: {content}\n\nProvide a detailed analysis for the {layer_name} layer:"
-                        }
-                    ],
+                    messages=messages,
                     temperature=0.3,
                     max_tokens=200
                 )
                 
                 layers[layer_name] = response.strip()
+                self._cache_layer(cache_key, layers[layer_name], messages)
                 
             except Exception as e:
                 print(f"QWEN API call failed for {layer_name}: {e}")
@@ -134,6 +208,41 @@ class LayerAnalyzer:
         
         return layers
     
+    def _cache_layer(self, cache_key: str, layer_content: str, messages: List[Dict]):
+        """Remember a layer response, evicting the least recently added"""
+        # Never cache the client's canned fallback text
+        fallback = getattr(self.QWEN_client, '_fallback_response', None)
+        if fallback and layer_content == fallback(messages).strip():
+            return
+        
+        self._layer_cache[cache_key] = layer_content
+        if len(self._layer_cache) > self._layer_cache_size:
+            self._layer_cache.popitem(last=False)
+    
+    def _scan(self, content: str):
+        """Keyword hits for a text, memoised by its SHA-256 digest"""
+        key = hashlib.sha256(content.encode('utf-8')).digest()
+        hits = self._scan_cache.get(key)
+        if hits is None:
+            hits = self.keyword_scanner.scan(content)
+            self._scan_cache[key] = hits
+            if len(self._scan_cache) > self._scan_cache_size:
+                self._scan_cache.popitem(last=False)
+        else:
+            self._scan_cache.move_to_end(key)
+        return hits
+    
+    def _extract_layer_fallback(self, layer_name: str, content: str) -> str:
+        """Rule-based extraction for a single layer"""
+        extractors = {
+            'surface': self._extract_surface,
+            'emotional': self._extract_emotional,
+            'contextual': self._extract_contextual,
+            'wisdom': self._extract_wisdom,
+            'cultural': self._extract_cultural
+        }
+        return extractors[layer_name](content)
+    
     def _fallback_analysis(self, content: str) -> Dict[str, str]:
         """Rule-based analysis when API is unavailable"""
         return {
@@ -147,83 +256,63 @@ class LayerAnalyzer:
     def _extract_surface(self, content: str) -> str:
         """Extract factual observations"""
         # Look for action words and facts
-        keywords = ['did', 'made', 'created', 'built', 'achieved', 'completed', 'started']
-        sentences = content.split('.')
+        hits = self._scan(content)
         
-        surface_facts = []
-        for sentence in sentences:
-            if any(keyword in sentence.lower() for keyword in keywords):
-                surface_facts.append(sentence.strip())
+        spans = []
+        for position in hits.positions('extract.surface'):
+            span = sentence_span(content, position)
+            if span not in spans:
+                spans.append(span)
         
-        return '. '.join(surface_facts[:3]) if surface_facts else content[:200]
+        surface_facts = [content[start:end].strip() for start, end in spans[:3]]
+        return '. '.join(surface_facts) if surface_facts else content[:200]
     
     def _extract_emotional(self, content: str) -> str:
         """Extract emotional content"""
-        emotion_words = {
-            'positive': ['happy', 'excited', 'proud', 'grateful', 'inspired', 'confident'],
-            'negative': ['frustrated', 'worried', 'anxious', 'disappointed', 'stressed'],
-            'neutral': ['focused', 'determined', 'curious', 'thoughtful']
-        }
-        
-        found_emotions = []
-        content_lower = content.lower()
+        hits = self._scan(content)
         
-        for category, words in emotion_words.items():
-            for word in words:
-                if word in content_lower:
-                    found_emotions.append(f"{category}: {word}")
+        found_emotions = [
+            f"{category}: {word}"
+            for category in ('positive', 'negative', 'neutral')
+            for word in hits.found(f'emotion.{category}')
+        ]
         
         return ', '.join(found_emotions) if found_emotions else "Determined and focused"
     
     def _extract_contextual(self, content: str) -> str:
         """Extract context information"""
-        context_markers = {
-            'time': ['when', 'during', 'after', 'before', 'while'],
-            'place': ['at', 'in', 'from', 'where'],
-            'reason': ['because', 'since', 'due to', 'for', 'to']
-        }
+        hits = self._scan(content)
         
         context_info = []
-        for category, markers in context_markers.items():
-            for marker in markers:
-                if marker in content.lower():
-                    # Find sentence containing marker
-                    for sentence in content.split('.'):
-                        if marker in sentence.lower():
-                            context_info.append(f"{category}: {sentence.strip()[:100]}")
-                            break
-                    break
+        for category in ('time', 'place', 'reason'):
+            markers = hits.found(f'context.{category}')
+            if markers:
+                # Sentence containing the first listed marker
+                start, end = sentence_span(content, hits.first_position(markers[0]))
+                context_info.append(f"{category}: {content[start:end].strip()[:100]}")
         
         return ' | '.join(context_info) if context_info else "Professional context"
     
     def _extract_wisdom(self, content: str) -> str:
         """Extract learned lessons"""
-        wisdom_indicators = ['learned', 'realized', 'discovered', 'understood', 
-                           'lesson', 'insight', 'principle', 'truth']
-        
-        for indicator in wisdom_indicators:
-            if indicator in content.lower():
-                # Extract sentence with indicator
-                for sentence in content.split('.'):
-                    if indicator in sentence.lower():
-                        return sentence.strip()
+        hits = self._scan(content)
+        indicators = hits.found('extract.wisdom')
+        if indicators:
+            # Extract sentence with indicator
+            start, end = sentence_span(content, hits.first_position(indicators[0]))
+            return content[start:end].strip()
         
         # If no explicit wisdom, generate from content
         return f"Key insight from: {content[:100]}"
     
     def _extract_cultural(self, content: str) -> str:
         """Extract cultural perspective"""
-        cultural_markers = {
-            'Malaysian': ['Malaysia', 'Malaysian', 'Teluk Intan', 'kampung'],
-            'Asian': ['Asian', 'Eastern', 'collective', 'harmony'],
-            'Western': ['Western', 'individual', 'independent'],
-            'Indigenous': ['indigenous', 'traditional', 'ancestral']
-        }
+        hits = self._scan(content)
         
-        found_cultures = []
-        for culture, markers in cultural_markers.items():
-            if any(marker.lower() in content.lower() for marker in markers):
-                found_cultures.append(culture)
+        found_cultures = [
+            culture for culture in ('Malaysian', 'Asian', 'Western', 'Indigenous')
+            if hits.count(f'culture.{culture}')
+        ]
         
         return ', '.join(found_cultures) if found_cultures else "Universal human perspective"
     
@@ -256,19 +345,9 @@ class LayerAnalyzer:
         # Base score from content length
         length_score = min(len(content) / 100, 1.0)  # Normalize to 0-1
         
-        # Quality indicators for each layer type
-        quality_indicators = {
-            'surface': ['specifically', 'concretely', 'achieved', 'accomplished', 'created', 'built'],
-            'emotional': ['felt', 'experienced', 'emotions', 'feeling', 'joy', 'challenge', 'growth'],
-            'contextual': ['when', 'where', 'because', 'circumstances', 'environment', 'situation'],
-            'wisdom': ['learned', 'realized', 'insight', 'principle', 'truth', 'lesson', 'understanding'],
-            'cultural': ['values', 'tradition', 'culture', 'community', 'heritage', 'beliefs', 'customs']
-        }
-        
-        # Count quality indicators
-        content_lower = content.lower()
-        indicator_count = sum(1 for indicator in quality_indicators.get(layer_type, []) 
-                            if indicator in content_lower)
+        # Count quality indicators for this layer type
+        group = f'quality.{layer_type}'
+        indicator_count = self._scan(content).count(group) if group in self.keyword_scanner.groups else 0
         indicator_score = min(indicator_count / 3, 1.0)  # Normalize to 0-1
         
         # Depth analysis - look for complex sentences and detailed descriptions
@@ -285,10 +364,7 @@ class LayerAnalyzer:
         base_rate = 50.0  # €50 base rate
         
         # Get cultural multiplier
-        multiplier = self.cultural_multipliers.get(
-            cultural_context, 
-            self.cultural_multipliers['Default']
-        )
+        multiplier = get_scoring_config().cultural_multiplier(cultural_context)
         
         # Base revenue calculation
         revenue = base_rate * quality_score * multiplier
@@ -323,42 +399,25 @@ class LayerAnalyzer:
     
     def _assess_wisdom_value(self, wisdom_content: str) -> float:
         """Assess the commercial value of wisdom content"""
-        high_value_indicators = [
-            'universal', 'timeless', 'principle', 'fundamental', 'essential',
-            'breakthrough', 'innovation', 'discovery', 'insight', 'truth'
-        ]
-        
-        content_lower = wisdom_content.lower()
-        value_count = sum(1 for indicator in high_value_indicators 
-                         if indicator in content_lower)
+        value_count = self._scan(wisdom_content).count('value.wisdom')
         
         # Return multiplier based on wisdom value (1.0 to 1.5)
         return 1.0 + (value_count * 0.1)
     
     def _assess_cultural_rarity(self, cultural_content: str) -> float:
         """Assess the rarity and preservation value of cultural content"""
-        rare_cultural_indicators = [
-            'traditional', 'ancestral', 'indigenous', 'heritage', 'ancient',
-            'ritual', 'ceremony', 'custom', 'folklore', 'oral tradition'
-        ]
-        
-        content_lower = cultural_content.lower()
-        rarity_count = sum(1 for indicator in rare_cultural_indicators 
-                          if indicator in content_lower)
+        rarity_count = self._scan(cultural_content).count('value.cultural_rarity')
         
         # Return multiplier based on cultural rarity (1.0 to 1.4)
         return 1.0 + (rarity_count * 0.08)
     
     def _assess_commercial_value(self, layers: Dict[str, str]) -> float:
         """Assess overall commercial applicability for AI training"""
-        commercial_indicators = [
-            'training', 'learning', 'teaching', 'education', 'development',
-            'problem-solving', 'decision-making', 'leadership', 'innovation'
-        ]
-        
-        all_content = ' '.join(layers.values()).lower()
-        commercial_count = sum(1 for indicator in commercial_indicators 
-                              if indicator in all_content)
+        # Union of hits across layers (already scanned for quality) instead of re-joining the text
+        found = set()
+        for content in layers.values():
+            found.update(self._scan(content).found('value.commercial'))
+        commercial_count = len(found)
         
         # Return multiplier based on commercial value (1.0 to 1.3)
         return 1.0 + (commercial_count * 0.05)
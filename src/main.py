@@ -5,16 +5,31 @@ Integrates Layer Analyzer, Intelligent Agents, and Orchestrator
 """
 
 import os
-from fastapi import FastAPI, BackgroundTasks
+from fastapi import FastAPI, BackgroundTasks, HTTPException
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 import asyncio
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 # Import core components
-from api import auth, wisdom, wisdom_v4, revenue, legal, key_recovery
+from api import auth, wisdom, wisdom_v4, revenue, legal, key_recovery, admin
 from core import mcp_integration
+from src.config import Config
+from src.background_writer import background_writer
+from src.key_index import backfill_key_index
+from src.metrics import MetricsMiddleware, render_metrics, timed_job
+from src.metrics import enabled as metrics_enabled
 from src.models import create_tables
+from src.profiling import ProfilingMiddleware
+from src.query_log import QueryLogMiddleware
+from src.admission import AdmissionRejected
+from src.rate_limit import RateLimitMiddleware
+from src.responses import APIResponse, StreamAwareCompression
+from src.telemetry import TracingMiddleware, setup_tracing, shutdown_tracing
+from src.token_revocation import revocation_list
+from src.user_aggregates import verify_user_aggregates
 
 # Import v3.0 AI components
 from src.orchestrator import YSenseOrchestrator
@@ -27,18 +42,35 @@ scheduler = AsyncIOScheduler()
 async def lifespan(app: FastAPI):
     """Application lifecycle management"""
     # Startup
+    setup_tracing()
     create_tables()
+    backfill_key_index()
     print("🚀 YSense v3.0 Platform Starting...")
     print("✨ AI Components: Layer Analyzer, Intelligent Agents, Orchestrator")
     
     # Start background scheduler for orchestrator
     scheduler.add_job(
-        orchestrator.execute_daily_workflow,
+        timed_job('daily_workflow', orchestrator.execute_daily_workflow),
         'interval',
         hours=24,
         id='daily_workflow',
         name='Daily Agent Workflow'
     )
+    scheduler.add_job(
+        timed_job('user_aggregate_verifier', verify_user_aggregates),
+        'interval',
+        hours=6,
+        id='user_aggregate_verifier',
+        name='User Aggregate Verifier'
+    )
+    revocation_list.sync()
+    scheduler.add_job(
+        timed_job('token_revocation_sync', revocation_list.sync),
+        'interval',
+        seconds=Config.TOKEN_REVOCATION_SYNC_SECONDS,
+        id='token_revocation_sync',
+        name='Token Revocation Sync'
+    )
     scheduler.start()
     print("⚙️ Orchestrator scheduler started")
     
@@ -46,15 +78,45 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     scheduler.shutdown()
+    background_writer.stop()
+    shutdown_tracing()
     print("YSense v3.0 Platform Shutting Down...")
 
 app = FastAPI(
     title="YSense™ Platform v3.0",
     description="AI-Enhanced Human Wisdom Library with Intelligent Agents",
     version="3.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=APIResponse
 )
 
+# Response compression (Brotli when brotli-asgi is installed, gzip otherwise)
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+# (SSE streams are left uncompressed so each event is flushed as it is sent)
+if Config.ENABLE_BROTLI and BrotliMiddleware is not None:
+    app.add_middleware(
+        StreamAwareCompression,
+        compressor=BrotliMiddleware,
+        quality=Config.BROTLI_QUALITY,
+        minimum_size=Config.COMPRESSION_MINIMUM_SIZE,
+        gzip_fallback=True
+    )
+else:
+    app.add_middleware(
+        StreamAwareCompression,
+        compressor=GZipMiddleware,
+        minimum_size=Config.COMPRESSION_MINIMUM_SIZE,
+        compresslevel=Config.GZIP_COMPRESSION_LEVEL
+    )
+
+# Per-client token buckets (added before CORS so preflight and 429s still get CORS headers)
+if Config.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 # CORS for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -64,6 +126,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# X-Query-Count / X-Query-Time-Ms / X-Query-Duplicates for spotting N+1s in development
+if Config.QUERY_DEBUG_HEADERS:
+    app.add_middleware(QueryLogMiddleware)
+
+# Slow-request profiles (added only when enabled: zero cost otherwise)
+if Config.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Per-route latency/status, timed around everything but tracing (no-op unless METRICS_ENABLED)
+app.add_middleware(MetricsMiddleware)
+
+# Outermost, so the server span covers every other middleware (no-op unless TRACING_ENABLED)
+app.add_middleware(TracingMiddleware)
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request, exc: AdmissionRejected):
+    """Overloaded analysis workers shed load rather than queueing without bound"""
+    return APIResponse(
+        {"detail": exc.reason, "retry_after": exc.retry_after},
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v3/auth", tags=["Authentication"])
 app.include_router(wisdom.router, prefix="/api/v3/wisdom", tags=["Wisdom"])
@@ -71,6 +156,7 @@ app.include_router(wisdom_v4.router, prefix="/api/v4/wisdom", tags=["Wisdom v4.0
 app.include_router(revenue.router, prefix="/api/v3/revenue", tags=["Revenue"])
 app.include_router(legal.router, prefix="/api/v3/legal", tags=["Legal"])
 app.include_router(key_recovery.router, prefix="/api/v4/recovery", tags=["Key Recovery"])
+app.include_router(admin.router, prefix="/api/v4/admin", tags=["Admin"])
 
 @app.get("/")
 async def root():
@@ -99,6 +185,14 @@ async def health_check():
         }
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    if not metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    body, content_type = render_metrics()
+    return Response(body, headers={"Content-Type": content_type})
+
 @app.post("/api/v3/orchestrator/trigger")
 async def trigger_orchestrator(background_tasks: BackgroundTasks):
     """Manually trigger orchestrator workflow"""
@@ -0,0 +1,250 @@
+# src/metrics.py
+"""
+YSense Platform v4.0 - Metrics
+Prometheus metrics for capacity planning: request latency per route, DB pool
+usage, LLM latency/tokens/fallbacks per provider and model, cache hit/miss
+counts, per-agent execution time, background write queue depth, admission
+state and scheduler job timings. Served at /metrics. With METRICS_ENABLED=false
+or without prometheus_client every helper here is a no-op.
+"""
+
+import asyncio
+import functools
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from src.config import Config
+from src.profiling import record_llm_call
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+except ImportError:
+    REGISTRY = None
+
+enabled = Config.METRICS_ENABLED and REGISTRY is not None
+
+if Config.METRICS_ENABLED and REGISTRY is None:
+    print("⚠️ METRICS_ENABLED but prometheus-client is not installed; /metrics disabled")
+
+# Seconds; LLM calls and agents run far longer than a typical request
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+# ==================== Metric Definitions ====================
+
+if enabled:
+    HTTP_REQUESTS = Counter(
+        "ysense_http_requests_total", "HTTP requests by route template and status",
+        ["method", "route", "status"]
+    )
+    HTTP_LATENCY = Histogram(
+        "ysense_http_request_duration_seconds", "HTTP request latency by route template",
+        ["method", "route"]
+    )
+    HTTP_IN_PROGRESS = Gauge("ysense_http_requests_in_progress", "HTTP requests being served")
+
+    LLM_LATENCY = Histogram(
+        "ysense_llm_request_duration_seconds", "LLM call latency (streams: until the last token)",
+        ["provider", "model"], buckets=SLOW_BUCKETS
+    )
+    LLM_TOKENS = Counter(
+        "ysense_llm_tokens_total", "LLM tokens by type (input, output, cache_read, cache_write)",
+        ["provider", "model", "type"]
+    )
+    LLM_ERRORS = Counter(
+        "ysense_llm_errors_total", "LLM calls answered by the local fallback or raising",
+        ["provider", "model", "kind"]
+    )
+
+    CACHE_LOOKUPS = Counter(
+        "ysense_cache_lookups_total", "In-process cache lookups by cache and result (hit, miss)",
+        ["cache", "result"]
+    )
+
+    AGENT_LATENCY = Histogram(
+        "ysense_agent_duration_seconds", "Orchestrator agent execution time",
+        ["agent"], buckets=SLOW_BUCKETS
+    )
+    AGENT_ERRORS = Counter("ysense_agent_errors_total", "Orchestrator agent failures", ["agent"])
+
+    JOB_LATENCY = Histogram(
+        "ysense_scheduler_job_duration_seconds", "Scheduled job run time",
+        ["job"], buckets=SLOW_BUCKETS + (600, 1800)
+    )
+    JOB_RUNS = Counter("ysense_scheduler_job_runs_total", "Scheduled job runs by outcome", ["job", "outcome"])
+    JOB_LAST_SUCCESS = Gauge(
+        "ysense_scheduler_job_last_success_timestamp_seconds", "Unix time of the last successful run", ["job"]
+    )
+
+# ==================== Instrumentation Helpers ====================
+
+@contextmanager
+def _timed(histogram, error_counter=None, error_labels=(), **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        if error_counter is not None:
+            error_counter.labels(*error_labels).inc()
+        raise
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - start)
+
+@contextmanager
+def llm_timer(provider: str, model: str):
+    """Time one LLM call (with: around the request or the whole stream) for /metrics and request profiles"""
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        if enabled:
+            LLM_LATENCY.labels(provider, model).observe(elapsed)
+            if error:
+                LLM_ERRORS.labels(provider, model, "exception").inc()
+        record_llm_call(provider, model, elapsed, error)
+
+def observe_llm_usage(provider: str, model: str, input_tokens: Optional[int] = None,
+                      output_tokens: Optional[int] = None, cache_read_tokens: Optional[int] = None,
+                      cache_write_tokens: Optional[int] = None, fallback: bool = False):
+    """Token and fallback counters; called from telemetry.record_llm_usage"""
+    if not enabled:
+        return
+    if fallback:
+        LLM_ERRORS.labels(provider, model, "fallback").inc()
+    for token_type, count in (("input", input_tokens), ("output", output_tokens),
+                              ("cache_read", cache_read_tokens), ("cache_write", cache_write_tokens)):
+        if count:
+            LLM_TOKENS.labels(provider, model, token_type).inc(count)
+
+@contextmanager
+def agent_timer(agent: str):
+    if not enabled:
+        yield
+        return
+    with _timed(AGENT_LATENCY, AGENT_ERRORS, (agent,), agent=agent):
+        yield
+
+def cache_lookup(cache: str, hit: bool):
+    """Count a hit or miss; the ratio is rate(hit) / rate(hit + miss) in PromQL"""
+    if enabled:
+        CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+def timed_job(job: str, func):
+    """Wrap a scheduler job (sync or async) to record its duration and outcome"""
+    if not enabled:
+        return func
+
+    def finished(start: float, outcome: str):
+        JOB_LATENCY.labels(job).observe(time.perf_counter() - start)
+        JOB_RUNS.labels(job, outcome).inc()
+        if outcome == "success":
+            JOB_LAST_SUCCESS.labels(job).set_to_current_time()
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception:
+                finished(start, "error")
+                raise
+            finished(start, "success")
+            return result
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            finished(start, "error")
+            raise
+        finished(start, "success")
+        return result
+    return wrapper
+
+# ==================== Point-in-time State ====================
+
+class _StateCollector:
+    """Read at scrape time: DB pool, background write queue and admission state"""
+
+    def describe(self):
+        # Names only, so registering at import doesn't run a scrape (and its imports)
+        return [GaugeMetricFamily(f"ysense_db_pool_{name}", "") for name in ("size", "checked_out", "checked_in", "overflow")] + [
+            GaugeMetricFamily(name, "") for name in ("ysense_background_queue_depth", "ysense_admission_limit",
+                                                     "ysense_admission_in_flight", "ysense_admission_queued")
+        ] + [CounterMetricFamily("ysense_admission_rejected", "")]
+
+    def collect(self):
+        from src.admission import analysis_admission
+        from src.background_writer import background_writer
+        from src.models import get_engine
+
+        pool = get_engine().pool
+        # QueuePool has all of these; SQLite's singleton/static pools only some
+        for name, attr, doc in (("size", "size", "Configured pool size"),
+                                ("checked_out", "checkedout", "Connections in use"),
+                                ("checked_in", "checkedin", "Idle connections in the pool"),
+                                ("overflow", "overflow", "Connections beyond pool size (negative: unopened pool slots)")):
+            if hasattr(pool, attr):
+                yield GaugeMetricFamily(f"ysense_db_pool_{name}", doc, value=getattr(pool, attr)())
+
+        queue = GaugeMetricFamily("ysense_background_queue_depth", "Deferred writes waiting to flush",
+                                  labels=["kind"])
+        for kind, depth in background_writer.pending().items():
+            queue.add_metric([kind], depth)
+        yield queue
+
+        admission = analysis_admission.stats()
+        yield GaugeMetricFamily("ysense_admission_limit", "Adaptive in-flight analysis limit",
+                                value=admission["limit"])
+        yield GaugeMetricFamily("ysense_admission_in_flight", "Analyses running", value=admission["in_flight"])
+        yield GaugeMetricFamily("ysense_admission_queued", "Analyses waiting for a slot", value=admission["queued"])
+        yield CounterMetricFamily("ysense_admission_rejected", "Analyses shed with 503",
+                                  value=admission["rejected"])
+
+if enabled:
+    REGISTRY.register(_StateCollector())
+
+# ==================== HTTP ====================
+
+class MetricsMiddleware:
+    """ASGI middleware: latency and status per route template (unmatched paths share one label)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not enabled or scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_PROGRESS.dec()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_LATENCY.labels(scope["method"], route).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(scope["method"], route, str(status)).inc()
+
+def render_metrics():
+    """(body, content type) for the /metrics endpoint"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
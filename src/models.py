@@ -6,10 +6,11 @@ SQLAlchemy models for all platform entities
 
 from sqlalchemy import create_engine, Column, String, Float, Integer, DateTime, Boolean, Text, JSON, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.orm import deferred, relationship, sessionmaker, undefer, undefer_group
 from datetime import datetime
 import hashlib
 import json
+import secrets
 from typing import Optional
 
 Base = declarative_base()
@@ -24,6 +25,8 @@ class User(Base):
     email = Column(String, unique=True, nullable=False)
     username = Column(String, unique=True, nullable=False)
     crypto_key = Column(String, unique=True, nullable=False)  # Replaced password_hash
+    # HMAC of the canonical key form (src/key_index.py) - login and key lookups probe these
+    crypto_key_index = Column(String(64), unique=True)
     
     # Regional Compliance
     jurisdiction = Column(String, nullable=False, default="Malaysia")
@@ -41,6 +44,7 @@ class User(Base):
     z_protocol_score = Column(Float, default=0.0)
     z_protocol_tier = Column(String, default="Bronze")
     z_protocol_consent_key = Column(String, unique=True)  # Z Protocol consent verification key
+    consent_key_index = Column(String(64), unique=True)
     
     # Revenue
     revenue_tier = Column(String, default="Bronze")
@@ -48,6 +52,10 @@ class User(Base):
     total_earnings = Column(Float, default=0.0)
     pending_earnings = Column(Float, default=0.0)
     
+    # Published contribution aggregates (rolling Z Protocol score = sum / count)
+    published_drop_count = Column(Integer, default=0)
+    z_protocol_score_sum = Column(Float, default=0.0)
+    
     # Attribution
     attribution_id = Column(String, unique=True)
     attribution_name = Column(String)
@@ -83,18 +91,18 @@ class WisdomDrop(Base):
     title = Column(String, nullable=False)
     experience_title = Column(String)
     
-    # Five Layers
-    layer_narrative = Column(Text)
-    layer_somatic = Column(Text)
-    layer_attention = Column(Text)
-    layer_synesthetic = Column(Text)
-    layer_temporal_auditory = Column(Text)
+    # Five Layers (deferred: load with LOAD_LAYERS)
+    layer_narrative = deferred(Column(Text), group="layers")
+    layer_somatic = deferred(Column(Text), group="layers")
+    layer_attention = deferred(Column(Text), group="layers")
+    layer_synesthetic = deferred(Column(Text), group="layers")
+    layer_temporal_auditory = deferred(Column(Text), group="layers")
     
-    # Deep Vibe Distillation
+    # Deep Vibe Distillation (long text deferred: load with LOAD_DISTILLATION)
     vibe_words = Column(JSON)  # List of 3 words
-    vibe_words_explanation = Column(Text)  # User's explanation of why they chose these words
-    personal_connection = Column(Text)
-    essence = Column(Text)
+    vibe_words_explanation = deferred(Column(Text), group="distillation")  # User's explanation of why they chose these words
+    personal_connection = deferred(Column(Text), group="distillation")
+    essence = deferred(Column(Text), group="distillation")
     distillation_completed = Column(Boolean, default=False)
     
     # Cultural Context
@@ -105,7 +113,7 @@ class WisdomDrop(Base):
     # Quality & Scoring
     quality_score = Column(Float, default=0.0)
     z_protocol_score = Column(Float, default=0.0)
-    completeness = Column(JSON)
+    completeness = deferred(Column(JSON))
     
     # Attribution
     attribution_hash = Column(String, unique=True, nullable=False)
@@ -157,6 +165,29 @@ class WisdomDrop(Base):
                 score += 10.0
         
         return min(score, 100.0)
+    
+    @classmethod
+    def summary_query(cls, db, *extra_columns):
+        """Lightweight rows (no layer or distillation text) for list and search endpoints"""
+        return db.query(*WISDOM_DROP_SUMMARY_COLUMNS, *extra_columns)
+
+# Columns returned by list endpoints; rows are tuples, not ORM instances
+WISDOM_DROP_SUMMARY_COLUMNS = (
+    WisdomDrop.id,
+    WisdomDrop.user_id,
+    WisdomDrop.title,
+    WisdomDrop.status,
+    WisdomDrop.published,
+    WisdomDrop.distillation_completed,
+    WisdomDrop.vibe_words,
+    WisdomDrop.cultural_context,
+    WisdomDrop.quality_score,
+    WisdomDrop.z_protocol_score,
+    WisdomDrop.attribution_text,
+    WisdomDrop.revenue_potential,
+    WisdomDrop.revenue_generated,
+    WisdomDrop.created_at
+)
 
 # ==================== Revenue Record Model ====================
 class RevenueRecord(Base):
@@ -298,26 +329,57 @@ class ConsentRecord(Base):
     withdrawn_at = Column(DateTime)
     expires_at = Column(DateTime)
 
+# ==================== Revoked Token Model ====================
+class RevokedToken(Base):
+    """
+    Revoked JWTs, mirrored in memory by src/token_revocation.py.
+    scope "token": one jti; scope "user": every token issued to user_id before revoked_at
+    """
+    __tablename__ = "revoked_tokens"
+    
+    id = Column(String, primary_key=True)  # jti, or "user:<user_id>"
+    user_id = Column(String, ForeignKey("users.id"), index=True)
+    scope = Column(String, nullable=False, default="token")
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)  # safe to purge after this
+
+# Load options for endpoints that read the deferred column groups
+# (built after the last model: undefer() configures every mapper)
+LOAD_LAYERS = undefer_group("layers")
+LOAD_DISTILLATION = undefer_group("distillation")
+LOAD_FULL_DROP = (LOAD_LAYERS, LOAD_DISTILLATION, undefer(WisdomDrop.completeness))
+
 # ==================== Database Functions ====================
 
+_engines = {}
+
+def get_engine(database_url: str = None):
+    """Engine for the URL, created once per process so sessions share its connection pool"""
+    from src.config import Config
+    
+    db_url = database_url or Config.DATABASE_URL
+    engine = _engines.get(db_url)
+    if engine is None:
+        engine = _engines.setdefault(db_url, create_engine(db_url, echo=Config.DEBUG))
+    return engine
+
 def create_tables(database_url: str = None):
     """Create all tables in the database"""
     from src.config import Config
     
     db_url = database_url or Config.DATABASE_URL
-    engine = create_engine(db_url, echo=Config.DEBUG)
+    engine = get_engine(db_url)
     Base.metadata.create_all(bind=engine)
     print(f"✅ Database tables created at {db_url}")
     return engine
 
 def get_session(engine=None):
     """Get database session"""
-    from src.config import Config
-    
     if not engine:
-        engine = create_engine(Config.DATABASE_URL, echo=Config.DEBUG)
+        engine = get_engine()
     
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Keep loaded attributes readable after commit/close (endpoints return them post-commit)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
     return SessionLocal()
 
 def init_database():
@@ -352,7 +414,8 @@ def generate_user_id(username: str) -> str:
 def generate_audit_id(user_id: str, action: str) -> str:
     """Generate unique audit log ID"""
     timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-    unique_string = f"{user_id}_{action}_{timestamp}"
+    # Random part: the same user and action can repeat within a second (e.g. concurrent batches)
+    unique_string = f"{user_id}_{action}_{timestamp}_{secrets.token_hex(8)}"
     hash_suffix = hashlib.md5(unique_string.encode()).hexdigest()[:8]
     return f"AUDIT_{hash_suffix.upper()}"
 
@@ -5,6 +5,7 @@ from typing import Dict, List, Optional
 from datetime import datetime
 from dotenv import load_dotenv
 from src.anthropic_integration import AnthropicOrchestratorAgent
+from src.telemetry import traced
 
 load_dotenv()
 
@@ -517,6 +518,7 @@ class YSenseOrchestrator:
         }
         self.wisdom_library = WisdomLibraryRAG()
         
+    @traced("orchestrator.daily_workflow")
     async def execute_daily_workflow(self) -> dict:
         """Execute complete daily workflow"""
         print("\n🚀 YSense Daily Workflow Starting...")
@@ -566,6 +568,7 @@ class YSenseOrchestrator:
         
         return workflow_log
     
+    @traced("orchestrator.handle_request")
     async def handle_request(self, request: str) -> dict:
         """Handle any request through appropriate agents"""
         # Parse request and route to appropriate agent
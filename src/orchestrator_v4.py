@@ -8,6 +8,9 @@ import hashlib
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 
+from src.metrics import agent_timer
+from src.telemetry import span
+
 # ==================== Base Agent Class ====================
 
 class AgentBase(ABC):
@@ -48,8 +51,8 @@ class LayerAnalyzerAgent(AgentBase):
         """Analyze story and extract 5 layers"""
         story = data.get("story", "")
         
-        # AI-powered layer extraction (simplified for demo)
-        layers = await self._extract_layers(story)
+        # Layers already extracted upstream (streamed analysis) are reused as-is
+        layers = data.get("layers") or await self._extract_layers(story)
         
         return {
             "layers": layers,
@@ -399,8 +402,9 @@ class YSenseOrchestrator:
         }
         self.status = "ready"
     
-    async def process_story(self, story: str, user_context: Dict[str, Any]) -> Dict[str, Any]:
-        """Process story with all 7 agents"""
+    async def process_story(self, story: str, user_context: Dict[str, Any],
+                            layers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Process story with all 7 agents; pass layers when they were already extracted"""
         
         # Prepare base data
         base_data = {
@@ -410,24 +414,27 @@ class YSenseOrchestrator:
             "cultural_context": user_context.get("cultural_context", "Global"),
             "user_jurisdiction": user_context.get("jurisdiction", "Malaysia"),
             "user_age": user_context.get("age", 18),
-            "content_hash": hashlib.md5(story.encode()).hexdigest()
+            "content_hash": hashlib.md5(story.encode()).hexdigest(),
+            "layers": layers
         }
         
-        # Step 1: Extract layers
-        layer_results = await self.agents["layer_analyzer"].process(base_data)
-        base_data.update(layer_results)
-        
-        # Step 2: Run all other agents in parallel
-        agent_tasks = []
-        agent_names = []
-        
-        for name, agent in self.agents.items():
-            if name != "layer_analyzer":  # Already processed
-                agent_tasks.append(agent.process(base_data))
-                agent_names.append(name)
-        
-        # Execute all agents in parallel
-        agent_results = await asyncio.gather(*agent_tasks)
+        with span("orchestrator.process_story", **{"story.length": len(story),
+                                                    "cultural_context": base_data["cultural_context"]}):
+            # Step 1: Extract layers
+            layer_results = await self._run_agent("layer_analyzer", base_data)
+            base_data.update(layer_results)
+            
+            # Step 2: Run all other agents in parallel
+            agent_tasks = []
+            agent_names = []
+            
+            for name in self.agents:
+                if name != "layer_analyzer":  # Already processed
+                    agent_tasks.append(self._run_agent(name, base_data))
+                    agent_names.append(name)
+            
+            # Execute all agents in parallel
+            agent_results = await asyncio.gather(*agent_tasks)
         
         # Compile results
         results = {
@@ -441,6 +448,11 @@ class YSenseOrchestrator:
         
         return results
     
+    async def _run_agent(self, name: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """One agent call, as its own span"""
+        with span(f"agent.{name}", **{"agent.name": self.agents[name].name}), agent_timer(name):
+            return await self.agents[name].process(data)
+    
     def _calculate_overall_score(self, agent_results: List[Dict[str, Any]]) -> float:
         """Calculate overall score from all agents"""
         scores = []
@@ -0,0 +1,103 @@
+# src/pagination.py
+"""
+YSense Platform v4.0 - Keyset Pagination
+Opaque cursors over (created_at, id) so list endpoints page with an index seek
+instead of returning every row, plus row-count estimates that avoid a full COUNT
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, text
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+class InvalidCursor(ValueError):
+    """Cursor was not produced by encode_cursor (or was tampered with)"""
+
+# ==================== Cursors ====================
+
+def encode_cursor(sort_value: Optional[datetime], row_id: str) -> str:
+    """Opaque base64url token for the last row of a page"""
+    payload = json.dumps([sort_value.isoformat() if sort_value else None, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(sort_value) if sort_value else None), str(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid pagination cursor: {cursor}") from e
+
+def clamp_limit(limit: Optional[int], default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> int:
+    if not limit or limit < 1:
+        return default
+    return min(limit, maximum)
+
+# ==================== Keyset Queries ====================
+
+def keyset_condition(sort_column, id_column, cursor: Optional[str]):
+    """Rows strictly after the cursor in (sort_column DESC, id DESC) order, or None for the first page"""
+    if not cursor:
+        return None
+    sort_value, row_id = decode_cursor(cursor)
+    if sort_value is None:
+        return and_(sort_column.is_(None), id_column < row_id)
+    return or_(
+        sort_column < sort_value,
+        and_(sort_column == sort_value, id_column < row_id)
+    )
+
+def paginate(query, sort_column, id_column, cursor: Optional[str], limit: int,
+             having: bool = False) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page newest-first. Reads limit+1 rows to learn whether another page
+    exists; the query must select sort_column and id_column (by key) so the
+    next cursor can be built from the last row. Use having=True for aggregates.
+    """
+    condition = keyset_condition(sort_column, id_column, cursor)
+    if condition is not None:
+        query = query.having(condition) if having else query.filter(condition)
+
+    rows = query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(_row_value(last, sort_column), _row_value(last, id_column))
+
+def _row_value(row, column):
+    key = getattr(column, "key", None) or getattr(column, "name", None)
+    return row._mapping[key] if hasattr(row, "_mapping") else getattr(row, key)
+
+# ==================== Count Estimates ====================
+
+def estimate_count(db, query) -> Optional[int]:
+    """
+    Planner row estimate for a query on PostgreSQL (EXPLAIN, no scan).
+    Returns None on other backends, where callers fall back to a stored count.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    compiled = query.statement.compile(bind, compile_kwargs={"literal_binds": True})
+    try:
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+    except Exception as e:
+        print(f"⚠️  Count estimate failed: {e}")
+        return None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+def page_total(rows: List[Any], cursor: Optional[str], next_cursor: Optional[str],
+               estimate: Optional[int]) -> Tuple[Optional[int], bool]:
+    """(total, is_estimate): exact when the whole result fit on the first page"""
+    if not cursor and next_cursor is None:
+        return len(rows), False
+    return estimate, estimate is not None
@@ -0,0 +1,191 @@
+# src/profiling.py
+"""
+YSense Platform v4.0 - Request Profiling
+Opt-in (PROFILING_ENABLED) capture of slow requests. Requests on PROFILE_PATHS
+run under pyinstrument's sampling profiler; those slower than PROFILE_SLOW_MS,
+or sent by an admin with X-Profile: 1, are saved to PROFILE_DIR as speedscope
+JSON (flamegraph view) plus a summary holding the request's SQL query log and
+LLM call timings. Admins list and download captures under /api/v4/admin/profiles.
+Without pyinstrument the summary is still saved, just without stack samples.
+"""
+
+import asyncio
+import hmac
+import json
+import re
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.config import Config
+from src.query_log import QueryLog, capture_queries
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:
+    Profiler = None
+
+CAPTURE_ID = re.compile(r"^PROF_\d{8}T\d{6}_[0-9a-f]{8}$")
+
+# ==================== Request Capture ====================
+
+@dataclass
+class RequestCapture:
+    method: str
+    path: str
+    started_at: datetime
+    query_log: QueryLog = field(default_factory=QueryLog)
+    llm_calls: List[Dict] = field(default_factory=list)
+
+_capture: ContextVar[Optional[RequestCapture]] = ContextVar("ysense_request_capture", default=None)
+
+def record_llm_call(provider: str, model: str, seconds: float, error: bool = False):
+    """Add an LLM call to the profile of the current request, if one is being captured"""
+    capture = _capture.get()
+    if capture is not None:
+        capture.llm_calls.append({
+            "provider": provider,
+            "model": model,
+            "duration_ms": round(seconds * 1000, 3),
+            "error": error
+        })
+
+# ==================== Storage ====================
+
+class ProfileStore:
+    """Captures on local disk: <id>.json summary and <id>.speedscope.json; oldest pruned past max_captures"""
+
+    def __init__(self, directory: str, max_captures: int = 200):
+        self.directory = Path(directory)
+        self.max_captures = max_captures
+        self._lock = threading.Lock()
+
+    def save(self, summary: Dict, speedscope: Optional[str] = None) -> str:
+        capture_id = f"PROF_{datetime.utcnow():%Y%m%dT%H%M%S}_{secrets.token_hex(4)}"
+        summary = {"id": capture_id, "has_profile": speedscope is not None, **summary}
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if speedscope is not None:
+                (self.directory / f"{capture_id}.speedscope.json").write_text(speedscope, encoding="utf-8")
+            (self.directory / f"{capture_id}.json").write_text(json.dumps(summary, default=str), encoding="utf-8")
+            self._prune()
+        return capture_id
+
+    def list(self, limit: Optional[int] = None) -> List[Dict]:
+        """Newest first; query and LLM details are left to the per-capture download"""
+        captures = []
+        for path in self._summaries()[:limit]:
+            try:
+                summary = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            summary["query_count"] = summary.pop("queries", {}).get("count", 0)
+            summary["llm_call_count"] = len(summary.pop("llm_calls", []))
+            captures.append(summary)
+        return captures
+
+    def path_for(self, capture_id: str, kind: str = "summary") -> Optional[Path]:
+        if not CAPTURE_ID.match(capture_id):
+            return None
+        suffix = ".speedscope.json" if kind == "speedscope" else ".json"
+        path = self.directory / f"{capture_id}{suffix}"
+        return path if path.is_file() else None
+
+    def _summaries(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        paths = [p for p in self.directory.glob("PROF_*.json") if not p.name.endswith(".speedscope.json")]
+        return sorted(paths, key=lambda p: p.name, reverse=True)
+
+    def _prune(self):
+        for path in self._summaries()[self.max_captures:]:
+            for stale in (path, path.with_name(path.name.replace(".json", ".speedscope.json"))):
+                try:
+                    stale.unlink()
+                except FileNotFoundError:
+                    pass
+
+profile_store = ProfileStore(Config.PROFILE_DIR, Config.PROFILE_MAX_CAPTURES)
+
+# ==================== Middleware ====================
+
+def profiled_path(path: str) -> bool:
+    return not Config.PROFILE_PATHS or any(path.startswith(prefix) for prefix in Config.PROFILE_PATHS)
+
+def forced_by_admin(scope) -> bool:
+    """X-Profile: 1 plus a valid X-Admin-Key captures the request regardless of latency"""
+    headers = dict(scope.get("headers", []))
+    if headers.get(b"x-profile") != b"1" or not Config.ADMIN_API_KEY:
+        return False
+    return hmac.compare_digest(headers.get(b"x-admin-key", b""), Config.ADMIN_API_KEY.encode())
+
+class ProfilingMiddleware:
+    """ASGI middleware; only added when PROFILING_ENABLED, so it costs nothing otherwise"""
+
+    def __init__(self, app, store: Optional[ProfileStore] = None):
+        self.app = app
+        self.store = store or profile_store
+        if Profiler is None:
+            print("⚠️ pyinstrument is not installed; profiles will hold query logs and LLM timings only")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        forced = forced_by_admin(scope)
+        if not forced and not profiled_path(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        capture = RequestCapture(scope["method"], scope["path"], datetime.utcnow())
+        token = _capture.set(capture)
+        profiler = Profiler(interval=Config.PROFILE_INTERVAL_SECONDS, async_mode="enabled") if Profiler else None
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.start()
+        try:
+            with capture_queries() as query_log:
+                capture.query_log = query_log
+                await self.app(scope, receive, send_with_status)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+            _capture.reset(token)
+            duration_ms = (time.perf_counter() - start) * 1000
+            if forced or duration_ms >= Config.PROFILE_SLOW_MS:
+                route = getattr(scope.get("route"), "path", None)
+                # Rendering and writing happen off the event loop; the response is already sent
+                await asyncio.to_thread(self._save, capture, profiler, route, status, duration_ms, forced)
+
+    def _save(self, capture: RequestCapture, profiler, route: Optional[str], status: int,
+              duration_ms: float, forced: bool):
+        try:
+            speedscope = profiler.output(SpeedscopeRenderer()) if profiler is not None else None
+            capture_id = self.store.save({
+                "method": capture.method,
+                "path": capture.path,
+                "route": route,
+                "status": status,
+                "duration_ms": round(duration_ms, 3),
+                "forced": forced,
+                "started_at": capture.started_at.isoformat(),
+                "queries": capture.query_log.to_dict(),
+                "llm_calls": capture.llm_calls
+            }, speedscope)
+            print(f"🐢 Saved profile {capture_id}: {capture.method} {capture.path} took {duration_ms:.0f} ms")
+        except Exception as e:
+            print(f"⚠️ Could not save request profile: {e}")
@@ -0,0 +1,207 @@
+# src/prompt_registry.py
+"""
+YSense Platform v4.0 - Prompt Template Registry
+Versioned, precompiled prompt templates with cacheable static prefixes
+"""
+
+import hashlib
+import json
+import textwrap
+from dataclasses import dataclass, field
+from string import Formatter
+from typing import Dict, List, Tuple
+
+# Marker understood by AnthropicClient / QWENClient for provider-side prompt caching
+EPHEMERAL_CACHE = {"type": "ephemeral"}
+
+def _template_fields(template: str) -> Tuple[str, ...]:
+    """Names of the {placeholders} used by a format-string template"""
+    return tuple(sorted({name for _, name, _, _ in Formatter().parse(template) if name}))
+
+# ==================== Templates ====================
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A versioned prompt: static system prefix plus a per-call user message"""
+    name: str
+    version: str
+    system: str
+    user: str
+    cacheable: bool = True
+    system_fields: Tuple[str, ...] = field(init=False, default=())
+    user_fields: Tuple[str, ...] = field(init=False, default=())
+
+    def __post_init__(self):
+        # Parse placeholders once at registration instead of on every call
+        object.__setattr__(self, "system_fields", _template_fields(self.system))
+        object.__setattr__(self, "user_fields", _template_fields(self.user))
+
+    @property
+    def template_id(self) -> str:
+        return f"{self.name}@{self.version}"
+
+    def bind(self, **static_vars) -> "BoundPrompt":
+        """Render the static system prefix once; only the user message varies per call"""
+        missing = [f for f in self.system_fields if f not in static_vars]
+        if missing:
+            raise ValueError(f"Prompt {self.template_id} missing system variables: {missing}")
+        return BoundPrompt(self, self.system.format_map(static_vars))
+
+class BoundPrompt:
+    """Template with its system prefix already rendered"""
+
+    def __init__(self, template: PromptTemplate, system_text: str):
+        self.template = template
+        self.system_text = system_text
+        self.system_message = {"role": "system", "content": system_text}
+        if template.cacheable:
+            self.system_message["cache_control"] = EPHEMERAL_CACHE
+        self._prefix_hash = hashlib.sha256(
+            f"{template.template_id}\n{system_text}".encode()
+        ).hexdigest()
+
+    @property
+    def template_id(self) -> str:
+        return self.template.template_id
+
+    def messages(self, **user_vars) -> List[Dict]:
+        """Chat messages for one call, static system prefix first"""
+        return [
+            self.system_message,
+            {"role": "user", "content": self.template.user.format_map(user_vars)}
+        ]
+
+    def cache_key(self, **user_vars) -> str:
+        """Response cache key; changes whenever the template version or prefix changes"""
+        payload = json.dumps(user_vars, sort_keys=True, default=str)
+        return hashlib.sha256(f"{self._prefix_hash}:{payload}".encode()).hexdigest()
+
+# ==================== Registry ====================
+
+class PromptRegistry:
+    """Lookup of prompt templates by name, latest registered version wins"""
+
+    def __init__(self):
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._bound: Dict[str, BoundPrompt] = {}
+
+    def register(self, template: PromptTemplate) -> PromptTemplate:
+        self._templates[template.name] = template
+        self._bound.pop(template.name, None)
+        return template
+
+    def get(self, name: str) -> PromptTemplate:
+        if name not in self._templates:
+            raise KeyError(f"Unknown prompt template: {name}")
+        return self._templates[name]
+
+    def bound(self, name: str) -> BoundPrompt:
+        """Shared bound prompt for templates without system variables"""
+        if name not in self._bound:
+            self._bound[name] = self.get(name).bind()
+        return self._bound[name]
+
+    def bind(self, name: str, **static_vars) -> BoundPrompt:
+        return self.get(name).bind(**static_vars)
+
+    def versions(self) -> Dict[str, str]:
+        return {name: template.version for name, template in self._templates.items()}
+
+prompt_registry = PromptRegistry()
+
+# ==================== Default Templates ====================
+
+LAYER_ANALYSIS_INSTRUCTIONS = {
+    'surface': """
+        Extract the factual events and observations from this wisdom story.
+        Focus on: What specifically happened? What actions were taken? What was achieved?
+        Be specific and detailed about the concrete events.
+        """,
+    'emotional': """
+        Identify the emotions, feelings, and inner experiences captured in this story.
+        Focus on: How did this experience feel? What emotions were present?
+        What was the emotional journey? Include both positive and challenging emotions.
+        """,
+    'contextual': """
+        Analyze the context, circumstances, and background of this experience.
+        Focus on: When and where did this occur? What circumstances led to this?
+        What was the situation or environment? What external factors influenced this?
+        """,
+    'wisdom': """
+        Extract the universal lesson, insight, or wisdom from this experience.
+        Focus on: What truth or principle emerged? What can others learn from this?
+        What timeless insight was gained? What universal value does this hold?
+        """,
+    'cultural': """
+        Identify the cultural perspective, values, and worldview present in this story.
+        Focus on: What cultural values are expressed? What traditions or beliefs are shown?
+        How does this reflect the contributor's cultural background? What cultural wisdom is shared?
+        """
+}
+
+for _layer, _instructions in LAYER_ANALYSIS_INSTRUCTIONS.items():
+    prompt_registry.register(PromptTemplate(
+        name=f"layer_analysis.{_layer}",
+        version="1.0",
+        system=(
+            "You are an expert analyst for the YSense Five-Layer Perception Framework. "
+            "You extract deep insights from human wisdom stories for ethical AI training. "
+            f"Focus on the {_layer} layer with precision and cultural sensitivity.\n\n"
+            + textwrap.dedent(_instructions).strip()
+        ),
+        user=f"Wisdom Story: {{story}}\n\nProvide a detailed analysis for the {_layer} layer:"
+    ))
+
+prompt_registry.register(PromptTemplate(
+    name="wisdom_extraction.five_layers",
+    version="1.0",
+    system=textwrap.dedent("""
+        You extract deep wisdom from human stories for ethical AI training.
+
+        Extract five layers of wisdom from the story you are given.
+
+        Return as JSON with these exact keys:
+        - surface: What literally happened (facts and events)
+        - emotional: The emotions and feelings captured
+        - contextual: Cultural and situational context
+        - wisdom: Universal lesson or insight learned
+        - cultural: Unique cultural perspective of the storyteller's culture
+
+        Be concise but profound. Find the human moment that matters for AI training.
+        Format: Valid JSON only, no markdown.
+        """).strip(),
+    user="Culture: {culture}\n\nStory: {story}"
+))
+
+prompt_registry.register(PromptTemplate(
+    name="team.synthesis",
+    version="1.0",
+    system=textwrap.dedent("""
+        You craft meaningful responses that make people feel their wisdom matters.
+
+        Create a warm, meaningful response to someone who shared their wisdom.
+        Write a 2-3 sentence response that:
+        1. Honors their contribution
+        2. Shows we deeply understood
+        3. Explains how this wisdom will help AI learn
+
+        Be warm, genuine, and specific to their story.
+        """).strip(),
+    user=textwrap.dedent("""
+        Their story essence:
+        - Wisdom found: {wisdom}
+        - Cultural gift: {cultural}
+        - Emotional core: {emotional}
+
+        Key insights from our team:
+        - Vision (ALTON): {alton}
+        - Learning (PED): {ped}
+        """).strip()
+))
+
+prompt_registry.register(PromptTemplate(
+    name="agent.persona",
+    version="1.0",
+    system="You are {role}, {expertise}. {activation_phrase}",
+    user="{context}\n\n{prompt}"
+))
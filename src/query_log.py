@@ -0,0 +1,175 @@
+# src/query_log.py
+"""
+YSense Platform v4.0 - Query Log
+Request-scoped record of the SQL statements a piece of code runs (text,
+duration, row count), collected from SQLAlchemy engine events. Statements are
+only recorded while a log is active in the current context, so outside of one
+the hooks cost a ContextVar lookup. Bind parameters are never kept.
+
+The same statement text running many times in one request is the N+1
+signature; QueryLogMiddleware reports counts in X-Query-* headers (dev) and
+tests pin endpoints to a budget with assert_query_budget().
+"""
+
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from src.config import Config
+
+@dataclass
+class QueryRecord:
+    statement: str
+    duration_ms: float
+    rowcount: Optional[int]
+    executemany: bool
+
+    def to_dict(self) -> Dict:
+        return {
+            "statement": self.statement,
+            "duration_ms": round(self.duration_ms, 3),
+            "rowcount": self.rowcount,
+            "executemany": self.executemany
+        }
+
+@dataclass
+class QueryLog:
+    queries: List[QueryRecord] = field(default_factory=list)
+    # Enclosing log (e.g. a request profile); it sees these statements too
+    parent: Optional["QueryLog"] = field(default=None, repr=False)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(q.duration_ms for q in self.queries)
+
+    def duplicates(self, min_count: int = 2) -> Dict[str, int]:
+        """Statements executed at least min_count times, most repeated first"""
+        counts = Counter(q.statement for q in self.queries if not q.executemany)
+        return {statement: n for statement, n in counts.most_common() if n >= min_count}
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "duplicates": self.duplicates(),
+            "queries": [q.to_dict() for q in self.queries]
+        }
+
+_current: ContextVar[Optional[QueryLog]] = ContextVar("ysense_query_log", default=None)
+
+def current_query_log() -> Optional[QueryLog]:
+    return _current.get()
+
+@contextmanager
+def capture_queries():
+    """with capture_queries() as log: ... - statements run in this context land in log"""
+    install_query_hooks()
+    log = QueryLog(parent=_current.get())
+    token = _current.set(log)
+    try:
+        yield log
+    finally:
+        _current.reset(token)
+
+@contextmanager
+def assert_query_budget(max_queries: int, max_repeats: Optional[int] = None):
+    """
+    Test helper: fail if the block runs more than max_queries statements, or
+    (with max_repeats) any one statement more than max_repeats times
+    """
+    with capture_queries() as log:
+        yield log
+    problems = []
+    if log.count > max_queries:
+        problems.append(f"{log.count} queries, budget is {max_queries}")
+    if max_repeats is not None:
+        problems += [
+            f"{n}x (max {max_repeats}): {statement[:200]}"
+            for statement, n in log.duplicates(max_repeats + 1).items()
+        ]
+    if problems:
+        statements = "\n".join(f"  {q.duration_ms:7.2f} ms  {q.statement[:200]}" for q in log.queries)
+        raise AssertionError("Query budget exceeded: " + "; ".join(problems) + "\n" + statements)
+
+# ==================== SQLAlchemy Hooks ====================
+
+_installed = False
+_install_lock = threading.Lock()
+
+def install_query_hooks():
+    """Listen on every engine (get_engine() creates them lazily); idempotent"""
+    global _installed
+    if _installed:
+        return
+    with _install_lock:
+        if _installed:
+            return
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        @event.listens_for(Engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            if _current.get() is not None:
+                context._ysense_query_start = time.perf_counter()
+
+        @event.listens_for(Engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            log = _current.get()
+            started = getattr(context, "_ysense_query_start", None)
+            if log is None or started is None:
+                return
+            rowcount = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+            record = QueryRecord(
+                statement=statement,  # SQLAlchemy's cached string, not a copy
+                duration_ms=(time.perf_counter() - started) * 1000,
+                rowcount=rowcount,
+                executemany=executemany
+            )
+            while log is not None:
+                log.queries.append(record)
+                log = log.parent
+
+        _installed = True
+
+# ==================== Debug Headers ====================
+
+class QueryLogMiddleware:
+    """
+    ASGI middleware (QUERY_DEBUG_HEADERS): X-Query-Count, X-Query-Time-Ms and
+    X-Query-Duplicates on every response, counting statements run before the
+    response started; warns when one statement repeats QUERY_REPEAT_WARNING times
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with capture_queries() as log:
+            async def send_with_counts(message):
+                if message["type"] == "http.response.start":
+                    message = {**message, "headers": list(message.get("headers", [])) + [
+                        (b"x-query-count", str(log.count).encode()),
+                        (b"x-query-time-ms", f"{log.total_ms:.2f}".encode()),
+                        (b"x-query-duplicates", str(len(log.duplicates())).encode())
+                    ]}
+                await send(message)
+
+            await self.app(scope, receive, send_with_counts)
+
+        repeated = log.duplicates(Config.QUERY_REPEAT_WARNING)
+        if repeated:
+            statement, n = next(iter(repeated.items()))
+            print(f"⚠️ Possible N+1 in {scope['method']} {scope['path']}: "
+                  f"{n}x {' '.join(statement.split())[:160]}")
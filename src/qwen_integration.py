@@ -5,13 +5,19 @@ Replaces OpenAI with Alibaba Cloud QWEN for cost efficiency
 """
 
 import os
+import re
 import json
 import httpx
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime
 import asyncio
 from dotenv import load_dotenv
 
+from src.config import Config
+from src.metrics import llm_timer
+from src.prompt_registry import prompt_registry
+from src.telemetry import record_llm_usage, set_attributes, span
+
 load_dotenv()
 
 class QWENClient:
@@ -22,6 +28,15 @@ class QWENClient:
         self.model = os.getenv("QWEN_MODEL", "qwen-turbo")  # qwen-turbo, qwen-plus, qwen-max
         self.base_url = "https://dashscope.aliyuncs.com/api/v1/services/aigc/text-generation/generation"
         
+        if Config.USE_LLM_STUB:
+            # Offline stub speaking the dashscope wire format (scripts/llm_stub_server.py)
+            self.base_url = f"{Config.LLM_STUB_URL}/api/v1/services/aigc/text-generation/generation"
+            self.api_key = self.api_key or "stub-key"
+            print(f"🧪 QWEN client using LLM stub at {Config.LLM_STUB_URL}")
+        
+        # Explicit context cache (qwen-plus/max); otherwise dashscope caches stable prefixes implicitly
+        self.explicit_cache = os.getenv("QWEN_EXPLICIT_CACHE", "false").lower() == "true"
+        
         if not self.api_key:
             print("⚠️ QWEN_API_KEY not found. Using fallback mode.")
             self.use_fallback = True
@@ -33,23 +48,137 @@ class QWENClient:
                                max_tokens: int = 500) -> str:
         """Create completion using QWEN API"""
         
-        if self.use_fallback:
-            return self._fallback_response(messages)
+        with span("llm.qwen.completion"), llm_timer("qwen", self.model):
+            if self.use_fallback:
+                record_llm_usage("qwen", self.model, fallback=True)
+                return self._fallback_response(messages)
+            
+            headers = {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
+            
+            payload = self._build_payload(messages, temperature, max_tokens)
+            
+            try:
+                async with httpx.AsyncClient() as client:
+                    response = await client.post(
+                        self.base_url,
+                        headers=headers,
+                        json=payload,
+                        timeout=30.0
+                    )
+                    
+                    if response.status_code == 200:
+                        result = response.json()
+                        self._record_usage(result.get("usage"))
+                        # Extract text from QWEN response format
+                        if "output" in result and "choices" in result["output"]:
+                            return result["output"]["choices"][0]["message"]["content"]
+                        return result.get("output", {}).get("text", "Processing...")
+                    else:
+                        print(f"QWEN API Error: {response.status_code}")
+                        set_attributes(**{"http.response.status_code": response.status_code})
+                        record_llm_usage("qwen", self.model, fallback=True)
+                        return self._fallback_response(messages)
+                        
+            except Exception as e:
+                print(f"QWEN API Exception: {e}")
+                record_llm_usage("qwen", self.model, fallback=True)
+                return self._fallback_response(messages)
+    
+    async def stream_completion(self, messages: List[Dict],
+                                temperature: float = 0.7,
+                                max_tokens: int = 500) -> AsyncIterator[str]:
+        """Stream completion tokens using QWEN SSE incremental output"""
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        with span("llm.qwen.stream", current=False) as llm_span, llm_timer("qwen", self.model):
+            if self.use_fallback:
+                record_llm_usage("qwen", self.model, fallback=True, target=llm_span)
+                for chunk in self._chunk_text(self._fallback_response(messages)):
+                    yield chunk
+                return
+            
+            headers = {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                "Accept": "text/event-stream",
+                "X-DashScope-SSE": "enable"
+            }
+            
+            payload = self._build_payload(messages, temperature, max_tokens)
+            # Only send the delta in each event instead of the growing full text
+            payload["parameters"]["incremental_output"] = True
+            
+            emitted = False
+            usage = None
+            try:
+                async with httpx.AsyncClient() as client:
+                    async with client.stream(
+                        "POST",
+                        self.base_url,
+                        headers=headers,
+                        json=payload,
+                        timeout=30.0
+                    ) as response:
+                        if response.status_code != 200:
+                            print(f"QWEN API Error: {response.status_code}")
+                        else:
+                            async for line in response.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue
+                                
+                                event = json.loads(line[5:].strip() or "{}")
+                                # Every event carries running totals; the last one wins
+                                usage = event.get("usage") or usage
+                                output = event.get("output", {})
+                                if output.get("choices"):
+                                    text = output["choices"][0].get("message", {}).get("content", "")
+                                else:
+                                    text = output.get("text", "")
+                                
+                                if text:
+                                    emitted = True
+                                    yield text
+                                    
+            except Exception as e:
+                print(f"QWEN API Stream Exception: {e}")
+            
+            self._record_usage(usage, llm_span)
+            
+            # Nothing arrived from the API - keep the caller's stream non-empty
+            if not emitted:
+                record_llm_usage("qwen", self.model, fallback=True, target=llm_span)
+                for chunk in self._chunk_text(self._fallback_response(messages)):
+                    yield chunk
+    
+    def _record_usage(self, usage: Optional[Dict], target=None):
+        """Token counts (incl. context-cache hits) on the LLM span"""
+        if not usage:
+            return
+        record_llm_usage(
+            "qwen", self.model,
+            input_tokens=usage.get("input_tokens"),
+            output_tokens=usage.get("output_tokens"),
+            cache_read_tokens=(usage.get("prompt_tokens_details") or {}).get("cached_tokens"),
+            target=target
+        )
+    
+    def _build_payload(self, messages: List[Dict], temperature: float, max_tokens: int) -> Dict:
+        """Build dashscope request payload from OpenAI-style messages"""
         
         # Convert OpenAI format to QWEN format
         qwen_messages = []
         for msg in messages:
+            content = msg["content"]
+            if self.explicit_cache and msg.get("cache_control"):
+                content = [{"type": "text", "text": content, "cache_control": msg["cache_control"]}]
             qwen_messages.append({
                 "role": msg["role"],
-                "content": msg["content"]
+                "content": content
             })
         
-        payload = {
+        return {
             "model": self.model,
             "input": {
                 "messages": qwen_messages
@@ -62,29 +191,11 @@ class QWENClient:
                 "result_format": "message"
             }
         }
-        
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.base_url,
-                    headers=headers,
-                    json=payload,
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    # Extract text from QWEN response format
-                    if "output" in result and "choices" in result["output"]:
-                        return result["output"]["choices"][0]["message"]["content"]
-                    return result.get("output", {}).get("text", "Processing...")
-                else:
-                    print(f"QWEN API Error: {response.status_code}")
-                    return self._fallback_response(messages)
-                    
-        except Exception as e:
-            print(f"QWEN API Exception: {e}")
-            return self._fallback_response(messages)
+    
+    @staticmethod
+    def _chunk_text(text: str) -> List[str]:
+        """Split text into word-sized chunks for streaming"""
+        return re.findall(r'\S+\s*', text) or [text]
     
     def _fallback_response(self, messages: List[Dict]) -> str:
         """Fallback response when API is unavailable"""
@@ -106,26 +217,10 @@ class QWENWisdomExtractor:
     async def extract_five_layers(self, story: str, culture: str) -> Dict:
         """Extract Five-Layer Perception using QWEN"""
         
-        prompt = f"""
-        Extract five layers of wisdom from this {culture} story.
-        
-        Story: {story}
-        
-        Return as JSON with these exact keys:
-        - surface: What literally happened (facts and events)
-        - emotional: The emotions and feelings captured
-        - contextual: Cultural and situational context
-        - wisdom: Universal lesson or insight learned
-        - cultural: Unique {culture} cultural perspective
-        
-        Be concise but profound. Find the human moment that matters for AI training.
-        Format: Valid JSON only, no markdown.
-        """
-        
-        messages = [
-            {"role": "system", "content": "You extract deep wisdom from human stories for ethical AI training."},
-            {"role": "user", "content": prompt}
-        ]
+        messages = prompt_registry.bound("wisdom_extraction.five_layers").messages(
+            culture=culture,
+            story=story
+        )
         
         response = await self.client.create_completion(
             messages=messages,
@@ -0,0 +1,240 @@
+# src/rate_limit.py
+"""
+YSense Platform v4.0 - Rate Limiting
+Token buckets per client (user id from the bearer token, X-Client-ID, or IP)
+with per-route costs: an /analyze-story call fans out to seven agents and
+several LLM calls, so it drains far more of the bucket than a read.
+Buckets live in-process by default; with USE_REDIS they are shared by all
+workers through an atomic Lua script. Responses carry RateLimit-* headers.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+import jwt
+
+from src.config import Config
+from src.responses import dumps_json
+from src.token_revocation import revocation_list
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# (method or None, path prefix, path suffix or None, cost) - first match wins
+ROUTE_COSTS = (
+    ("POST", "/api/v4/wisdom/analyze-story", None, 20),
+    ("POST", "/api/v4/wisdom/create-wisdom-drop", None, 20),
+    ("POST", "/api/v3/wisdom/publish-batch", None, 20),
+    ("POST", "/api/v3/wisdom/", "/distill", 10),
+    ("POST", "/api/v4/admin/users/import", None, 10),
+    ("POST", "/api/v3/auth/login", None, 3),
+    ("POST", "/api/v3/auth/register", None, 5),
+    ("POST", "/api/v3/revenue/report-usage", None, 2),
+    ("POST", "/api/v3/legal/data-export", None, 5),
+)
+
+EXEMPT_PATHS = ("/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json")
+
+DEFAULT_COST = 1
+
+def route_cost(method: str, path: str) -> int:
+    for route_method, prefix, suffix, cost in ROUTE_COSTS:
+        if route_method and route_method != method:
+            continue
+        if path.startswith(prefix) and (suffix is None or path.endswith(suffix)):
+            return cost
+    return DEFAULT_COST
+
+class RateLimitExceeded(Exception):
+    """Raised by non-HTTP callers (MCP tools) when a bucket is empty"""
+
+    def __init__(self, result: "RateLimitResult"):
+        self.result = result
+        super().__init__(f"Rate limit exceeded, retry in {result.retry_after}s")
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int          # seconds until the bucket is full again
+    retry_after: int    # seconds until this request's cost is available (0 if allowed)
+
+    def headers(self) -> dict:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset)
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+# ==================== Bucket Stores ====================
+
+class MemoryBucketStore:
+    """Per-process buckets; least recently used clients are evicted past max_keys"""
+
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, cost: float, capacity: float, rate: float) -> Tuple[bool, float]:
+        """Refill, then take cost tokens if available; returns (allowed, tokens left)"""
+        now = self.clock()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+class RedisBucketStore:
+    """Buckets shared across workers; refill and take happen in one script on Redis time"""
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local allowed = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: str, prefix: str = "ysense:ratelimit:"):
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+        self._take = self.client.register_script(self.SCRIPT)
+
+    def take(self, key: str, cost: float, capacity: float, rate: float) -> Tuple[bool, float]:
+        allowed, tokens = self._take(keys=[self.prefix + key], args=[capacity, rate, cost])
+        return bool(allowed), float(tokens)
+
+# ==================== Limiter ====================
+
+class RateLimiter:
+    """Token bucket limiter; falls back to in-process buckets if Redis is unreachable"""
+
+    def __init__(self, capacity: Optional[int] = None, refill_per_second: Optional[float] = None,
+                 store=None):
+        self.capacity = capacity or Config.RATE_LIMIT_CAPACITY
+        self.rate = refill_per_second or Config.RATE_LIMIT_REFILL_PER_SECOND
+        self.local = MemoryBucketStore(Config.RATE_LIMIT_MAX_KEYS)
+        self.store = store or self.local
+        self._redis_warned = False
+
+    def check(self, key: str, cost: float = DEFAULT_COST) -> RateLimitResult:
+        # A cost above capacity could never be paid; charge a full bucket instead
+        cost = min(cost, self.capacity)
+        try:
+            allowed, tokens = self.store.take(key, cost, self.capacity, self.rate)
+        except Exception as e:
+            if not self._redis_warned:
+                print(f"⚠️ Rate limit store unavailable ({e}), using in-process buckets")
+                self._redis_warned = True
+            allowed, tokens = self.local.take(key, cost, self.capacity, self.rate)
+
+        return RateLimitResult(
+            allowed=allowed,
+            limit=self.capacity,
+            remaining=max(0, math.floor(tokens)),
+            reset=math.ceil((self.capacity - tokens) / self.rate),
+            retry_after=0 if allowed else math.ceil((cost - tokens) / self.rate)
+        )
+
+    def enforce(self, key: str, cost: float = DEFAULT_COST) -> RateLimitResult:
+        """check() that raises RateLimitExceeded instead of returning a denial"""
+        result = self.check(key, cost)
+        if not result.allowed:
+            raise RateLimitExceeded(result)
+        return result
+
+def create_rate_limiter() -> RateLimiter:
+    """Limiter on Redis when USE_REDIS is set (and redis is installed), else per process"""
+    store = None
+    if Config.USE_REDIS and redis is not None:
+        store = RedisBucketStore(Config.REDIS_URL)
+    elif Config.USE_REDIS:
+        print("⚠️ USE_REDIS is set but the redis package is not installed; rate limits are per worker")
+    return RateLimiter(store=store)
+
+# ==================== Middleware ====================
+
+def client_key(scope) -> str:
+    """Bucket key: authenticated user, else remote address (split by declared client id)"""
+    headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope.get("headers", [])}
+
+    authorization = headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        try:
+            payload = jwt.decode(authorization[7:], Config.JWT_SECRET_KEY, algorithms=[Config.JWT_ALGORITHM])
+            # Same acceptance as get_token_payload: refresh and revoked tokens don't count
+            if payload.get("sub") and payload.get("type") != "refresh" and not revocation_list.is_revoked(payload):
+                return f"user:{payload['sub']}"
+        except Exception:
+            pass  # Invalid tokens are rejected by the route; limit them by address meanwhile
+
+    client = scope.get("client")
+    address = client[0] if client else 'unknown'
+    # X-Client-ID is unauthenticated: scope it to the address so it cannot drain (or borrow) another caller's bucket
+    if headers.get("x-client-id"):
+        return f"client:{headers['x-client-id']}@{address}"
+    return f"ip:{address}"
+
+class RateLimitMiddleware:
+    """ASGI middleware: 429 with Retry-After when the client's bucket can't pay the route cost"""
+
+    def __init__(self, app, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        result = self.limiter.check(client_key(scope), route_cost(scope["method"], scope["path"]))
+        rate_headers = [(name.lower().encode(), value.encode()) for name, value in result.headers().items()]
+
+        if not result.allowed:
+            body = dumps_json({"detail": "Rate limit exceeded", "retry_after": result.retry_after})
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [(b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode())] + rate_headers
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + rate_headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+rate_limiter = create_rate_limiter()
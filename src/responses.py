@@ -0,0 +1,51 @@
+# src/responses.py
+"""
+YSense Platform v4.0 - Fast JSON Responses
+orjson-backed response class used as the app default. orjson serializes
+datetime/date, UUID and NumPy values natively, so endpoints can hand over raw
+column values instead of calling .isoformat() per field, and returning an
+APIResponse instance directly skips FastAPI's jsonable_encoder pass.
+
+StreamAwareCompression wraps the compression middleware so Server-Sent Event
+streams bypass it: gzip holds small writes in its buffer, which would deliver
+every streamed token at once when the stream ends.
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def dumps_json(content: Any, indent: bool = False) -> bytes:
+    """Serialize with the same options as APIResponse (used for file exports)"""
+    return orjson.dumps(content, option=ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0))
+
+class APIResponse(ORJSONResponse):
+    """Default response class for every router"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+# ==================== Compression ====================
+
+def is_event_stream(scope) -> bool:
+    """SSE endpoints live under .../stream; EventSource clients also send Accept: text/event-stream"""
+    if scope["path"].endswith("/stream"):
+        return True
+    accept = dict(scope.get("headers", [])).get(b"accept", b"")
+    return b"text/event-stream" in accept
+
+class StreamAwareCompression:
+    """ASGI middleware: compress with compressor(app, **options), except event streams"""
+
+    def __init__(self, app, compressor, **options):
+        self.app = app
+        self.compressed = compressor(app, **options)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and is_event_stream(scope):
+            await self.app(scope, receive, send)
+        else:
+            await self.compressed(scope, receive, send)
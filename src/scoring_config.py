@@ -0,0 +1,189 @@
+# src/scoring_config.py
+"""
+YSense Platform v4.0 - Scoring Configuration Registry
+Single source for cultural multipliers and revenue tiers, compiled once into
+immutable lookup structures and hot-reloaded from SCORING_CONFIG_PATH
+
+Override file format (JSON, every key optional):
+    {
+        "version": "2025-01",
+        "cultural_multipliers": {"Malaysian": 1.5, "Hokkien": 1.7},
+        "tiers": [{"level": 1, "name": "Bronze", "multiplier": 1.0, "revenue_share": 30.0,
+                   "min_score": 0, "min_drops": 0}, ...]
+    }
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from src.config import Config
+
+@dataclass(frozen=True)
+class TierSpec:
+    """One Z Protocol / revenue tier"""
+    level: int
+    name: str
+    multiplier: float
+    revenue_share: float
+    min_score: float
+    min_drops: int
+    consent_required: bool = True
+
+    def as_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "multiplier": self.multiplier,
+            "consent_required": self.consent_required,
+            "revenue_share": self.revenue_share,
+            "min_score": self.min_score,
+            "min_drops": self.min_drops
+        }
+
+class ScoringConfig:
+    """Immutable, precompiled scoring configuration"""
+
+    def __init__(self, cultural_multipliers: Mapping[str, float], tiers: Iterable[TierSpec],
+                 version: str = "default"):
+        self.version = version
+        multipliers = dict(cultural_multipliers)
+        self.default_multiplier = multipliers.get('Default', multipliers.get('Global', 1.0))
+        self.cultural_multipliers = MappingProxyType(multipliers)
+
+        # Tiers sorted by score threshold so bisect finds the highest tier reached
+        self.tiers: Tuple[TierSpec, ...] = tuple(sorted(tiers, key=lambda t: (t.min_score, t.level)))
+        if not self.tiers:
+            raise ValueError("Scoring configuration needs at least one tier")
+        self._thresholds = tuple(t.min_score for t in self.tiers)
+        self.tiers_by_name = MappingProxyType({t.name: t for t in self.tiers})
+        self.tiers_by_level = MappingProxyType({t.level: t for t in self.tiers})
+        self.tier_order = tuple(t.name for t in self.tiers)
+        self.tier_multipliers = MappingProxyType({t.name: t.multiplier for t in self.tiers})
+
+    # ==================== Lookups ====================
+
+    def cultural_multiplier(self, cultural_context: Optional[str]) -> float:
+        return self.cultural_multipliers.get(cultural_context, self.default_multiplier)
+
+    def tier(self, name: Optional[str]) -> TierSpec:
+        """Tier by name, lowest tier when unknown"""
+        return self.tiers_by_name.get(name, self.tiers[0])
+
+    def tier_info(self, level: int) -> Dict:
+        """Config.Z_PROTOCOL_TIERS-style dict for a tier level"""
+        return self.tiers_by_level.get(level, self.tiers[0]).as_dict()
+
+    def tier_for_score(self, score: float) -> TierSpec:
+        """Highest tier whose score minimum is met"""
+        return self.tiers[max(bisect_right(self._thresholds, score or 0.0) - 1, 0)]
+
+    def tier_for(self, score: float, contributions: int) -> TierSpec:
+        """Highest tier whose score and contribution minimums are both met"""
+        index = max(bisect_right(self._thresholds, score or 0.0) - 1, 0)
+        while index > 0 and (contributions or 0) < self.tiers[index].min_drops:
+            index -= 1
+        return self.tiers[index]
+
+    def next_tier(self, name: Optional[str]) -> Optional[TierSpec]:
+        position = self.tier_order.index(self.tier(name).name)
+        return self.tiers[position + 1] if position + 1 < len(self.tiers) else None
+
+    # ==================== Loading ====================
+
+    @classmethod
+    def from_dict(cls, data: Dict, base: Optional["ScoringConfig"] = None) -> "ScoringConfig":
+        """Build from a config mapping; missing sections fall back to base (or Config defaults)"""
+        base = base or cls.defaults()
+        multipliers = dict(base.cultural_multipliers)
+        multipliers.update(data.get("cultural_multipliers", {}))
+
+        tiers = base.tiers
+        if "tiers" in data:
+            tiers = [
+                TierSpec(
+                    level=int(t["level"]),
+                    name=t["name"],
+                    multiplier=float(t.get("multiplier", 1.0)),
+                    revenue_share=float(t["revenue_share"]),
+                    min_score=float(t.get("min_score", 0.0)),
+                    min_drops=int(t.get("min_drops", 0)),
+                    consent_required=bool(t.get("consent_required", True))
+                )
+                for t in data["tiers"]
+            ]
+        return cls(multipliers, tiers, version=str(data.get("version", "file")))
+
+    @classmethod
+    def defaults(cls) -> "ScoringConfig":
+        tiers = [
+            TierSpec(
+                level=level,
+                name=info["name"],
+                multiplier=info["multiplier"],
+                revenue_share=info["revenue_share"],
+                min_score=info.get("min_score", 0.0),
+                min_drops=info.get("min_drops", 0),
+                consent_required=info.get("consent_required", True)
+            )
+            for level, info in Config.Z_PROTOCOL_TIERS.items()
+        ]
+        return cls(Config.CULTURAL_MULTIPLIERS, tiers, version="default")
+
+class ScoringConfigService:
+    """Holds the active ScoringConfig and swaps it when the override file changes"""
+
+    def __init__(self, path: str = "", check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        self._config = ScoringConfig.defaults()
+        if path:
+            self._load_file()
+
+    def get(self) -> ScoringConfig:
+        """Current config; stats the override file at most once per check interval"""
+        if self.path and time.monotonic() >= self._next_check:
+            self._maybe_reload()
+        return self._config
+
+    def reload(self) -> ScoringConfig:
+        """Force a reload from the override file (or defaults when none is set)"""
+        with self._lock:
+            if self.path:
+                self._load_file()
+            else:
+                self._config = ScoringConfig.defaults()
+        return self._config
+
+    def _maybe_reload(self):
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError:
+                return
+            if mtime != self._mtime:
+                self._load_file()
+
+    def _load_file(self):
+        try:
+            # Remember the mtime even if parsing fails so a broken file is reported once
+            self._mtime = os.stat(self.path).st_mtime
+            with open(self.path, encoding="utf-8") as f:
+                self._config = ScoringConfig.from_dict(json.load(f))
+            print(f"✅ Scoring config loaded from {self.path} (version {self._config.version})")
+        except Exception as e:
+            # Keep serving the last good config
+            print(f"⚠️  Could not load scoring config {self.path}: {e}")
+
+scoring_config = ScoringConfigService(Config.SCORING_CONFIG_PATH, Config.SCORING_CONFIG_CHECK_SECONDS)
+
+def get_scoring_config() -> ScoringConfig:
+    return scoring_config.get()
@@ -0,0 +1,226 @@
+# src/telemetry.py
+"""
+YSense Platform v4.0 - Tracing
+OpenTelemetry spans for HTTP requests, orchestrator agents, LLM calls (with
+token counts and prompt-cache hits) and SQL statements. Exports over OTLP to a
+local collector, or as JSON lines to a file for offline use. Without
+TRACING_ENABLED or the opentelemetry packages every helper here is a no-op.
+"""
+
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from src.config import Config
+from src.metrics import observe_llm_usage
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter, SpanExportResult
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:
+    trace = None
+
+_tracer = None
+
+# ==================== Setup ====================
+
+if trace is not None:
+    class JsonLinesSpanExporter(SpanExporter):
+        """Appends finished spans as JSON lines (TRACE_FILE_PATH) for offline analysis"""
+
+        def __init__(self, path: str):
+            self.path = path
+            self._lock = threading.Lock()
+
+        def export(self, spans) -> "SpanExportResult":
+            lines = [span.to_json(indent=None) + "\n" for span in spans]
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            pass
+
+def _exporter():
+    if Config.TRACE_EXPORTER == "file":
+        return JsonLinesSpanExporter(Config.TRACE_FILE_PATH)
+    if Config.TRACE_EXPORTER == "console":
+        return ConsoleSpanExporter()
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    return OTLPSpanExporter(endpoint=Config.OTEL_EXPORTER_OTLP_ENDPOINT)
+
+def setup_tracing() -> bool:
+    """Install the tracer provider and SQL hooks; returns whether tracing is active"""
+    global _tracer
+    if _tracer is not None:
+        return True
+    if not Config.TRACING_ENABLED:
+        return False
+    if trace is None:
+        print("⚠️ TRACING_ENABLED but opentelemetry-sdk is not installed; tracing disabled")
+        return False
+
+    try:
+        exporter = _exporter()
+    except ImportError:
+        print("⚠️ OTLP exporter not installed (opentelemetry-exporter-otlp-proto-http); tracing disabled")
+        return False
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": Config.OTEL_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(Config.TRACE_SAMPLE_RATIO))
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("ysense")
+    _instrument_sqlalchemy()
+    print(f"🔭 Tracing enabled ({Config.TRACE_EXPORTER} exporter)")
+    return True
+
+def shutdown_tracing():
+    if _tracer is not None:
+        trace.get_tracer_provider().shutdown()
+
+# ==================== Span Helpers ====================
+
+@contextmanager
+def span(name: str, current: bool = True, **attributes):
+    """
+    Child span of the current one; yields None when tracing is off.
+    current=False leaves the active context alone - use it in async generators,
+    which may resume in another task than the one that entered the span
+    """
+    if _tracer is None:
+        yield None
+        return
+    if current:
+        with _tracer.start_as_current_span(name, attributes=_clean(attributes)) as active:
+            yield active
+        return
+    detached = _tracer.start_span(name, attributes=_clean(attributes))
+    try:
+        yield detached
+    except Exception as e:
+        detached.record_exception(e)
+        detached.set_status(Status(StatusCode.ERROR))
+        raise
+    finally:
+        detached.end()
+
+def traced(name: str):
+    """Decorator for async functions: run the call inside span(name)"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def set_attributes(target=None, **attributes):
+    """Attach attributes to target, or the current span (dotted names: pass **{...})"""
+    if _tracer is None:
+        return
+    target = target or trace.get_current_span()
+    if target.is_recording():
+        target.set_attributes(_clean(attributes))
+
+def record_llm_usage(provider: str, model: str, input_tokens: Optional[int] = None,
+                     output_tokens: Optional[int] = None, cache_read_tokens: Optional[int] = None,
+                     cache_write_tokens: Optional[int] = None, fallback: bool = False, target=None):
+    """GenAI semantic-convention attributes on the LLM span (target, or the current one) plus token metrics"""
+    observe_llm_usage(provider, model, input_tokens, output_tokens, cache_read_tokens, cache_write_tokens, fallback)
+    set_attributes(target, **{
+        "gen_ai.system": provider,
+        "gen_ai.request.model": model,
+        "gen_ai.usage.input_tokens": input_tokens,
+        "gen_ai.usage.output_tokens": output_tokens,
+        "llm.cache.read_tokens": cache_read_tokens,
+        "llm.cache.write_tokens": cache_write_tokens,
+        "llm.cache.hit": bool(cache_read_tokens) if cache_read_tokens is not None else None,
+        "llm.fallback": fallback
+    })
+
+def _clean(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """OpenTelemetry only takes primitives; drop None and stringify the rest"""
+    return {
+        key: value if isinstance(value, (bool, int, float, str)) else str(value)
+        for key, value in attributes.items()
+        if value is not None
+    }
+
+# ==================== HTTP Middleware ====================
+
+class TracingMiddleware:
+    """ASGI server span per request, named by route template once routing has run"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if _tracer is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with _tracer.start_as_current_span(f"{scope['method']} {scope['path']}", kind=SpanKind.SERVER) as server_span:
+            server_span.set_attributes({
+                "http.request.method": scope["method"],
+                "url.path": scope["path"],
+                "client.address": scope["client"][0] if scope.get("client") else ""
+            })
+
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    server_span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        server_span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                if route is not None and getattr(route, "path", None):
+                    server_span.update_name(f"{scope['method']} {route.path}")
+                    server_span.set_attribute("http.route", route.path)
+
+# ==================== SQLAlchemy ====================
+
+def _instrument_sqlalchemy():
+    """Span per SQL statement on every engine (get_session() creates engines on demand)"""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._ysense_span = _tracer.start_span(
+            statement.split(None, 1)[0].upper() if statement else "SQL",
+            kind=SpanKind.CLIENT,
+            attributes={
+                "db.system": conn.engine.dialect.name,
+                "db.statement": statement[:1000],
+                "db.executemany": executemany
+            }
+        )
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        db_span = getattr(context, "_ysense_span", None)
+        if db_span is not None:
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                db_span.set_attribute("db.rowcount", cursor.rowcount)
+            db_span.end()
+
+    @event.listens_for(Engine, "handle_error")
+    def _error(exception_context):
+        context = exception_context.execution_context
+        db_span = getattr(context, "_ysense_span", None) if context is not None else None
+        if db_span is not None:
+            db_span.record_exception(exception_context.original_exception)
+            db_span.set_status(Status(StatusCode.ERROR))
+            db_span.end()
@@ -0,0 +1,125 @@
+# src/token_revocation.py
+"""
+YSense Platform v4.0 - Token Revocation List
+In-memory set of revoked JWT ids plus per-user "revoked before" cutoffs, so
+get_current_user checks revocation with dict lookups instead of a query.
+Revocations are written to revoked_tokens and every worker pulls new rows on
+a short interval; entries are dropped once the tokens they cover have expired.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from src.config import Config
+from src.models import RevokedToken, get_session
+
+EPOCH = datetime(1970, 1, 1)
+
+def to_epoch(value: datetime) -> float:
+    return (value - EPOCH).total_seconds()
+
+def from_epoch(value: float) -> datetime:
+    return EPOCH + timedelta(seconds=value)
+
+class RevocationList:
+    """O(1) revocation checks against a periodically synced in-memory copy"""
+
+    def __init__(self, session_factory=get_session):
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, float] = {}                 # jti -> expires (epoch)
+        self._users: Dict[str, Tuple[float, float]] = {}    # user_id -> (cutoff, expires)
+        self._last_sync: Optional[float] = None
+
+    # ==================== Checks ====================
+
+    def is_revoked(self, payload: Dict) -> bool:
+        """True if the token's jti was revoked or it predates its user's cutoff"""
+        if payload.get("jti") in self._tokens:
+            return True
+        user = self._users.get(payload.get("sub"))
+        return user is not None and payload.get("iat", 0) < user[0]
+
+    # ==================== Revoking ====================
+
+    def revoke_token(self, payload: Dict):
+        """Revoke one decoded token until it would have expired anyway"""
+        jti = payload.get("jti")
+        if not jti:
+            return
+        expires = float(payload.get("exp") or time.time() + Config.JWT_REFRESH_EXPIRATION_DAYS * 86400)
+        with self._lock:
+            self._tokens[jti] = expires
+        self._persist(RevokedToken(
+            id=jti, user_id=payload.get("sub"), scope="token",
+            revoked_at=datetime.utcnow(), expires_at=from_epoch(expires)
+        ))
+
+    def revoke_user(self, user_id: str) -> float:
+        """Revoke every token issued to the user so far; returns the cutoff"""
+        cutoff = time.time()
+        # Nothing issued before the cutoff outlives the longest token lifetime
+        expires = cutoff + Config.JWT_REFRESH_EXPIRATION_DAYS * 86400
+        with self._lock:
+            self._users[user_id] = (cutoff, expires)
+        self._persist(RevokedToken(
+            id=f"user:{user_id}", user_id=user_id, scope="user",
+            revoked_at=from_epoch(cutoff), expires_at=from_epoch(expires)
+        ))
+        return cutoff
+
+    def _persist(self, row: RevokedToken):
+        db = self.session_factory()
+        try:
+            db.merge(row)
+            db.commit()
+        finally:
+            db.close()
+
+    # ==================== Sync ====================
+
+    def sync(self) -> int:
+        """
+        Pull revocations recorded since the last sync (with an overlap window for
+        slow commits on other workers), prune expired entries and purge their rows
+        """
+        started = time.time()
+        db = self.session_factory()
+        try:
+            query = db.query(RevokedToken.id, RevokedToken.user_id, RevokedToken.scope,
+                             RevokedToken.revoked_at, RevokedToken.expires_at)
+            if self._last_sync is not None:
+                overlap = max(Config.TOKEN_REVOCATION_SYNC_SECONDS, 5) * 2
+                query = query.filter(RevokedToken.revoked_at >= from_epoch(self._last_sync - overlap))
+            rows = query.filter(RevokedToken.expires_at > from_epoch(started)).all()
+
+            db.query(RevokedToken).filter(
+                RevokedToken.expires_at <= from_epoch(started)
+            ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+        with self._lock:
+            for row_id, user_id, scope, revoked_at, expires_at in rows:
+                if scope == "user":
+                    cutoff = to_epoch(revoked_at)
+                    current = self._users.get(user_id)
+                    if current is None or current[0] < cutoff:
+                        self._users[user_id] = (cutoff, to_epoch(expires_at))
+                else:
+                    self._tokens[row_id] = to_epoch(expires_at)
+
+            self._tokens = {jti: exp for jti, exp in self._tokens.items() if exp > started}
+            self._users = {uid: entry for uid, entry in self._users.items() if entry[1] > started}
+            self._last_sync = started
+
+        return len(rows)
+
+    def stats(self) -> Dict:
+        return {"revoked_tokens": len(self._tokens), "revoked_users": len(self._users),
+                "last_sync": from_epoch(self._last_sync).isoformat() if self._last_sync else None}
+
+revocation_list = RevocationList()
@@ -0,0 +1,181 @@
+# src/user_aggregates.py
+"""
+YSense Platform v4.0 - User Contribution Aggregates
+Per-user running totals (published count, Z Protocol score sum, lifetime and
+pending revenue) maintained in the same transaction as publish / usage /
+deletion, so tiers are derived from O(1) fields instead of scanning contributions
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from src.models import RevenueRecord, User, WisdomDrop, get_session
+from src.scoring_config import TierSpec, get_scoring_config
+
+# Revenue not yet requested for payment
+_PENDING_AMOUNT = case((RevenueRecord.payment_status == "pending", RevenueRecord.amount), else_=0.0)
+
+# ==================== Tier Derivation ====================
+
+def derive_tier(user: User) -> TierSpec:
+    """Tier from the stored rolling score and published count"""
+    return get_scoring_config().tier_for(user.z_protocol_score or 0.0, user.published_drop_count or 0)
+
+def apply_tier(user: User) -> TierSpec:
+    tier = derive_tier(user)
+    user.z_protocol_tier = tier.name
+    user.revenue_tier = tier.name
+    user.revenue_share_percentage = tier.revenue_share
+    return tier
+
+def _published_totals(db: Session, user_id: str):
+    return db.query(
+        func.count(WisdomDrop.id),
+        func.coalesce(func.sum(WisdomDrop.z_protocol_score), 0.0)
+    ).filter(
+        WisdomDrop.user_id == user_id,
+        WisdomDrop.published == True
+    ).one()
+
+def _earning_totals(db: Session, user_id: str):
+    return db.query(
+        func.coalesce(func.sum(RevenueRecord.amount), 0.0),
+        func.coalesce(func.sum(_PENDING_AMOUNT), 0.0)
+    ).filter(RevenueRecord.user_id == user_id).one()
+
+def ensure_aggregates(db: Session, user: User):
+    """One-time backfill for accounts created before the aggregate columns existed"""
+    if user.published_drop_count is None or user.z_protocol_score_sum is None:
+        user.published_drop_count, user.z_protocol_score_sum = _published_totals(db, user.id)
+
+def published_drop_count(user: User) -> int:
+    """Stored published count, falling back to a COUNT only for un-backfilled accounts"""
+    if user.published_drop_count is not None:
+        return user.published_drop_count
+    db = get_session()
+    count, _ = _published_totals(db, user.id)
+    db.close()
+    return count
+
+def _refresh_score(user: User):
+    if user.published_drop_count:
+        user.z_protocol_score = user.z_protocol_score_sum / user.published_drop_count
+    else:
+        user.z_protocol_score_sum = 0.0
+        user.z_protocol_score = 0.0
+
+# ==================== Transactional Updates ====================
+
+def record_publish(db: Session, user_id: str, scores: List[float], user: Optional[User] = None) -> User:
+    """
+    Fold newly published Z Protocol scores into the user's aggregates and re-derive the tier.
+    Pass user if the caller already loaded it FOR UPDATE in db; otherwise it is locked here.
+    """
+    if user is None:
+        user = db.query(User).filter(User.id == user_id).with_for_update().first()
+    ensure_aggregates(db, user)
+
+    user.published_drop_count += len(scores)
+    user.z_protocol_score_sum += sum(scores)
+    _refresh_score(user)
+    apply_tier(user)
+
+    return user
+
+def record_usage(user: User, revenue_amount: float):
+    """Add usage revenue to pending and lifetime (total_earnings) revenue (lock the user row first)"""
+    user.pending_earnings = (user.pending_earnings or 0.0) + revenue_amount
+    user.total_earnings = (user.total_earnings or 0.0) + revenue_amount
+
+def record_deletion(db: Session, user: User, scores: Optional[List[float]] = None):
+    """Remove deleted published drops from the aggregates; None means every published drop"""
+    if scores is None:
+        user.published_drop_count = 0
+        user.z_protocol_score_sum = 0.0
+    else:
+        ensure_aggregates(db, user)
+        user.published_drop_count = max(user.published_drop_count - len(scores), 0)
+        user.z_protocol_score_sum -= sum(scores)
+    _refresh_score(user)
+    apply_tier(user)
+
+# ==================== Verifier ====================
+
+def _drifted(user: User, published, earnings, tolerance: float) -> bool:
+    count, score_sum = published
+    total, pending = earnings
+    return (user.published_drop_count != count
+            or user.z_protocol_score_sum is None or abs(user.z_protocol_score_sum - score_sum) > tolerance
+            or abs((user.total_earnings or 0.0) - total) > tolerance
+            or abs((user.pending_earnings or 0.0) - pending) > tolerance)
+
+def _repair(db: Session, user_id: str, tolerance: float) -> bool:
+    """Recompute one user's totals with their row locked, so a concurrent publish / usage isn't reverted"""
+    user = db.query(User).filter(User.id == user_id).with_for_update().first()
+    published = _published_totals(db, user_id)
+    earnings = _earning_totals(db, user_id)
+    if user is None or not _drifted(user, published, earnings, tolerance):
+        db.rollback()
+        return False
+
+    user.published_drop_count, user.z_protocol_score_sum = published
+    user.total_earnings, user.pending_earnings = earnings
+    _refresh_score(user)
+    apply_tier(user)
+    db.commit()
+    return True
+
+def verify_user_aggregates(fix: bool = True, tolerance: float = 1e-6) -> Dict:
+    """
+    Recompute published and revenue totals for every user with GROUP BYs and
+    repair drift user by user under a row lock (scheduled periodically)
+    """
+    db = get_session()
+    checked = 0
+    drifted = []
+    repaired = 0
+
+    try:
+        published = {
+            user_id: (count, score_sum or 0.0)
+            for user_id, count, score_sum in db.query(
+                WisdomDrop.user_id,
+                func.count(WisdomDrop.id),
+                func.sum(WisdomDrop.z_protocol_score)
+            ).filter(WisdomDrop.published == True).group_by(WisdomDrop.user_id)
+        }
+        earnings = {
+            user_id: (total or 0.0, pending or 0.0)
+            for user_id, total, pending in db.query(
+                RevenueRecord.user_id,
+                func.sum(RevenueRecord.amount),
+                func.sum(_PENDING_AMOUNT)
+            ).group_by(RevenueRecord.user_id)
+        }
+
+        for user in db.query(User).filter(User.account_status != "deleted").yield_per(1000):
+            checked += 1
+            if _drifted(user, published.get(user.id, (0, 0.0)), earnings.get(user.id, (0.0, 0.0)), tolerance):
+                drifted.append(user.id)
+        db.rollback()
+
+        # The scan is a snapshot; each repair re-reads that user's totals under the lock
+        if fix:
+            repaired = sum(_repair(db, user_id, tolerance) for user_id in drifted)
+    finally:
+        db.close()
+
+    if drifted:
+        print(f"⚠️  User aggregates drifted for {len(drifted)} of {checked} users"
+              f"{f' ({repaired} repaired)' if fix else ''}")
+
+    return {
+        "checked": checked,
+        "drifted": len(drifted),
+        "repaired": repaired,
+        "sample": drifted[:20],
+        "verified_at": datetime.utcnow().isoformat()
+    }
@@ -13,6 +13,7 @@ import hashlib
 import secrets
 import requests
 from typing import Dict, List, Optional
+from urllib.parse import quote
 
 # Page Configuration
 st.set_page_config(
@@ -167,15 +168,33 @@ def init_session_state():
         st.session_state.username = None
     if 'token' not in st.session_state:
         st.session_state.token = None
+    if 'refresh_token' not in st.session_state:
+        st.session_state.refresh_token = None
     if 'z_protocol_tier' not in st.session_state:
         st.session_state.z_protocol_tier = "Bronze"
     if 'pending_wisdom' not in st.session_state:
         st.session_state.pending_wisdom = []
+    if 'drop_pages' not in st.session_state:
+        st.session_state.drop_pages = {}
     if 'api_base_url' not in st.session_state:
         st.session_state.api_base_url = "http://localhost:8003/api/v3"
 
 # API Helper Functions
-def api_call(method: str, endpoint: str, data: Dict = None, authenticated: bool = True):
+def refresh_session() -> bool:
+    """Swap the stored refresh token for a new access token instead of logging in again"""
+    if not st.session_state.get('refresh_token'):
+        return False
+    response = requests.post(f"{st.session_state.api_base_url}/auth/refresh",
+                             json={"refresh_token": st.session_state.refresh_token})
+    if response.status_code != 200:
+        st.session_state.refresh_token = None
+        return False
+    result = response.json()
+    st.session_state.token = result["access_token"]
+    st.session_state.refresh_token = result["refresh_token"]
+    return True
+
+def api_call(method: str, endpoint: str, data: Dict = None, authenticated: bool = True, retry: bool = True):
     """Make API call to backend"""
     url = f"{st.session_state.api_base_url}/{endpoint}"
     headers = {}
@@ -193,6 +212,10 @@ def api_call(method: str, endpoint: str, data: Dict = None, authenticated: bool
         else:
             return None
         
+        # Expired access token: refresh once and retry
+        if response.status_code == 401 and authenticated and retry and refresh_session():
+            return api_call(method, endpoint, data, authenticated, retry=False)
+        
         if response.status_code == 200 or response.status_code == 201:
             return response.json()
         else:
@@ -205,6 +228,34 @@ def api_call(method: str, endpoint: str, data: Dict = None, authenticated: bool
         st.error(f"API Error: {str(e)}")
         return None
 
+def fetch_my_drops(query: str = "") -> Optional[Dict]:
+    """Every my-drops page loaded so far ("Load more" adds one), following next_cursor"""
+    result = None
+    cursor = None
+    for _ in range(st.session_state.drop_pages.get(query, 1)):
+        endpoint = f"wisdom/my-drops{query}"
+        if cursor:
+            endpoint += f"{'&' if query else '?'}cursor={quote(cursor)}"
+        page = api_call("GET", endpoint)
+        if not page:
+            break
+        if result is None:
+            result = page
+        else:
+            result["wisdom_drops"] += page["wisdom_drops"]
+            result["next_cursor"] = page["next_cursor"]
+        cursor = page.get("next_cursor")
+        if not cursor:
+            break
+    return result
+
+def load_more_drops(query: str = ""):
+    st.session_state.drop_pages[query] = st.session_state.drop_pages.get(query, 1) + 1
+
+def show_load_more(my_drops: Dict, query: str = ""):
+    if my_drops.get("next_cursor"):
+        st.button("Load more", key=f"more_drops{query}", on_click=load_more_drops, args=(query,))
+
 def get_tier_badge(tier: str) -> str:
     """Get HTML for tier badge"""
     tier_class = f"tier-{tier.lower()}"
@@ -233,6 +284,7 @@ def show_login():
             if result:
                 st.session_state.authenticated = True
                 st.session_state.token = result["access_token"]
+                st.session_state.refresh_token = result.get("refresh_token")
                 st.session_state.user_id = result["user_id"]
                 st.session_state.username = result["username"]
                 st.session_state.z_protocol_tier = result["z_protocol_tier"]
@@ -377,6 +429,7 @@ def show_registration():
                     st.warning("⚠️ **IMPORTANT:** Save both keys! You'll need the crypto key to log in, and the Z Protocol key for consent management.")
                     st.session_state.authenticated = True
                     st.session_state.token = result["access_token"]
+                    st.session_state.refresh_token = result.get("refresh_token")
                     st.session_state.user_id = result["user_id"]
                     st.session_state.username = result["username"]
                     st.session_state.z_protocol_tier = result["z_protocol_tier"]
@@ -554,7 +607,7 @@ def show_distillation():
     st.markdown("## ✨ Deep Vibe Distillation")
     
     # Get pending wisdom drops
-    my_drops = api_call("GET", "wisdom/my-drops?status=awaiting_distillation")
+    my_drops = fetch_my_drops("?status=awaiting_distillation")
     
     if my_drops and my_drops.get("wisdom_drops"):
         for drop in my_drops["wisdom_drops"]:
@@ -600,6 +653,7 @@ def show_distillation():
                                 st.success(f"✨ Distillation Complete! New Quality: {result['quality_score']:.1f}/100")
                                 st.balloons()
                                 st.info(f"Revenue Potential: €{result['revenue_potential']:.2f}")
+        show_load_more(my_drops, "?status=awaiting_distillation")
     else:
         st.info("No wisdom drops awaiting distillation. Create a new wisdom drop first!")
 
@@ -608,15 +662,18 @@ def show_my_wisdom():
     st.markdown("## 📚 My Wisdom Collection")
     
     # Get wisdom drops
-    my_drops = api_call("GET", "wisdom/my-drops")
+    my_drops = fetch_my_drops()
     
     if my_drops and my_drops.get("wisdom_drops"):
-        # Summary metrics
+        # Summary metrics (published and revenue come from the server's per-user totals)
         col1, col2, col3 = st.columns(3)
         
-        total = len(my_drops["wisdom_drops"])
-        published = sum(1 for d in my_drops["wisdom_drops"] if d["published"])
-        total_revenue = sum(d.get("revenue_generated", 0) for d in my_drops["wisdom_drops"])
+        loaded = len(my_drops["wisdom_drops"])
+        total = my_drops.get("total")
+        if total is None:
+            total = f"{loaded}+" if my_drops.get("next_cursor") else loaded
+        published = my_drops["published_drop_count"]
+        total_revenue = my_drops["total_earnings"]
         
         with col1:
             st.metric("Total Drops", total)
@@ -647,6 +704,8 @@ def show_my_wisdom():
                         if st.button(f"Publish", key=f"pub_{drop['id']}"):
                             # Show publication confirmation
                             st.warning("Publishing requires Z Protocol validation (80%+ score)")
+        
+        show_load_more(my_drops)
     else:
         st.info("You haven't created any wisdom drops yet. Start sharing your wisdom!")
 
@@ -732,9 +791,11 @@ def main():
             st.markdown("---")
             
             if st.button("🚪 Logout", use_container_width=True):
-                api_call("POST", "auth/logout")
+                api_call("POST", "auth/logout", {"refresh_token": st.session_state.refresh_token}
+                         if st.session_state.refresh_token else None)
                 st.session_state.authenticated = False
                 st.session_state.token = None
+                st.session_state.refresh_token = None
                 st.session_state.user_id = None
                 st.rerun()
     
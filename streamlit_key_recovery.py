@@ -163,7 +163,11 @@ def show_key_management():
                 
                 if result and result.get("success"):
                     st.success("✅ New keys generated successfully!")
-                    
+
+                    # Earlier tokens were revoked along with the old keys
+                    st.session_state.token = result.get("access_token")
+                    st.session_state.refresh_token = result.get("refresh_token")
+
                     # Show new keys
                     st.markdown("#### Your New Keys:")
                     st.info(f"🔑 **Crypto Key:** `{result['crypto_key']}`")
@@ -74,8 +74,28 @@ def init_session_state():
         st.session_state.ai_analysis = {}
     if 'layer_review' not in st.session_state:
         st.session_state.layer_review = {}
+    if 'refresh_token' not in st.session_state:
+        st.session_state.refresh_token = None
 
 # API Helper Functions
+def refresh_session() -> bool:
+    """Swap the stored refresh token for a new access token instead of logging in again"""
+    if not st.session_state.get('refresh_token'):
+        return False
+    response = requests.post(f"{API_BASE_URL}/auth/refresh",
+                             json={"refresh_token": st.session_state.refresh_token})
+    if response.status_code != 200:
+        st.session_state.refresh_token = None
+        return False
+    result = response.json()
+    st.session_state.access_token = result["access_token"]
+    st.session_state.refresh_token = result["refresh_token"]
+    return True
+
+def auth_headers():
+    """Bearer header for the current access token"""
+    return {"Authorization": f"Bearer {st.session_state.get('access_token', '')}"}
+
 def api_call(method, endpoint, data=None, headers=None):
     """Make API call to backend"""
     try:
@@ -94,7 +114,7 @@ def api_call(method, endpoint, data=None, headers=None):
         st.error("Cannot connect to API server. Please ensure the backend is running.")
         return None
 
-def api_v4_call(method, endpoint, data=None, headers=None):
+def api_v4_call(method, endpoint, data=None, headers=None, retry=True):
     """Make API call to v4.0 backend"""
     try:
         url = f"{API_V4_BASE_URL}/{endpoint}"
@@ -103,6 +123,10 @@ def api_v4_call(method, endpoint, data=None, headers=None):
         elif method == "POST":
             response = requests.post(url, json=data, headers=headers)
         
+        # Expired access token: refresh once and retry
+        if response.status_code == 401 and headers and retry and refresh_session():
+            return api_v4_call(method, endpoint, data, {**headers, **auth_headers()}, retry=False)
+        
         if response.status_code == 200 or response.status_code == 201:
             return response.json()
         else:
@@ -112,6 +136,30 @@ def api_v4_call(method, endpoint, data=None, headers=None):
         st.error("Cannot connect to v4.0 API server. Please ensure the backend is running.")
         return None
 
+def api_v4_stream(endpoint, data=None, headers=None, retry=True):
+    """Stream Server-Sent Events from v4.0 backend as (event, data) pairs"""
+    try:
+        url = f"{API_V4_BASE_URL}/{endpoint}"
+        with requests.post(url, json=data, headers=headers, stream=True, timeout=120) as response:
+            # Expired access token: refresh once and retry
+            if response.status_code == 401 and headers and retry and refresh_session():
+                yield from api_v4_stream(endpoint, data, {**headers, **auth_headers()}, retry=False)
+                return
+            if response.status_code != 200:
+                st.error(f"v4.0 API Error: {response.status_code} - {response.text}")
+                return
+            
+            event_name = "message"
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                if line.startswith("event:"):
+                    event_name = line[6:].strip()
+                elif line.startswith("data:"):
+                    yield event_name, json.loads(line[5:].strip())
+    except requests.exceptions.ConnectionError:
+        st.error("Cannot connect to v4.0 API server. Please ensure the backend is running.")
+
 # AI Recommendation Functions
 def generate_ai_vibe_recommendations(story: str, layers: dict) -> list:
     """Generate AI vibe word recommendations based on story analysis"""
@@ -197,6 +245,7 @@ def show_login():
                         st.session_state.crypto_key = crypto_key
                         st.session_state.z_protocol_consent_key = result.get("z_protocol_consent_key")
                         st.session_state.access_token = result.get("access_token")
+                        st.session_state.refresh_token = result.get("refresh_token")
                         st.success("✅ Login successful!")
                         st.rerun()
 
@@ -317,19 +366,41 @@ def show_story_input():
             if len(story.strip()) < 50:
                 st.error("⚠️ Please provide a more detailed story (at least 50 characters)")
             else:
-                with st.spinner("🤖 AI is analyzing your story..."):
-                    headers = {"Authorization": f"Bearer {st.session_state.get('access_token', '')}"}
-                    result = api_v4_call("POST", "wisdom/analyze-story", {
-                        "story": story,
-                        "cultural_context": cultural_context,
-                        "language": language
-                    }, headers)
+                headers = auth_headers()
+                live_output = st.empty()
+                streamed_layers = {}
+                result = None
+                
+                # Show layers as the AI writes them instead of waiting for the full analysis
+                for event, payload in api_v4_stream("wisdom/analyze-story/stream", {
+                    "story": story,
+                    "cultural_context": cultural_context,
+                    "language": language
+                }, headers):
+                    if event == "layer_start":
+                        streamed_layers[payload["layer"]] = ""
+                    elif event == "token":
+                        streamed_layers[payload["layer"]] = streamed_layers.get(payload["layer"], "") + payload["text"]
+                    elif event == "layer_complete":
+                        streamed_layers[payload["layer"]] = payload["content"]
+                    elif event == "layers_complete":
+                        live_output.info("🤖 Layers extracted - our 7 agents are reviewing your story...")
+                        continue
+                    elif event == "result":
+                        result = payload
+                    elif event == "error":
+                        st.error(payload.get("detail", "AI analysis failed"))
                     
-                    if result:
-                        st.session_state.ai_analysis = result
-                        st.session_state.current_step = "layer_review"
-                        st.success("✅ AI analysis complete!")
-                        st.rerun()
+                    if event in ("layer_start", "token", "layer_complete"):
+                        live_output.markdown("\n\n".join(
+                            f"**{name.title()}:** {text}" for name, text in streamed_layers.items()
+                        ))
+                
+                if result:
+                    st.session_state.ai_analysis = result
+                    st.session_state.current_step = "layer_review"
+                    st.success("✅ AI analysis complete!")
+                    st.rerun()
 
 def show_layer_review():
     """Show layer review interface"""
@@ -549,7 +620,7 @@ def show_deep_vibe_distillation():
                         }
                         
                         # Create wisdom drop
-                        headers = {"Authorization": f"Bearer {st.session_state.get('access_token', '')}"}
+                        headers = auth_headers()
                         result = api_v4_call("POST", "wisdom/create-wisdom-drop", {
                             "story_input": story_data,
                             "review": review_data,
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test admission control for AI analyses
+Checks queueing, shedding, deadlines and the AIMD limit with a fake clock
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.admission import AdmissionController, AdmissionRejected
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _controller(**overrides):
+    options = dict(initial_limit=2, min_limit=1, max_limit=4, max_queue=1,
+                   queue_timeout=0.05, latency_target=1.0, backoff=0.5, clock=FakeClock())
+    options.update(overrides)
+    return AdmissionController("test", **options)
+
+def test_queue_and_shed():
+    async def scenario():
+        controller = _controller()
+        first = await controller.acquire()
+        second = await controller.acquire()
+
+        # Third waits in the queue, fourth is shed immediately
+        queued = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        assert controller.stats()["queued"] == 1
+        try:
+            await controller.acquire()
+        except AdmissionRejected as e:
+            assert e.retry_after >= 1
+        else:
+            raise AssertionError("Full queue did not shed")
+
+        # Releasing a slot hands it straight to the waiter
+        controller.release(first)
+        third = await queued
+        assert controller.in_flight == 2 and controller.stats()["queued"] == 0
+
+        controller.release(second)
+        controller.release(third)
+        assert controller.in_flight == 0
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["rejected"] == 1 and stats["admitted"] == 3
+    print("✅ Queue hands over slots and sheds when full")
+
+def test_queue_deadline():
+    async def scenario():
+        controller = _controller(initial_limit=1)
+        held = await controller.acquire()
+        try:
+            await controller.acquire()
+        except AdmissionRejected as e:
+            assert "exceeded" in e.reason
+        else:
+            raise AssertionError("Queue deadline did not shed")
+        assert controller.stats()["queued"] == 0
+        controller.release(held)
+        assert controller.in_flight == 0
+
+    asyncio.run(scenario())
+    print("✅ Queue deadline sheds and cleans up")
+
+def test_aimd_limit():
+    async def scenario():
+        clock = FakeClock()
+        controller = _controller(initial_limit=2, max_queue=0, clock=clock)
+
+        # Saturated, on-target completions grow the limit additively
+        for _ in range(6):
+            a = await controller.acquire()
+            b = await controller.acquire()
+            clock.now += 0.5
+            controller.release(a)
+            controller.release(b)
+        grown = controller.limit
+        assert grown > 2
+
+        # Slow completions cut it multiplicatively, once per congestion event
+        a = await controller.acquire()
+        b = await controller.acquire()
+        clock.now += 5
+        controller.release(a)
+        controller.release(b)
+        assert abs(controller.limit - max(1, grown * 0.5)) < 1e-9
+
+        # Failures count as congestion too, but never below min_limit
+        for _ in range(5):
+            started = await controller.acquire()
+            clock.now += 0.1
+            controller.release(started, ok=False)
+        assert controller.limit == 1
+
+    asyncio.run(scenario())
+    print("✅ AIMD limit grows on target and backs off on slow or failed calls")
+
+def test_slot_context_manager():
+    async def scenario():
+        controller = _controller()
+        async with controller.slot():
+            assert controller.in_flight == 1
+        try:
+            async with controller.slot():
+                raise RuntimeError("provider error")
+        except RuntimeError:
+            pass
+        assert controller.in_flight == 0 and controller.limit == 1
+
+    asyncio.run(scenario())
+    print("✅ slot() releases on success and error")
+
+if __name__ == "__main__":
+    test_queue_and_shed()
+    test_queue_deadline()
+    test_aimd_limit()
+    test_slot_context_manager()
+    print("\n🎉 Admission control tests passed")
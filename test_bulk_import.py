@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test bulk registration import
+Imports NDJSON into a fresh SQLite database per test, including rows that clash with
+existing users after the chunk's uniqueness check
+"""
+
+import json
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import api.auth
+from src import models
+from src.bulk_registration import BulkRegistrationImporter, read_registrations
+from src.config import Config
+from src.models import User, create_tables, get_session
+
+@contextmanager
+def _database():
+    """Fresh SQLite database as Config.DATABASE_URL, restored (and its engine dropped) afterwards"""
+    url = f"sqlite:///{Path(tempfile.mkdtemp()) / 'bulk_import.db'}"
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(Config, "DATABASE_URL", url)
+        mp.setattr(Config, "DEBUG", False)
+        create_tables(url)
+        try:
+            yield url
+        finally:
+            models._engines.pop(url).dispose()
+
+@pytest.fixture(autouse=True)
+def database():
+    with _database() as url:
+        yield url
+
+CONSENTS = {f"consent_{name}": True for name in api.auth.CONSENT_TYPES}
+
+def _lines(*usernames):
+    return [json.dumps({"username": name, "email": f"{name}@bulk.ysense.ai", "age": 30, **CONSENTS})
+            for name in usernames]
+
+def _import(lines):
+    outcomes = list(BulkRegistrationImporter(chunk_size=10).run(read_registrations(lines, "ndjson")))
+    return {o["username"]: o for o in outcomes[:-1]}, outcomes[-1]["summary"]
+
+def test_import_and_duplicates():
+    outcomes, summary = _import(_lines("bulk_a", "bulk_b", "bulk_a"))
+    assert summary["created"] == 2 and summary["duplicate"] == 1
+    assert outcomes["bulk_b"]["crypto_key"]
+
+    _, summary = _import(_lines("bulk_b", "bulk_c"))
+    assert summary["created"] == 1 and summary["duplicate"] == 1
+    print("✅ Rows imported, duplicates reported")
+
+def test_user_id_clash_is_redrawn():
+    _import(_lines("bulk_a"))
+    db = get_session()
+    taken_id = db.query(User.id).filter(User.username == "bulk_a").scalar()
+    db.close()
+
+    # bulk_d's generated id already exists (ids only change once a second)
+    generate_user_id = api.auth.generate_user_id
+    api.auth.generate_user_id = lambda username: taken_id if username == "bulk_d" else generate_user_id(username)
+    try:
+        outcomes, summary = _import(_lines("bulk_d", "bulk_e"))
+    finally:
+        api.auth.generate_user_id = generate_user_id
+
+    assert summary["created"] == 2 and summary["failed"] == 0, summary
+    assert outcomes["bulk_d"]["user_id"] != taken_id
+    print("✅ Clashing user id redrawn, whole chunk still created")
+
+if __name__ == "__main__":
+    for test in (test_import_and_duplicates, test_user_id_clash_is_redrawn):
+        with _database():
+            test()
+    print("\n🎉 Bulk import tests passed")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test response compression
+Large JSON bodies are gzipped; Server-Sent Event streams are not, so each
+event reaches the client as soon as it is sent
+"""
+
+import asyncio
+import gzip
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
+
+from src.responses import APIResponse, StreamAwareCompression
+
+EVENT_GAP = 0.05
+
+def _app():
+    app = FastAPI(default_response_class=APIResponse)
+    app.add_middleware(StreamAwareCompression, compressor=GZipMiddleware, minimum_size=100)
+
+    @app.get("/drops")
+    async def drops():
+        return {"drops": [{"id": f"DROP_{i}", "title": "Patience through rendang"} for i in range(100)]}
+
+    @app.post("/analyze-story/stream")
+    async def stream():
+        async def events():
+            for i in range(4):
+                yield f"event: token\ndata: {i}\n\n"
+                await asyncio.sleep(EVENT_GAP)
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+def _call(app, method, path):
+    """Run one request with Accept-Encoding: gzip; (headers, [(seconds since start, body)])"""
+    sent = []
+    requested = []
+    start = time.perf_counter()
+
+    async def receive():
+        if requested:
+            await asyncio.Event().wait()  # client stays connected
+        requested.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append((time.perf_counter() - start, message))
+
+    scope = {"type": "http", "method": method, "path": path, "raw_path": path.encode(), "query_string": b"",
+             "headers": [(b"accept-encoding", b"gzip, deflate, br")], "client": ("127.0.0.1", 5000)}
+    asyncio.run(app(scope, receive, send))
+    headers = dict(next(m for _, m in sent if m["type"] == "http.response.start")["headers"])
+    bodies = [(t, m["body"]) for t, m in sent if m["type"] == "http.response.body" and m.get("body")]
+    return headers, bodies
+
+def test_json_is_compressed():
+    headers, bodies = _call(_app(), "GET", "/drops")
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"DROP_99" in gzip.decompress(b"".join(body for _, body in bodies))
+    print("✅ Large JSON responses are gzipped")
+
+def test_event_stream_is_not_buffered():
+    headers, bodies = _call(_app(), "POST", "/analyze-story/stream")
+    assert b"content-encoding" not in headers
+    assert [body for _, body in bodies] == [f"event: token\ndata: {i}\n\n".encode() for i in range(4)]
+    # Each event goes out when it is produced, not all together at the end
+    assert bodies[0][0] < bodies[-1][0] - 2 * EVENT_GAP
+    print("✅ Event streams are sent uncompressed, one event at a time")
+
+if __name__ == "__main__":
+    test_json_is_compressed()
+    test_event_stream_is_not_buffered()
+    print("\n🎉 Compression tests passed")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test the multi-pattern KeywordScanner used by LayerAnalyzer scoring
+Checks word-boundary matching, group counts and sentence lookup
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.keyword_scanner import KeywordScanner, sentence_span
+
+def test_word_boundaries():
+    """'when' must not match inside 'whenever'"""
+    scanner = KeywordScanner({'time': ['when', 'while']})
+    assert scanner.scan("Whenever it rained we stayed home.").count('time') == 0
+    assert scanner.scan("When it rained we stayed home.").count('time') == 1
+    print("✅ Word boundaries respected")
+
+def test_groups_share_keywords():
+    """One pass credits every group a keyword belongs to, counting distinct keywords"""
+    scanner = KeywordScanner({
+        'quality': ['insight', 'truth', 'lesson'],
+        'value': ['insight', 'timeless', 'truth']
+    })
+    hits = scanner.scan("A timeless insight. Another insight, and the truth.")
+    assert hits.count('quality') == 2
+    assert hits.count('value') == 3
+    assert hits.found('value') == ['insight', 'timeless', 'truth']
+    print("✅ Shared keywords counted per group")
+
+def test_multi_word_and_case():
+    """Multi-word keywords match case-insensitively and credit contained keywords"""
+    scanner = KeywordScanner({
+        'rarity': ['oral tradition', 'ritual'],
+        'quality': ['tradition'],
+        'culture': ['Teluk Intan']
+    })
+    hits = scanner.scan("Our ORAL TRADITION from teluk intan survives.")
+    assert hits.count('rarity') == 1
+    assert hits.count('quality') == 1
+    assert hits.count('culture') == 1
+    print("✅ Multi-word and case-insensitive matching")
+
+def test_sentence_lookup():
+    """Match positions map back to the '.'-delimited sentence"""
+    text = "We cooked all day. I learned patience. Then we ate"
+    hits = KeywordScanner({'wisdom': ['learned']}).scan(text)
+    start, end = sentence_span(text, hits.first_position('learned'))
+    assert text[start:end].strip() == "I learned patience"
+    start, end = sentence_span(text, len(text) - 1)
+    assert text[start:end].strip() == "Then we ate"
+    print("✅ Sentence lookup")
+
+if __name__ == "__main__":
+    print("🔎 Testing KeywordScanner")
+    print("=" * 50)
+    test_word_boundaries()
+    test_groups_share_keywords()
+    test_multi_word_and_case()
+    test_sentence_lookup()
+    print("\n🎉 All keyword scanner tests passed!")
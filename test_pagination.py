@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test keyset pagination helpers
+Walks an in-memory SQLite audit log page by page and checks cursors round-trip
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.models import Base, AuditLog
+from src.pagination import InvalidCursor, decode_cursor, encode_cursor, paginate
+
+def _session_with_logs(count: int):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        # Pairs share a timestamp so the id tie-breaker is exercised
+        db.add(AuditLog(
+            id=f"AUDIT_{i:04d}",
+            user_id="USER_1",
+            action="test",
+            action_type="test",
+            created_at=start + timedelta(minutes=i // 2)
+        ))
+    db.commit()
+    return db
+
+def test_cursor_round_trip():
+    when = datetime(2025, 3, 4, 5, 6, 7, 891011)
+    assert decode_cursor(encode_cursor(when, "DROP_1")) == (when, "DROP_1")
+    try:
+        decode_cursor("not-a-cursor")
+    except InvalidCursor:
+        pass
+    else:
+        raise AssertionError("Garbage cursor accepted")
+    print("✅ Cursor round trip")
+
+def test_walk_all_pages():
+    """Every row exactly once, newest first, across page boundaries inside a timestamp tie"""
+    db = _session_with_logs(25)
+    query = db.query(AuditLog.id, AuditLog.created_at).filter(AuditLog.user_id == "USER_1")
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = paginate(query, AuditLog.created_at, AuditLog.id, cursor, 7)
+        seen.extend(row.id for row in rows)
+        pages += 1
+        if cursor is None:
+            break
+
+    db.close()
+    assert pages == 4
+    assert seen == [f"AUDIT_{i:04d}" for i in reversed(range(25))]
+    print("✅ Keyset walk returns every row once")
+
+if __name__ == "__main__":
+    print("📄 Testing keyset pagination")
+    print("=" * 50)
+    test_cursor_round_trip()
+    test_walk_all_pages()
+    print("\n🎉 All pagination tests passed!")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test bulk publish
+Two overlapping publish-batch requests run concurrently against a seeded
+SQLite database; each drop is published once and the owner's aggregates match
+the drop table
+"""
+
+import asyncio
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import func
+from starlette.requests import Request
+
+import api.wisdom
+from api.wisdom import WisdomDropBatchPublish, publish_wisdom_drops_batch
+from benchmarks.seed_data import DatasetSeeder
+from src import models
+from src.config import Config
+from src.models import User, WisdomDrop, ZProtocolValidation, get_session
+
+def _request():
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": [], "client": ("127.0.0.1", 5000)})
+
+@contextmanager
+def _database():
+    """Seeded SQLite database as Config.DATABASE_URL; yields (owner id, three unpublished drop ids)"""
+    url = f"sqlite:///{Path(tempfile.mkdtemp()) / 'publish_batch.db'}"
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(Config, "DATABASE_URL", url)
+        mp.setattr(Config, "DEBUG", False)
+        try:
+            DatasetSeeder(url, scale=200, layer_words=10).seed_all()
+            db = get_session()
+            owner_id, = db.query(WisdomDrop.user_id).filter(
+                WisdomDrop.published == False, WisdomDrop.distillation_completed == True
+            ).group_by(WisdomDrop.user_id).having(func.count(WisdomDrop.id) >= 3).first()
+            drop_ids = [wisdom_id for wisdom_id, in db.query(WisdomDrop.id).filter(
+                WisdomDrop.user_id == owner_id,
+                WisdomDrop.published == False, WisdomDrop.distillation_completed == True
+            ).order_by(WisdomDrop.id).limit(3)]
+            owner = db.query(User).filter(User.id == owner_id).first()
+            # Seeded consent predates these two categories; Z Protocol requires them to publish
+            owner.consent_record = {**owner.consent_record, "modification": True, "terms_accepted": True}
+            db.commit()
+            db.close()
+            yield owner_id, drop_ids
+        finally:
+            engine = models._engines.pop(url, None)
+            if engine is not None:
+                engine.dispose()
+
+@pytest.fixture
+def seeded():
+    with _database() as ids:
+        yield ids
+
+def test_overlapping_batches(seeded):
+    owner_id, (first, shared, last) = seeded
+    db = get_session()
+    owner = db.query(User).filter(User.id == owner_id).first()
+    db.close()
+
+    # Yield during validation so both requests load their drops before either writes
+    validate_batch = api.wisdom.z_validator.validate_batch
+
+    async def interleaved(*args, **kwargs):
+        await asyncio.sleep(0)
+        return await validate_batch(*args, **kwargs)
+
+    confirm = dict(confirm_authenticity=True, confirm_no_copyright=True, confirm_attribution=True)
+
+    async def run():
+        return await asyncio.gather(
+            publish_wisdom_drops_batch(WisdomDropBatchPublish(wisdom_ids=[first, shared], **confirm),
+                                       _request(), current_user=owner),
+            publish_wisdom_drops_batch(WisdomDropBatchPublish(wisdom_ids=[shared, last], **confirm),
+                                       _request(), current_user=owner)
+        )
+
+    api.wisdom.z_validator.validate_batch = interleaved
+    try:
+        responses = asyncio.run(run())
+    finally:
+        api.wisdom.z_validator.validate_batch = validate_batch
+
+    assert sum(response["published"] for response in responses) == 3, responses
+
+    db = get_session()
+    count, score_sum = db.query(func.count(WisdomDrop.id), func.sum(WisdomDrop.z_protocol_score)).filter(
+        WisdomDrop.user_id == owner_id, WisdomDrop.published == True
+    ).one()
+    owner = db.query(User).filter(User.id == owner_id).first()
+    validations = db.query(ZProtocolValidation).filter(ZProtocolValidation.wisdom_drop_id == shared).count()
+    db.close()
+
+    assert owner.published_drop_count == count
+    assert abs(owner.z_protocol_score_sum - score_sum) < 1e-6
+    assert validations == 1
+    print("✅ Overlapping batches publish each drop once, aggregates match")
+
+if __name__ == "__main__":
+    with _database() as ids:
+        test_overlapping_batches(ids)
+    print("\n🎉 Bulk publish tests passed")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test SQL query budgets
+Seeds a small SQLite database and calls endpoints directly under
+assert_query_budget, so an N+1 or a redundant lookup fails the test
+"""
+
+import asyncio
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from starlette.requests import Request
+
+from benchmarks.seed_data import DatasetSeeder
+from src import models
+from src.config import Config
+from src.models import User, WisdomDrop, get_session
+from src.query_log import QueryLogMiddleware, assert_query_budget, capture_queries
+
+def _request():
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": [], "client": ("127.0.0.1", 5000)})
+
+@contextmanager
+def _database():
+    """Seeded SQLite database as Config.DATABASE_URL; yields the ids the tests use"""
+    url = f"sqlite:///{Path(tempfile.mkdtemp()) / 'query_budget.db'}"
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(Config, "DATABASE_URL", url)
+        mp.setattr(Config, "DEBUG", False)
+        try:
+            DatasetSeeder(url, scale=200, layer_words=10).seed_all()
+            db = get_session()
+            published = db.query(WisdomDrop).filter(WisdomDrop.published == True).first()
+            distilled = db.query(WisdomDrop).filter(
+                WisdomDrop.published == False, WisdomDrop.distillation_completed == True
+            ).first()
+            owner = db.query(User).filter(User.id == distilled.user_id).first()
+            # Seeded consent predates these two categories; Z Protocol requires them to publish
+            owner.consent_record = {**owner.consent_record, "modification": True, "terms_accepted": True}
+            db.commit()
+            db.close()
+            yield {"published": published.id, "distilled": distilled.id, "owner": owner.id}
+        finally:
+            engine = models._engines.pop(url, None)
+            if engine is not None:
+                engine.dispose()
+
+@pytest.fixture(scope="module")
+def seeded():
+    with _database() as ids:
+        yield ids
+
+def _load(model, id):
+    db = get_session()
+    try:
+        return db.query(model).filter(model.id == id).first()
+    finally:
+        db.close()
+
+def test_budget_catches_repeats(seeded):
+    db = get_session()
+    ids = [row.id for row in db.query(User.id).limit(5)]
+    try:
+        with assert_query_budget(10, max_repeats=1):
+            for user_id in ids:
+                db.query(User).filter(User.id == user_id).first()
+    except AssertionError as e:
+        assert "5x (max 1)" in str(e)
+    else:
+        raise AssertionError("Per-row queries were not flagged")
+    finally:
+        db.close()
+
+    # Nested logs both see the statements
+    db = get_session()
+    with capture_queries() as outer:
+        with capture_queries() as inner:
+            db.query(User).filter(User.id.in_(ids)).all()
+    db.close()
+    assert inner.count == outer.count == 1
+    print("✅ Budget flags repeated statements")
+
+def test_report_usage_budget(seeded):
+    from api.revenue import UsageReport, report_usage
+
+    report = UsageReport(wisdom_drop_id=seeded["published"], usage_type="research",
+                         usage_context="budget test", client_id="test-client")
+    # drop+user SELECT, then usage, revenue, audit inserts and drop, user updates
+    with assert_query_budget(6, max_repeats=1):
+        asyncio.run(report_usage(report, _request()))
+    print("✅ report_usage within budget")
+
+def test_publish_budget(seeded):
+    from api.wisdom import WisdomDropPublish, publish_wisdom_drop
+
+    owner = _load(User, seeded["owner"])
+
+    confirm = WisdomDropPublish(confirm_authenticity=True, confirm_no_copyright=True, confirm_attribution=True)
+    # drop+user SELECT (locked), one-off aggregate backfill COUNT, validation insert,
+    # drop and user updates, audit insert
+    with assert_query_budget(6, max_repeats=1) as log:
+        result = asyncio.run(publish_wisdom_drop(seeded["distilled"], confirm, _request(), current_user=owner))
+    assert result["published"]
+    # The owner comes with the drop; no second lookup of the user
+    user_reads = [q for q in log.queries if q.statement.startswith("SELECT") and "users." in q.statement]
+    assert len(user_reads) == 1 and "JOIN users" in user_reads[0].statement
+    print("✅ publish_wisdom_drop within budget")
+
+def test_debug_headers(seeded):
+    async def app(scope, receive, send):
+        db = get_session()
+        for _ in range(2):
+            db.query(User.id).filter(User.id == "USER_B000000001").first()
+        db.close()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+    asyncio.run(QueryLogMiddleware(app)(scope, None, send))
+    headers = dict(sent[0]["headers"])
+    assert headers[b"x-query-count"] == b"2" and headers[b"x-query-duplicates"] == b"1"
+    print("✅ X-Query-* debug headers")
+
+if __name__ == "__main__":
+    with _database() as ids:
+        test_budget_catches_repeats(ids)
+        test_report_usage_budget(ids)
+        test_publish_budget(ids)
+        test_debug_headers(ids)
+    print("\n🎉 Query budget tests passed")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test token bucket rate limiting
+Drives the in-process bucket store with a fake clock and the ASGI middleware
+with a bare app, checking costs, refill, 429s and RateLimit-* headers
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import jwt
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.rate_limit import (
+    MemoryBucketStore, RateLimiter, RateLimitExceeded, RateLimitMiddleware, client_key, route_cost
+)
+from src.config import Config
+from src.token_revocation import revocation_list
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def _limiter(capacity=10, rate=1.0):
+    clock = FakeClock()
+    limiter = RateLimiter(capacity=capacity, refill_per_second=rate)
+    limiter.local = limiter.store = MemoryBucketStore(clock=clock)
+    return limiter, clock
+
+def test_route_costs():
+    assert route_cost("POST", "/api/v4/wisdom/analyze-story") == 20
+    assert route_cost("POST", "/api/v4/wisdom/analyze-story/stream") == 20
+    assert route_cost("POST", "/api/v3/wisdom/DROP_1/distill") == 10
+    assert route_cost("POST", "/api/v3/wisdom/publish-batch") == 20
+    assert route_cost("GET", "/api/v3/wisdom/DROP_1") == 1
+    assert route_cost("GET", "/api/v4/wisdom/analyze-story") == 1
+    print("✅ Route costs")
+
+def test_bucket_drains_and_refills():
+    limiter, clock = _limiter(capacity=10, rate=2.0)
+
+    first = limiter.check("user:1", 4)
+    assert first.allowed and first.remaining == 6 and first.reset == 2
+
+    assert limiter.check("user:1", 4).allowed
+    denied = limiter.check("user:1", 4)
+    assert not denied.allowed and denied.remaining == 2 and denied.retry_after == 1
+
+    # Other clients have their own bucket
+    assert limiter.check("user:2", 10).allowed
+
+    clock.now += 1.0  # +2 tokens
+    assert limiter.check("user:1", 4).allowed
+
+    clock.now += 60   # refill caps at capacity
+    assert limiter.check("user:1", 1).remaining == 9
+    print("✅ Bucket drains and refills")
+
+def test_enforce_raises():
+    limiter, _ = _limiter(capacity=3)
+    limiter.enforce("mcp:client", 3)
+    try:
+        limiter.enforce("mcp:client", 1)
+    except RateLimitExceeded as e:
+        assert e.result.retry_after == 1
+    else:
+        raise AssertionError("Empty bucket did not raise")
+    print("✅ enforce() raises when empty")
+
+def test_client_key():
+    scope = {"headers": [(b"x-client-id", b"agent-7")], "client": ("10.0.0.1", 5000)}
+    assert client_key(scope) == "client:agent-7@10.0.0.1"
+    # The same id sent from another address gets its own bucket
+    scope["client"] = ("10.0.0.2", 5000)
+    assert client_key(scope) == "client:agent-7@10.0.0.2"
+    assert client_key({"headers": [], "client": ("10.0.0.1", 5000)}) == "ip:10.0.0.1"
+    print("✅ Client id is scoped to the remote address")
+
+def _bearer(**claims):
+    token = jwt.encode({"sub": "USER_1", "iat": int(time.time()), "exp": int(time.time()) + 600, **claims},
+                       Config.JWT_SECRET_KEY, algorithm=Config.JWT_ALGORITHM)
+    return {"headers": [(b"authorization", f"Bearer {token}".encode())], "client": ("10.0.0.1", 5000)}
+
+def test_client_key_tokens():
+    assert client_key(_bearer(jti="ok")) == "user:USER_1"
+    # Refresh tokens and revoked access tokens are limited by address
+    assert client_key(_bearer(jti="refresh", type="refresh")) == "ip:10.0.0.1"
+    revocation_list._tokens["revoked"] = time.time() + 600
+    try:
+        assert client_key(_bearer(jti="revoked")) == "ip:10.0.0.1"
+    finally:
+        revocation_list._tokens.pop("revoked")
+    print("✅ Only live access tokens get a user bucket")
+
+def _call(middleware, path, method="GET", client=("10.0.0.1", 5000)):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": [], "client": client}
+    asyncio.run(middleware(scope, receive, send))
+    start = sent[0]
+    return start["status"], {name.decode(): value.decode() for name, value in start["headers"]}
+
+def test_middleware_headers_and_429():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    limiter, _ = _limiter(capacity=25, rate=1.0)
+    middleware = RateLimitMiddleware(app, limiter)
+
+    status, headers = _call(middleware, "/api/v4/wisdom/analyze-story", "POST")
+    assert status == 200
+    assert headers["ratelimit-limit"] == "25" and headers["ratelimit-remaining"] == "5"
+
+    status, headers = _call(middleware, "/api/v4/wisdom/analyze-story", "POST")
+    assert status == 429 and headers["retry-after"] == "15"
+
+    # Cheap reads still fit in what's left; health checks are never charged
+    assert _call(middleware, "/api/v3/wisdom/my-drops")[0] == 200
+    status, headers = _call(middleware, "/health")
+    assert status == 200 and "ratelimit-limit" not in headers
+
+    # A different address has a full bucket
+    assert _call(middleware, "/api/v4/wisdom/analyze-story", "POST", ("10.0.0.2", 5000))[0] == 200
+    print("✅ Middleware headers and 429")
+
+if __name__ == "__main__":
+    test_route_costs()
+    test_bucket_drains_and_refills()
+    test_enforce_raises()
+    test_client_key()
+    test_client_key_tokens()
+    test_middleware_headers_and_429()
+    print("\n🎉 Rate limiting tests passed")